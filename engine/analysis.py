@@ -0,0 +1,76 @@
+import queue
+import threading
+from typing import Iterator, List, NamedTuple, Optional
+
+import chess
+import chess.engine
+
+
+class AnalysisLine(NamedTuple):
+    """Одна линия анализа: оценка с точки зрения стороны, которая ходит, и главный вариант."""
+    depth: int
+    score: chess.engine.Score
+    pv: List[chess.Move]
+
+
+class StockfishAnalysis:
+    """
+    Потоковый MultiPV-анализ Stockfish (chess.engine.SimpleEngine.analysis).
+    Итерация выдает список лучших линий каждый раз, когда движок досчитал
+    полный набор линий очередной глубины; stop() можно вызвать из другого потока.
+    """
+    def __init__(self, analysis: chess.engine.SimpleAnalysisResult):
+        self._analysis = analysis
+
+    def __iter__(self) -> Iterator[List[AnalysisLine]]:
+        with self._analysis:
+            for info in self._analysis:
+                if "pv" not in info or info.get("multipv", 1) != len(self._analysis.multipv):
+                    continue
+                yield [
+                    AnalysisLine(line.get("depth", 0), line["score"].relative, line["pv"])
+                    for line in self._analysis.multipv if line.get("pv")
+                ]
+
+    def stop(self):
+        self._analysis.stop()
+
+
+class BuiltinAnalysis:
+    """
+    Потоковый анализ встроенным движком: поиск идет в отдельном потоке,
+    каждая завершенная итерация углубления - новое обновление (одна линия,
+    MultiPV встроенный поиск не поддерживает).
+    """
+    _DONE = object()
+
+    def __init__(self, engine, board, depth: Optional[int], nodes: Optional[int]):
+        self._engine = engine
+        self._chess960 = board.is_chess960
+        self._stop_requested = False
+        self._updates: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, args=(board, depth, nodes), daemon=True)
+        self._thread.start()
+
+    def _run(self, board, depth: Optional[int], nodes: Optional[int]):
+        try:
+            self._engine.searcher.search(board, max_depth=depth, max_nodes=nodes, on_iteration=self._on_iteration)
+        finally:
+            self._updates.put(self._DONE)
+
+    def _on_iteration(self, result):
+        if self._stop_requested:
+            self._engine.searcher.stop() # stop() пришел до того, как поиск успел начаться
+        self._updates.put([self._engine.to_analysis_line(result, self._chess960)])
+
+    def __iter__(self) -> Iterator[List[AnalysisLine]]:
+        while True:
+            update = self._updates.get()
+            if update is self._DONE:
+                break
+            yield update
+        self._thread.join()
+
+    def stop(self):
+        self._stop_requested = True
+        self._engine.searcher.stop()
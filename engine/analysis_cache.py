@@ -0,0 +1,124 @@
+import json
+import os
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+
+import chess
+import chess.engine
+import chess.polyglot
+
+from engine.analysis import AnalysisLine
+
+
+class AnalysisEntry(NamedTuple):
+    """Результат анализа позиции: лучший ход и линии MultiPV (для хода ИИ линий может не быть)."""
+    best_move: Optional[chess.Move]
+    lines: List[AnalysisLine]
+    complete: bool = True  # False - анализ прервал игрок, до лимита он не дошел
+
+    @property
+    def score(self) -> Optional[chess.engine.Score]:
+        return self.lines[0].score if self.lines else None
+
+
+class AnalysisCache:
+    """
+    LRU-кэш результатов движка. Ключ - polyglot-хэш позиции плюс тип запроса
+    и его ограничения (уровень и время для хода, число линий и глубина для
+    подсказок), так что разные настройки не смешиваются. Повторные позиции
+    (дебют, отмена хода, повторная подсказка) отвечаются сразу. Ходы ИИ
+    игра держит в отдельном кэше без файла (только на одну партию).
+
+    С `path` кэш читается из файла при создании и пишется в него в save()
+    (атомарно, через временный файл). Размер ограничен `max_entries`:
+    дольше всех не использованные записи вытесняются.
+    """
+    def __init__(self, max_entries: int = 5000, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries: "OrderedDict[str, AnalysisEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self.load()
+
+    @staticmethod
+    def key(board: chess.Board, kind: str, *limits) -> str:
+        params = ":".join(str(limit) for limit in limits)
+        variant = "960" if board.chess960 else ""  # в 960 рокировка записывается иначе
+        return f"{chess.polyglot.zobrist_hash(board):016x}{variant}:{kind}:{params}"
+
+    def get(self, key: str) -> Optional[AnalysisEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: AnalysisEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    # --- Хранение на диске ---
+
+    def load(self):
+        """Читает кэш из файла; отсутствующий или битый файл - пустой кэш."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            entries = [(key, _entry_from_json(value)) for key, value in data.items()]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return
+        for key, entry in entries[-self.max_entries:]:
+            if ":move:" not in key:  # ходы ИИ старых версий больше не читаются
+                self._entries[key] = entry
+
+    def save(self):
+        """Записывает кэш в файл (порядок записей сохраняет LRU)."""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({key: _entry_to_json(entry) for key, entry in self._entries.items()}, f)
+        os.replace(tmp_path, self.path)
+
+
+def _score_to_json(score: chess.engine.Score) -> dict:
+    return {"mate": score.mate()} if score.is_mate() else {"cp": score.score()}
+
+
+def _score_from_json(data: dict) -> chess.engine.Score:
+    return chess.engine.Mate(data["mate"]) if "mate" in data else chess.engine.Cp(data["cp"])
+
+
+def _entry_to_json(entry: AnalysisEntry) -> dict:
+    return {
+        "move": entry.best_move.uci() if entry.best_move else None,
+        "lines": [
+            {"depth": line.depth, "score": _score_to_json(line.score), "pv": [move.uci() for move in line.pv]}
+            for line in entry.lines
+        ],
+        "complete": entry.complete,
+    }
+
+
+def _entry_from_json(data: dict) -> AnalysisEntry:
+    lines = [
+        AnalysisLine(line["depth"], _score_from_json(line["score"]), [chess.Move.from_uci(uci) for uci in line["pv"]])
+        for line in data["lines"]
+    ]
+    best_move = chess.Move.from_uci(data["move"]) if data["move"] else None
+    return AnalysisEntry(best_move, lines, data.get("complete", True))
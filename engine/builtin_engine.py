@@ -0,0 +1,112 @@
+import chess
+import chess.engine
+from typing import Optional
+
+from Board import Board
+from moves import move_to_uci
+from search import MATE_SCORE, Searcher, SearchResult
+from transposition import TranspositionTable
+from engine.analysis import AnalysisLine, BuiltinAnalysis
+from engine.engine_options import EngineOptions
+
+
+class BuiltinEngine:
+    """
+    Встроенный движок (alpha-beta из src/search.py) с тем же интерфейсом,
+    что и StockfishEngine. Не запускает внешних процессов, поэтому подходит
+    для машин, где Stockfish недоступен или его нельзя запускать.
+    """
+    def __init__(self, skill_level: int = 10, search_time: float = 1.0, hash_mb: int = 16,
+                 options: Optional[EngineOptions] = None):
+        self.skill_level = min(max(skill_level, 0), 20)
+        self.search_time = search_time
+        self.options = options or EngineOptions(hash_mb=hash_mb)
+        self.searcher = Searcher(TranspositionTable(self.options.hash_mb or hash_mb))
+        self.last_result: Optional[SearchResult] = None
+
+    def configure(self, skill_level: int, search_time: float, options: Optional[EngineOptions] = None):
+        """
+        Тот же интерфейс, что у StockfishEngine. Поиск однопоточный: из ресурсов
+        учитывается только размер хэша (и пределы по узлам/глубине).
+        """
+        self.skill_level = min(max(skill_level, 0), 20)
+        self.search_time = search_time
+        if options is not None:
+            self.options = options
+            if options.hash_mb and options.hash_mb != self.searcher.tt.size_mb:
+                self.searcher.tt.resize(options.hash_mb)
+
+    @property
+    def max_depth(self) -> int:
+        """Уровень сложности ограничивает глубину: 0 -> 1 полуход, 20 -> 11."""
+        depth = 1 + self.skill_level // 2
+        return min(depth, self.options.depth) if self.options.depth else depth
+
+    def find_best_move(self, lib_board: chess.Board) -> Optional[chess.Move]:
+        """
+        Находит лучший ход. Ходы партии переигрываются от начальной позиции,
+        чтобы поиск видел повторения (ничья троекратным повторением).
+        """
+        return self._search(self._board_from_lib(lib_board))
+
+    @staticmethod
+    def _board_from_lib(lib_board: chess.Board) -> Board:
+        root = lib_board.root()
+        board = Board(is_chess960=lib_board.chess960)
+        # В 960 FEN корня - X-FEN: по нему ставятся и вертикали ладей для рокировки
+        board.load_from_fen(root.fen())
+        for lib_move in lib_board.move_stack:
+            board.make_move(board.move_from_uci(root.uci(lib_move)))
+            root.push(lib_move)
+        return board
+
+    def find_best_move_from_fen(self, fen: str, chess960: bool = False) -> Optional[chess.Move]:
+        """Находит лучший ход для позиции, представленной в виде FEN-строки (в 960 - X-FEN или Shredder-FEN)."""
+        board = Board(is_chess960=chess960)
+        board.load_from_fen(fen)
+        return self._search(board)
+
+    def _search(self, board: Board) -> Optional[chess.Move]:
+        result = self.searcher.search(board, max_depth=self.max_depth, max_nodes=self.options.nodes,
+                                      move_time=None if self.options.nodes else self.search_time)
+        self.last_result = result
+        if result.best_move is None:
+            return None
+        # В 960 рокировка - ход короля на свою ладью, как ее ждет chess.Board(chess960=True)
+        return chess.Move.from_uci(move_to_uci(result.best_move, board.is_chess960))
+
+    def start_analysis(self, lib_board: chess.Board, multipv: int = 1, depth: Optional[int] = None,
+                       nodes: Optional[int] = None) -> BuiltinAnalysis:
+        """Потоковый анализ для подсказок (всегда одна линия, см. BuiltinAnalysis)."""
+        return BuiltinAnalysis(self, self._board_from_lib(lib_board), depth, nodes)
+
+    def analyse(self, lib_board: chess.Board, depth: Optional[int] = None, nodes: Optional[int] = None,
+                time: Optional[float] = None) -> AnalysisLine:
+        """Оценка позиции и главный вариант (для разбора партии)."""
+        result = self.searcher.search(self._board_from_lib(lib_board), max_depth=depth, max_nodes=nodes, move_time=time)
+        self.last_result = result
+        return self.to_analysis_line(result, lib_board.chess960)
+
+    @staticmethod
+    def to_analysis_line(result: SearchResult, chess960: bool = False) -> AnalysisLine:
+        if result.is_mate:
+            plies = MATE_SCORE - abs(result.score)
+            score = chess.engine.Mate((plies + 1) // 2 if result.score > 0 else -(plies // 2))
+        else:
+            score = chess.engine.Cp(result.score)
+        return AnalysisLine(result.depth, score, [chess.Move.from_uci(move_to_uci(move, chess960)) for move in result.pv])
+
+    @property
+    def nodes_per_second(self) -> int:
+        """Скорость последнего поиска (узлов в секунду)."""
+        return self.last_result.nps if self.last_result else 0
+
+    def new_game(self):
+        """Новая партия: результаты прошлой партии в таблице транспозиций не нужны."""
+        self.searcher.tt.clear()
+
+    def stop_pondering(self):
+        """Встроенный движок не думает на ходу соперника."""
+
+    def close(self):
+        """Внешнего процесса нет - закрывать нечего."""
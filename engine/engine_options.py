@@ -0,0 +1,56 @@
+import os
+from typing import NamedTuple, Optional
+
+# Верхняя граница хэша по умолчанию: больше нужно только для долгого анализа
+MAX_AUTO_HASH_MB = 1024
+HASH_MB_PER_THREAD = 64
+
+
+def auto_threads() -> int:
+    """Все ядра, кроме одного: интерфейс и ввод остаются отзывчивыми."""
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def auto_hash_mb(threads: int) -> int:
+    return min(MAX_AUTO_HASH_MB, HASH_MB_PER_THREAD * threads)
+
+
+class EngineOptions(NamedTuple):
+    """
+    Ресурсы и пределы поиска движка. None - автоопределение (потоки, хэш)
+    или "не задано" (пределы). Если задан предел по узлам или глубине,
+    он заменяет время на ход (search_time).
+    """
+    threads: Optional[int] = None
+    hash_mb: Optional[int] = None
+    move_overhead: Optional[int] = None  # мс, запас на задержки ввода-вывода
+    nodes: Optional[int] = None
+    depth: Optional[int] = None
+    syzygy_path: Optional[str] = None  # папка таблиц Syzygy (Stockfish использует их и в поиске)
+
+    def resolved_threads(self) -> int:
+        return self.threads or auto_threads()
+
+    def resolved_hash_mb(self) -> int:
+        return self.hash_mb or auto_hash_mb(self.resolved_threads())
+
+    def uci_options(self) -> dict:
+        """Опции UCI для Stockfish."""
+        options = {"Threads": self.resolved_threads(), "Hash": self.resolved_hash_mb()}
+        if self.move_overhead is not None:
+            options["Move Overhead"] = self.move_overhead
+        if self.syzygy_path:
+            options["SyzygyPath"] = self.syzygy_path
+        return options
+
+    @classmethod
+    def from_config(cls, config: dict) -> "EngineOptions":
+        """Настройки из settings.json (ключи engine_*)."""
+        return cls(
+            threads=config.get('engine_threads'),
+            hash_mb=config.get('engine_hash_mb'),
+            move_overhead=config.get('engine_move_overhead'),
+            nodes=config.get('engine_nodes'),
+            depth=config.get('engine_depth'),
+            syzygy_path=config.get('syzygy_path'),
+        )
@@ -0,0 +1,76 @@
+import queue
+import threading
+from typing import Callable, List, Optional
+
+from engine.stockfish_engine import StockfishEngine
+from engine.engine_options import EngineOptions
+
+
+class EnginePool:
+    """
+    Долгоживущие процессы движка, которыми владеет приложение (main.py).
+
+    Движки запускаются в фоне сразу при создании пула, поэтому к началу
+    партии они уже прогреты (загружена сеть NNUE). acquire() отдает свободный
+    движок, настроенный на нужный уровень и время, и начинает для него новую
+    партию (ucinewgame); release() возвращает движок в пул. Упавший процесс
+    перезапускается при выдаче.
+    """
+    def __init__(self, size: int = 1, factory: Callable[[], StockfishEngine] = StockfishEngine):
+        self.size = size
+        self._factory = factory
+        self._idle: "queue.Queue[StockfishEngine]" = queue.Queue()
+        self._engines: List[StockfishEngine] = []
+        self._error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._warm_up = threading.Thread(target=self._start_engines, daemon=True)
+        self._warm_up.start()
+
+    def _start_engines(self):
+        for _ in range(self.size):
+            try:
+                engine = self._factory()
+                engine.is_alive() # isready: Stockfish загружает сеть до начала партии
+            except (FileNotFoundError, RuntimeError) as e:
+                # Запомним ошибку: acquire() пробросит ее, и игра выберет встроенный движок
+                self._error = e
+                return
+            with self._lock:
+                self._engines.append(engine)
+            self._idle.put(engine)
+
+    def acquire(self, skill_level: int, search_time: float, options: Optional[EngineOptions] = None,
+                timeout: Optional[float] = None) -> StockfishEngine:
+        """
+        Выдает движок для новой партии. Если Stockfish не запускается,
+        выбрасывает ту же ошибку, что и конструктор StockfishEngine.
+        """
+        self._warm_up.join()
+        if self._error is not None and not self._engines:
+            raise self._error
+        engine = self._idle.get(timeout=timeout)
+        if not engine.is_alive():
+            try:
+                engine.restart()
+            except RuntimeError:
+                self._idle.put(engine) # Попробуем перезапустить при следующей выдаче
+                raise
+        engine.configure(skill_level, search_time, options)
+        engine.new_game()
+        return engine
+
+    def release(self, engine: StockfishEngine):
+        """Возвращает движок в пул после партии."""
+        engine.stop_pondering() # Простаивающий движок не должен занимать процессор
+        self._idle.put(engine)
+
+    def close(self):
+        """Завершает все процессы (при выходе из приложения)."""
+        self._warm_up.join()
+        with self._lock:
+            engines, self._engines = self._engines, []
+        for engine in engines:
+            try:
+                engine.close()
+            except Exception:
+                pass # Процесс уже завершился
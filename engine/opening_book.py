@@ -0,0 +1,49 @@
+import os
+import random
+from typing import List, NamedTuple, Optional
+
+import chess
+import chess.polyglot
+
+
+class BookMove(NamedTuple):
+    move: chess.Move
+    weight: int
+
+
+class OpeningBook:
+    """
+    Дебютная книга в формате Polyglot (.bin). Файл отображается в память
+    (mmap), записи ищутся двоичным поиском по polyglot-хэшу позиции, так
+    что ход из книги находится за микросекунды и без движка. Ход выбирается
+    случайно с учетом весов - дебюты разных партий не повторяются.
+    """
+    def __init__(self, path: str, rng: Optional[random.Random] = None):
+        self.path = path
+        self.random = rng or random.Random()
+        self._reader = chess.polyglot.open_reader(path)
+
+    @classmethod
+    def open(cls, path: Optional[str]) -> Optional["OpeningBook"]:
+        """Книга по пути из настроек; None, если пути нет или файл не читается."""
+        if not path or not os.path.isfile(path):
+            return None
+        try:
+            return cls(path)
+        except OSError:
+            return None
+
+    def moves(self, board: chess.Board) -> List[BookMove]:
+        """Ходы книги в позиции, по убыванию веса (пусто - позиции нет в книге)."""
+        entries = [BookMove(entry.move, entry.weight) for entry in self._reader.find_all(board)]
+        return sorted(entries, key=lambda entry: entry.weight, reverse=True)
+
+    def choose(self, board: chess.Board) -> Optional[chess.Move]:
+        """Случайный ход книги с учетом весов; None - позиция вне книги."""
+        entries = self.moves(board)
+        if not entries:
+            return None
+        return self.random.choices([entry.move for entry in entries], [entry.weight for entry in entries])[0]
+
+    def close(self):
+        self._reader.close()
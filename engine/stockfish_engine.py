@@ -1,32 +1,111 @@
+import asyncio
 import chess
 import chess.engine
+import chess.polyglot
 import platform
 import os
-from typing import Optional, TYPE_CHECKING
+import time
+from typing import NamedTuple, Optional, TYPE_CHECKING
+
+from engine.analysis import AnalysisLine, StockfishAnalysis
+from engine.engine_options import EngineOptions
 
 # Этот импорт нужен только для аннотаций типов, чтобы избежать циклической зависимости.
 if TYPE_CHECKING:
     from Board import Board
 
+class _Ponder(NamedTuple):
+    """Идущее обдумывание: позиция после ожидаемого ответа игрока и сам анализ."""
+    board: chess.Board
+    analysis: chess.engine.AnalysisResult
+    started: float
+
+
 class StockfishEngine:
     """
     Обертка для движка Stockfish. Автоматически находит исполняемый файл
     для текущей ОС и управляет взаимодействием с ним.
+
+    Пока игрок думает, движок обдумывает позицию после ожидаемого ответа
+    (ponder-ход из bestmove). Если игрок сыграл этот ход (ponderhit), ответ
+    готов почти сразу, иначе обдумывание останавливается и поиск идет заново.
+    Обдумывание - корутины на асинхронном протоколе python-chess
+    (chess.engine.popen_uci), цикл которого SimpleEngine держит в своем потоке,
+    поэтому вызовы игры остаются синхронными и не блокируют ввод.
     """
-    def __init__(self, skill_level: int = 10, search_time: float = 1.0):
-        self.engine_path = self._get_stockfish_path()
+    def __init__(self, skill_level: int = 10, search_time: float = 1.0, ponder: bool = True,
+                 engine_path: Optional[str] = None, options: Optional[EngineOptions] = None):
+        self.ponder = ponder
+        self.options = options or EngineOptions()
+        self.ponderhits = 0
+        self._ponder: Optional[_Ponder] = None
+        self.engine_path = engine_path or self._get_stockfish_path()
         if not self.engine_path:
             # Выбрасываем стандартную ошибку. Game класс её поймает и локализует.
             raise FileNotFoundError("Stockfish executable not found in engine directory.")
         
+        self._start()
+        self.configure(skill_level, search_time)
+
+    def _start(self):
+        """Запускает процесс движка."""
         try:
             self.engine = chess.engine.SimpleEngine.popen_uci(self.engine_path)
-        except chess.engine.EngineError as e:
+        except (chess.engine.EngineError, OSError) as e:
             # То же самое - стандартная ошибка для перехвата.
             raise RuntimeError(f"Failed to start Stockfish. Is it executable? Original error: {e}")
+        # Объект-идентификатор партии: python-chess шлет ucinewgame, когда он меняется
+        self.game = object()
+        self._ponder = None
 
-        self.engine.configure({"Skill Level": min(max(skill_level, 0), 20)})
+    def configure(self, skill_level: int, search_time: float, options: Optional[EngineOptions] = None):
+        """
+        Настраивает уровень, время на ход и ресурсы (потоки, хэш). Движок из
+        пула переиспользуется между партиями; без `options` ресурсы не меняются.
+        """
+        self.stop_pondering()
+        self.skill_level = min(max(skill_level, 0), 20)
         self.search_time = search_time
+        if options is not None:
+            self.options = options
+        uci_options = {"Skill Level": self.skill_level, **self.options.uci_options()}
+        # Опции, которых нет у движка (другая сборка или версия), пропускаем
+        self.engine.configure({name: value for name, value in uci_options.items() if name in self.engine.options})
+
+    def _limit(self) -> chess.engine.Limit:
+        """Предел поиска хода: узлы или глубина из настроек, иначе время на ход."""
+        if self.options.nodes or self.options.depth:
+            return chess.engine.Limit(nodes=self.options.nodes, depth=self.options.depth)
+        return chess.engine.Limit(time=self.search_time)
+
+    def _ponder_reached_limit(self, info: dict) -> bool:
+        if self.options.depth:
+            return info.get("depth", 0) >= self.options.depth
+        if self.options.nodes:
+            return info.get("nodes", 0) >= self.options.nodes
+        return True
+
+    def new_game(self):
+        """Следующий запрос к движку начнется с ucinewgame (сброс хэша и истории)."""
+        self.stop_pondering()
+        self.game = object()
+
+    def is_alive(self) -> bool:
+        """Отвечает ли процесс движка."""
+        try:
+            self.engine.ping()
+            return True
+        except (chess.engine.EngineError, chess.engine.EngineTerminatedError, OSError):
+            return False
+
+    def restart(self):
+        """Перезапускает упавший движок с прежними настройками."""
+        try:
+            self.engine.close()
+        except Exception:
+            pass # Процесс уже мертв
+        self._start()
+        self.configure(self.skill_level, self.search_time)
 
     def _get_stockfish_path(self) -> Optional[str]:
         """Находит путь к исполняемому файлу Stockfish в этой же папке."""
@@ -45,12 +124,92 @@ class StockfishEngine:
             
         return path if os.path.exists(path) else None
 
-    def find_best_move_from_fen(self, fen: str) -> chess.Move:
-        """Находит лучший ход для позиции, представленной в виде FEN-строки."""
-        lib_board = chess.Board(fen)
-        result = self.engine.play(lib_board, chess.engine.Limit(time=self.search_time))
-        return result.move
+    def find_best_move(self, board: chess.Board) -> chess.Move:
+        """
+        Находит лучший ход. Доска передается вместе со стеком ходов: движок
+        получает `position startpos moves ...` и видит повторения позиций.
+        """
+        try:
+            return self._run(self._think(board))
+        except chess.engine.EngineTerminatedError:
+            # Движок упал посреди партии - перезапускаем и спрашиваем еще раз
+            self.restart()
+            return self._run(self._think(board))
+
+    def find_best_move_from_fen(self, fen: str, chess960: bool = False) -> chess.Move:
+        """Находит лучший ход для позиции, представленной в виде FEN-строки (без истории)."""
+        return self.find_best_move(chess.Board(fen, chess960=chess960))
+
+    def start_analysis(self, board: chess.Board, multipv: int = 3, depth: Optional[int] = None,
+                       nodes: Optional[int] = None) -> StockfishAnalysis:
+        """
+        Запускает потоковый MultiPV-анализ (для подсказок). Без ограничений
+        глубины и узлов анализ идет, пока его не остановят.
+        """
+        self.stop_pondering()
+        limit = chess.engine.Limit(depth=depth, nodes=nodes) if depth or nodes else None
+        return StockfishAnalysis(self.engine.analysis(board, limit, multipv=multipv, game=self.game))
+
+    def analyse(self, board: chess.Board, depth: Optional[int] = None, nodes: Optional[int] = None,
+                time: Optional[float] = None) -> AnalysisLine:
+        """Оценка позиции и главный вариант (для разбора партии)."""
+        self.stop_pondering()
+        info = self.engine.analyse(board, chess.engine.Limit(depth=depth, nodes=nodes, time=time), game=self.game)
+        return AnalysisLine(info.get("depth", 0), info["score"].relative, info.get("pv", []))
+
+    def _run(self, coro):
+        """Выполняет корутину в цикле asyncio движка и ждет результат."""
+        loop = self.engine.protocol.loop
+        if loop.is_closed():
+            coro.close()
+            # SimpleEngine закрывает цикл, когда процесс движка умирает
+            raise chess.engine.EngineTerminatedError("engine event loop dead")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    async def _think(self, board: chess.Board) -> chess.Move:
+        ponder, self._ponder = self._ponder, None
+        best = None
+        if ponder is not None:
+            ponderhit = chess.polyglot.zobrist_hash(ponder.board) == chess.polyglot.zobrist_hash(board)
+            if ponderhit and not (self.options.nodes or self.options.depth):
+                # Поиск в этой позиции уже идет - добираем оставшееся время
+                left = self.search_time - (time.perf_counter() - ponder.started)
+                if left > 0:
+                    await asyncio.sleep(left)
+            # При промахе (игрок сыграл другой ход) анализ просто останавливаем
+            ponder.analysis.stop()
+            pondered = await ponder.analysis.wait()
+            if ponderhit and pondered.move in board.legal_moves and self._ponder_reached_limit(ponder.analysis.info):
+                self.ponderhits += 1
+                best = pondered
+
+        if best is None:
+            best = await self.engine.protocol.play(board, self._limit(), game=self.game)
+        if self.ponder and best.move and best.ponder:
+            await self._start_pondering(board, best.move, best.ponder)
+        return best.move
+
+    async def _start_pondering(self, board: chess.Board, move: chess.Move, expected_reply: chess.Move):
+        expected = board.copy()
+        expected.push(move)
+        if expected_reply not in expected.legal_moves:
+            return
+        expected.push(expected_reply)
+        analysis = await self.engine.protocol.analysis(expected, game=self.game)
+        self._ponder = _Ponder(expected, analysis, time.perf_counter())
+
+    def stop_pondering(self):
+        """Останавливает обдумывание (перед подсказкой, сменой партии, выходом)."""
+        if self._ponder is not None:
+            self._run(self._stop_pondering())
+
+    async def _stop_pondering(self):
+        ponder, self._ponder = self._ponder, None
+        if ponder is not None:
+            ponder.analysis.stop()
+            await ponder.analysis.wait()
 
     def close(self):
         """Корректно завершает работу движка."""
+        self.stop_pondering()
         self.engine.quit()
\ No newline at end of file
@@ -0,0 +1,78 @@
+import os
+from typing import NamedTuple, Optional
+
+import chess
+import chess.syzygy
+
+# WDL с точки зрения стороны, которая ходит; ±1 - выигрыш/проигрыш, который
+# не успевает до правила 50 ходов (ничья при правильной игре обеих сторон)
+WIN, CURSED_WIN, DRAW, BLESSED_LOSS, LOSS = 2, 1, 0, -1, -2
+
+
+class TablebaseResult(NamedTuple):
+    wdl: int
+    dtz: int  # полуходов до обнуления счетчика 50 ходов (взятие или ход пешкой) при лучшей игре
+
+
+class Tablebase:
+    """
+    Эндшпильные таблицы Syzygy из локальной папки. В позиции с числом фигур
+    не больше, чем в таблицах, результат (WDL) и расстояние до обнуления
+    (DTZ) известны точно, а лучший ход находится перебором ответов в
+    таблицах - без поиска движка.
+    """
+    def __init__(self, tables, max_pieces: int):
+        self.tables = tables  # chess.syzygy.Tablebase (или объект с probe_wdl / probe_dtz)
+        self.max_pieces = max_pieces
+
+    @classmethod
+    def open(cls, directory: Optional[str]) -> Optional["Tablebase"]:
+        """Таблицы из папки настроек; None, если папки нет или таблиц в ней нет."""
+        if not directory or not os.path.isdir(directory):
+            return None
+        tables = chess.syzygy.Tablebase()
+        try:
+            tables.add_directory(directory)
+        except OSError:
+            return None
+        if not tables.wdl:
+            return None
+        # Имя таблицы - фигуры сторон через 'v', например KRPvKR
+        return cls(tables, max(len(name) - 1 for name in tables.wdl))
+
+    def probe(self, board: chess.Board) -> Optional[TablebaseResult]:
+        """Точный результат позиции; None - фигур больше, чем в таблицах, или таблицы нет."""
+        if chess.popcount(board.occupied) > self.max_pieces or board.castling_rights:
+            return None
+        try:
+            return TablebaseResult(self.tables.probe_wdl(board), self.tables.probe_dtz(board))
+        except KeyError:  # MissingTableError - нужной таблицы нет в папке
+            return None
+
+    def best_move(self, board: chess.Board) -> Optional[chess.Move]:
+        """
+        Лучший ход по таблицам: сохраняет лучший результат; при выигрыше - мат,
+        затем ход, обнуляющий счетчик 50 ходов, затем кратчайший DTZ; при
+        проигрыше - самое долгое сопротивление. None - позиция вне таблиц.
+        """
+        if self.probe(board) is None:
+            return None
+        best, best_key = None, None
+        for move in board.legal_moves:
+            zeroing = board.is_zeroing(move)
+            board.push(move)
+            try:
+                mate = board.is_checkmate()
+                reply = self.probe(board)
+            finally:
+                board.pop()
+            if reply is None:
+                return None  # ответ ведет в отсутствующую таблицу - пусть решает движок
+            # Оценки ответа - за соперника: меньший DTZ соперника лучше для нас
+            key = (-reply.wdl, mate, zeroing == (reply.wdl < 0), reply.dtz)
+            if best_key is None or key > best_key:
+                best, best_key = move, key
+        return best
+
+    def close(self):
+        self.tables.close()
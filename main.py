@@ -1,20 +1,58 @@
 import os
 import sys
 import json
+import datetime
+from typing import NamedTuple, Optional
 
 # Добавляем 'src' в путь
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from localization import LocalizationManager
-from game_vs_stockfish import GameVsStockfish, WHITE, BLACK, board_to_fen
+from game_vs_stockfish import GameVsStockfish, WHITE, BLACK
 from game_with_hints import GameWithHints
 from Board import Board
 from game960 import Game960
+from engine.engine_pool import EnginePool
+from engine.analysis_cache import AnalysisCache
+from engine.engine_options import EngineOptions
+from engine.opening_book import OpeningBook
+from engine.tablebase import Tablebase
+from engine.builtin_engine import BuiltinEngine
+from game_record import GameRecord
+from game_library import GameLibrary, GameFilter, LibraryRecord, IMPORTED_MODE, UNFINISHED
+from pgn import write_game
 
 # --- Константы и вспомогательные функции для сохранения ---
 USER_DATA_DIR = "user_data"
 SETTINGS_FILE = os.path.join(USER_DATA_DIR, "settings.json")
-SAVED_GAME_FILE = os.path.join(USER_DATA_DIR, "saved_game.json")
+SAVED_GAME_FILE = os.path.join(USER_DATA_DIR, "saved_game.json")  # старое сохранение одной партии
+LIBRARY_FILE = os.path.join(USER_DATA_DIR, "games.sqlite3")
+# Законченные партии дописываются сюда в PGN (None в settings.json - не писать)
+PGN_ARCHIVE_FILE = os.path.join(USER_DATA_DIR, "finished_games.pgn")
+ANALYSIS_CACHE_FILE = os.path.join(USER_DATA_DIR, "analysis_cache.json")
+# Дебютная книга Polyglot: положите .bin-файл сюда или укажите путь в settings.json
+OPENING_BOOK_FILE = os.path.join("engine", "book.bin")
+MAX_HINT_LINES = 5
+GAME_CLASSES = {cls.__name__: cls for cls in (GameVsStockfish, GameWithHints, Game960)}
+# Значения для меню ресурсов движка (None - авто / значение движка)
+ENGINE_HASH_CHOICES = [None, 16, 64, 256, 1024]
+ENGINE_OVERHEAD_CHOICES = [None, 10, 50, 100, 300]
+# (узлы, глубина): (None, None) - время на ход из уровня сложности
+ENGINE_LIMIT_CHOICES = [(None, None), (100_000, None), (1_000_000, None), (None, 12), (None, 18)]
+# Фильтры библиотеки партий (None - любое значение)
+LIBRARY_MODE_CHOICES = [None] + list(GAME_CLASSES) + [IMPORTED_MODE]
+LIBRARY_RESULT_CHOICES = [None, UNFINISHED, "1-0", "0-1", "1/2-1/2"]
+LIBRARY_PAGE_SIZE = 15
+
+
+class AppContext(NamedTuple):
+    """Общие объекты приложения: живут все время работы и передаются каждой партии."""
+    engine_pool: EnginePool
+    analysis_cache: AnalysisCache
+    opening_book: Optional[OpeningBook]
+    tablebase: Optional[Tablebase]
+    library: GameLibrary
+
 
 def ensure_user_data_dir():
     if not os.path.exists(USER_DATA_DIR):
@@ -38,74 +76,138 @@ def load_config() -> tuple:
         return default_config, None
 
 def get_default_config() -> tuple:
-    return {'highlighting': True, 'flip_board': True, 'piece_set': 'unicode', 'board_style': 'classic'}, "ru"
+    return {'highlighting': True, 'flip_board': True, 'piece_set': 'unicode', 'board_style': 'classic',
+            'hint_lines': 3, 'hint_depth': 20, 'hint_nodes': None,
+            'analysis_cache_size': 5000, 'analysis_cache_persist': True,
+            'opening_book': OPENING_BOOK_FILE,
+            'syzygy_path': None,  # папка с таблицами Syzygy (*.rtbw, *.rtbz)
+            'pgn_archive': PGN_ARCHIVE_FILE,
+            # Ресурсы движка: None - автоопределение по os.cpu_count() / значение движка
+            'engine_threads': None, 'engine_hash_mb': None, 'engine_move_overhead': None,
+            'engine_nodes': None, 'engine_depth': None}, "ru"
+
+def apply_game_config(game, config: dict):
+    """Передает игре настройки отображения и подсказок."""
+    game.render_config = config
+    game.configure_engine(EngineOptions.from_config(config))
+    if isinstance(game, GameWithHints):
+        game.hint_lines = config.get('hint_lines', 3)
+        game.hint_depth = config.get('hint_depth')
+        game.hint_nodes = config.get('hint_nodes')
 
-def save_game_state(game):
-    """Сохраняет состояние игры в файл."""
-    state = {
+def game_info(game) -> dict:
+    """Данные партии для библиотеки (позиция и ходы пишутся отдельно, см. GameLibrary)."""
+    skill_level = game.engine.skill_level if hasattr(game.engine, 'skill_level') else 5
+    engine_name = "Built-in engine" if isinstance(game.engine, BuiltinEngine) else "Stockfish"
+    opponent = f"{engine_name} (level {skill_level})"
+    return {
         "game_type": game.__class__.__name__,
         "player_color": game.player_color,
-        "skill_level": game.engine.skill_level if hasattr(game.engine, 'skill_level') else 5,
+        "skill_level": skill_level,
         "lang": game.localizer.lang,
-        "fen": board_to_fen(game.board)
+        "white": "Player" if game.player_color == WHITE else opponent,
+        "black": "Player" if game.player_color == BLACK else opponent,
     }
-    with open(SAVED_GAME_FILE, 'w', encoding='utf-8') as f:
-        json.dump(state, f, indent=4)
+
+def create_game(game_class, context: AppContext, player_color: str, skill_level: int, lang: str):
+    """Создает игру с общими объектами приложения."""
+    extra = {}
+    if issubclass(game_class, GameWithHints):
+        # Подсказки показывают статистику позиции по партиям библиотеки
+        extra['position_index'] = context.library.positions
+    return game_class(
+        player_color=player_color, skill_level=skill_level, lang=lang,
+        engine_pool=context.engine_pool, analysis_cache=context.analysis_cache,
+        opening_book=context.opening_book, tablebase=context.tablebase, **extra
+    )
+
+def migrate_saved_game(library: GameLibrary, localizer: LocalizationManager, path: str = SAVED_GAME_FILE):
+    """
+    Переносит сохранение старого формата (одна партия в user_data) в
+    библиотеку. Файлы удаляются, только когда партия уже в библиотеке;
+    нечитаемое сохранение откладывается в сторону (.bad), а не теряется.
+    """
+    if not os.path.exists(path):
+        return
+    try:
+        record, info, board = GameRecord.load(path)
+    except (KeyError, ValueError) as e:
+        print(localizer.get("saved_game_unreadable", path=GameRecord(path).set_aside(), error=e))
+        return
+    library.start_game(board, info)
+    record.delete()
+
+def save_game_state(game, record: LibraryRecord):
+    """Сохраняет состояние игры: дописывает в запись последние ходы."""
+    record.sync(game.board)
     print(game.localizer.get("game_saved_message"))
 
-def start_game_instance(game_instance):
+def archive_game(game, path: str):
+    """Дописывает законченную партию в PGN-архив."""
+    info = game_info(game)
+    headers = {"Event": "Terminal Chess", "Date": datetime.date.today().strftime("%Y.%m.%d"),
+               "White": info["white"], "Black": info["black"],
+               "Termination": game.board.get_game_status()}
+    with open(path, 'a', encoding='utf-8') as f:
+        write_game(f, game.board, headers)
+
+def start_game_instance(game_instance, record: LibraryRecord, pgn_archive: Optional[str] = None):
     """Принимает созданный экземпляр игры и запускает его основной цикл."""
     game_active = True
     try:
         while game_instance.board.get_game_status() == 'in_progress' and game_active:
+            # Автосохранение: каждый ход - 2 байта в записи партии в библиотеке, переживает сбой
+            record.sync(game_instance.board)
             game_instance.renderer.draw_board(game_instance.board, game_instance.last_move)
             if game_instance.board.color_to_move == game_instance.player_color:
                 game_active = game_instance._player_turn()
             else:
                 game_instance._ai_turn()
         
-        # Если игра завершилась, а не была прервана для сохранения
-        if game_active and os.path.exists(SAVED_GAME_FILE):
-            os.remove(SAVED_GAME_FILE)
+        # Если игра завершилась, а не была прервана для сохранения - записываем результат
+        if game_active:
+            record.finish(game_instance.board)
+            if pgn_archive:
+                archive_game(game_instance, pgn_archive)
     finally:
         if not game_active: # Если игрок решил выйти и сохранить
-            save_game_state(game_instance)
+            save_game_state(game_instance, record)
         
-        game_instance.engine.close()
-        # Показываем финальную доску
+        game_instance.close_engine()
+        game_instance.analysis_cache.save()
+        # Показываем финальную доску целиком: под прошлым кадром были ввод и сообщения
+        game_instance.renderer.invalidate()
         game_instance.renderer.draw_board(game_instance.board)
         input(game_instance.localizer.get("press_enter_to_continue"))
 
-def continue_game(config: dict, localizer: LocalizationManager):
-    """Загружает и продолжает сохраненную игру."""
-    if not os.path.exists(SAVED_GAME_FILE):
+def continue_game(config: dict, localizer: LocalizationManager, context: AppContext,
+                  game_id: Optional[int] = None):
+    """Продолжает партию из библиотеки (по умолчанию - последнюю недоигранную)."""
+    library = context.library
+    if game_id is None:
+        latest = library.latest_unfinished()
+        game_id = latest.id if latest else None
+    if game_id is None:
         print(localizer.get("no_saved_game"))
         input(localizer.get("press_enter_to_continue"))
         return
 
-    try:
-        with open(SAVED_GAME_FILE, 'r', encoding='utf-8') as f:
-            state = json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError): # На случай битого файла
-        os.remove(SAVED_GAME_FILE)
-        return
+    record, state, board = library.resume(game_id)
+    game_class = GAME_CLASSES.get(state.mode, GameWithHints)
+    game = create_game(game_class, context, state.player_color, state.skill_level, localizer.lang)
+    apply_game_config(game, config)
+    # Доска восстановлена вместе с историей: работают отмена хода и повторения позиций
+    game.board = board
+    game.last_move = board.history[-1].move if board.history else None
+    start_game_instance(game, record, config.get('pgn_archive'))
 
-    game_class = GameVsStockfish if state.get('game_type') == 'GameVsStockfish' else GameWithHints
-    game = game_class(
-        player_color=state['player_color'], skill_level=state['skill_level'], lang=state['lang']
-    )
-    game.render_config = config
-    game.board.load_from_fen(state['fen'])
-    start_game_instance(game)
-
-def start_new_game(game_class, localizer: LocalizationManager, config: dict):
-    """Создает новую игру и запускает ее."""
+def start_new_game(game_class, localizer: LocalizationManager, config: dict, context: AppContext):
+    """Создает новую игру, добавляет ее в библиотеку и запускает."""
     player_color, skill_level = get_game_settings(localizer)
-    game = game_class(
-        player_color=player_color, skill_level=skill_level, lang=localizer.lang
-    )
-    game.render_config = config
-    start_game_instance(game)
+    game = create_game(game_class, context, player_color, skill_level, localizer.lang)
+    apply_game_config(game, config)
+    record = context.library.start_game(game.board, game_info(game))
+    start_game_instance(game, record, config.get('pgn_archive'))
 
 def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -173,9 +275,11 @@ def show_settings(localizer: LocalizationManager, config: dict) -> tuple:
         print(f"3. {localizer.get('settings_option_flip', status=flip_status)}")
         print(f"4. {localizer.get('settings_option_pieces', style=piece_style)}")
         print(f"5. {localizer.get('settings_option_board_style', style=board_style)}")
-        print(f"6. {localizer.get('settings_option_future1')}")
-        print(f"7. {localizer.get('settings_option_future2')}")
-        print(f"8. {localizer.get('settings_option_back')}")
+        print(f"6. {localizer.get('settings_option_hint_lines', count=config.get('hint_lines', 3))}")
+        print(f"7. {localizer.get('settings_option_engine')}")
+        print(f"8. {localizer.get('settings_option_future1')}")
+        print(f"9. {localizer.get('settings_option_future2')}")
+        print(f"10. {localizer.get('settings_option_back')}")
         
         print("\n" + ("-"*25))
         print(localizer.get("author_credits"))
@@ -194,9 +298,13 @@ def show_settings(localizer: LocalizationManager, config: dict) -> tuple:
             config['piece_set'] = 'ascii' if config.get('piece_set') == 'unicode' else 'unicode'
         elif choice == '5':
              config['board_style'] = 'pretty' if config.get('board_style') == 'classic' else 'classic'
-        elif choice == '6' or choice == '7':
+        elif choice == '6':
+            config['hint_lines'] = config.get('hint_lines', 3) % MAX_HINT_LINES + 1
+        elif choice == '7':
+            show_engine_settings(localizer, config)
+        elif choice == '8' or choice == '9':
             input(f"\n{localizer.get('dev_notice')}")
-        elif choice == '8':
+        elif choice == '10':
             break # Выход из меню настроек
         else:
             print(localizer.get("invalid_settings_choice"))
@@ -205,35 +313,187 @@ def show_settings(localizer: LocalizationManager, config: dict) -> tuple:
     return localizer, config
 
 
-def main_menu(localizer: LocalizationManager, config: dict):
+def _next_choice(choices: list, current):
+    """Следующее значение по кругу (неизвестное текущее - первое значение)."""
+    index = choices.index(current) if current in choices else -1
+    return choices[(index + 1) % len(choices)]
+
+def show_engine_settings(localizer: LocalizationManager, config: dict):
+    """Подменю ресурсов движка. Значения перебираются по кругу, 'авто' - по числу ядер."""
+    cpu_count = os.cpu_count() or 1
+    thread_choices = [None] + sorted({n for n in (1, 2, 4, 8, 16, 32, 64) if n < cpu_count} | {cpu_count})
+    while True:
+        clear_screen()
+        options = EngineOptions.from_config(config)
+        auto = localizer.get('engine_value_auto')
+        default = localizer.get('engine_value_default')
+        threads = options.threads or f"{auto} ({options.resolved_threads()})"
+        hash_mb = options.hash_mb or f"{auto} ({options.resolved_hash_mb()})"
+        overhead = options.move_overhead if options.move_overhead is not None else default
+        if options.nodes:
+            limit = localizer.get('engine_limit_nodes', nodes=options.nodes)
+        elif options.depth:
+            limit = localizer.get('engine_limit_depth', depth=options.depth)
+        else:
+            limit = localizer.get('engine_limit_time')
+
+        print(f"--- {localizer.get('engine_settings_title')} ---")
+        print(f"1. {localizer.get('engine_option_threads', value=threads)}")
+        print(f"2. {localizer.get('engine_option_hash', value=hash_mb)}")
+        print(f"3. {localizer.get('engine_option_move_overhead', value=overhead)}")
+        print(f"4. {localizer.get('engine_option_limit', value=limit)}")
+        print(f"5. {localizer.get('engine_settings_back')}")
+
+        choice = input(">> ").strip()
+        if choice == '1':
+            config['engine_threads'] = _next_choice(thread_choices, options.threads)
+        elif choice == '2':
+            config['engine_hash_mb'] = _next_choice(ENGINE_HASH_CHOICES, options.hash_mb)
+        elif choice == '3':
+            config['engine_move_overhead'] = _next_choice(ENGINE_OVERHEAD_CHOICES, options.move_overhead)
+        elif choice == '4':
+            config['engine_nodes'], config['engine_depth'] = _next_choice(
+                ENGINE_LIMIT_CHOICES, (options.nodes, options.depth))
+        elif choice == '5':
+            break
+        else:
+            print(localizer.get("invalid_settings_choice"))
+            input()
+
+def _library_value(localizer: LocalizationManager, value, key_prefix: str = None) -> str:
+    """Значение фильтра для меню: None - 'любой', режимы - по названию из локали."""
+    if value is None:
+        return localizer.get('library_value_any')
+    return localizer.get(key_prefix + str(value)) if key_prefix else str(value)
+
+def _print_library_page(localizer: LocalizationManager, games: list):
+    print(localizer.get('library_columns'))
+    for game in games:
+        mode = localizer.get('library_mode_' + game.mode)
+        players = f"{game.white} - {game.black}"
+        print(f"{game.id:>5}  {game.played[:10]}  {mode:<14.14} {players:<40.40} {game.result:<8}"
+              f"{(game.plies + 1) // 2:>4}  {game.opening}")
+
+def show_library(localizer: LocalizationManager, config: dict, context: AppContext):
+    """
+    Библиотека партий: список с фильтрами по режиму, итогу, уровню и дебюту,
+    постранично (читаются только сводки текущей страницы), продолжение
+    недоигранной партии, импорт и экспорт PGN.
+    """
+    library = context.library
+    game_filter = GameFilter()
+    page = 0
+    while True:
+        clear_screen()
+        total = library.count(game_filter)
+        pages = max(1, (total + LIBRARY_PAGE_SIZE - 1) // LIBRARY_PAGE_SIZE)
+        page = min(page, pages - 1)
+        games = library.list_games(game_filter, limit=LIBRARY_PAGE_SIZE, offset=page * LIBRARY_PAGE_SIZE)
+
+        print(f"--- {localizer.get('library_title')} ---")
+        if games:
+            _print_library_page(localizer, games)
+        else:
+            print(localizer.get('library_empty'))
+        print(localizer.get('library_page', page=page + 1, pages=pages, total=total))
+        print()
+        print(f"1. {localizer.get('library_filter_mode', value=_library_value(localizer, game_filter.mode, 'library_mode_'))}")
+        print(f"2. {localizer.get('library_filter_result', value=_library_value(localizer, game_filter.result))}")
+        print(f"3. {localizer.get('library_filter_level', value=_library_value(localizer, game_filter.skill_level))}")
+        print(f"4. {localizer.get('library_filter_opening', value=_library_value(localizer, game_filter.opening))}")
+        print(f"5. {localizer.get('library_next_page')}")
+        print(f"6. {localizer.get('library_prev_page')}")
+        print(f"7. {localizer.get('library_continue')}")
+        print(f"8. {localizer.get('library_import')}")
+        print(f"9. {localizer.get('library_export')}")
+        print(f"10. {localizer.get('library_back')}")
+
+        choice = input(">> ").strip()
+        if choice == '1':
+            game_filter = game_filter._replace(mode=_next_choice(LIBRARY_MODE_CHOICES, game_filter.mode))
+            page = 0
+        elif choice == '2':
+            game_filter = game_filter._replace(result=_next_choice(LIBRARY_RESULT_CHOICES, game_filter.result))
+            page = 0
+        elif choice == '3':
+            level = input(localizer.get('library_prompt_level')).strip()
+            game_filter = game_filter._replace(skill_level=int(level) if level.isdigit() else None)
+            page = 0
+        elif choice == '4':
+            opening = input(localizer.get('library_prompt_opening')).strip()
+            game_filter = game_filter._replace(opening=opening or None)
+            page = 0
+        elif choice == '5':
+            page = min(page + 1, pages - 1)
+        elif choice == '6':
+            page = max(page - 1, 0)
+        elif choice == '7':
+            game_id = input(localizer.get('library_prompt_id')).strip()
+            try:
+                summary = library.summary(int(game_id))
+            except (ValueError, KeyError):
+                summary = None
+            if summary is None or summary.result != UNFINISHED or summary.mode not in GAME_CLASSES:
+                input(localizer.get('library_not_resumable'))
+                continue
+            continue_game(config, localizer, context, summary.id)
+        elif choice == '8':
+            path = input(localizer.get('library_prompt_path')).strip()
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    count = library.import_pgn(f, workers=os.cpu_count() or 1)
+            except (OSError, UnicodeDecodeError) as e:
+                input(localizer.get('library_file_error', error=e))
+                continue
+            input(localizer.get('library_imported', count=count))
+        elif choice == '9':
+            path = input(localizer.get('library_prompt_path')).strip()
+            try:
+                with open(path, 'w', encoding='utf-8') as f:
+                    count = library.export_pgn(f, game_filter)
+            except OSError as e:
+                input(localizer.get('library_file_error', error=e))
+                continue
+            input(localizer.get('library_exported', count=count, path=path))
+        elif choice == '10':
+            break
+        else:
+            print(localizer.get("invalid_settings_choice"))
+            input()
+
+def main_menu(localizer: LocalizationManager, config: dict, context: AppContext):
     """Главный цикл меню."""
     while True:
         clear_screen()
         print(f"--- {localizer.get('main_menu_title')} ---")
         
-        if os.path.exists(SAVED_GAME_FILE):
+        has_unfinished = context.library.latest_unfinished() is not None
+        if has_unfinished:
              print(localizer.get('menu_option_continue'))
         
         print(localizer.get('menu_option_standard'))
         print(localizer.get('menu_option_hints'))
-        print(localizer.get('menu_option_960')) # <-- НОВАЯ ОПЦИЯ
+        print(localizer.get('menu_option_960'))
         print(localizer.get('menu_option_settings'))
+        print(localizer.get('menu_option_library'))
         print(localizer.get('menu_option_quit'))
         print("-" * (len(localizer.get('main_menu_title')) + 6))
         
         choice = input(">> ").strip()
-        if choice == '0' and os.path.exists(SAVED_GAME_FILE):
-            continue_game(config, localizer)
+        if choice == '0' and has_unfinished:
+            continue_game(config, localizer, context)
         elif choice == '1':
-            start_new_game(GameVsStockfish, localizer, config)
+            start_new_game(GameVsStockfish, localizer, config, context)
         elif choice == '2':
-            start_new_game(GameWithHints, localizer, config)
+            start_new_game(GameWithHints, localizer, config, context)
         elif choice == '3':
-            start_new_game(Game960, localizer, config)
+            start_new_game(Game960, localizer, config, context)
         elif choice == '4':
             localizer, config = show_settings(localizer, config)
             save_config(config, localizer.lang)
-        elif choice == '5': # <-- Не забудьте обновить номер выхода
+        elif choice == '5':
+            show_library(localizer, config, context)
+        elif choice == '6':
             break
         else:
             print(localizer.get("invalid_menu_choice"))
@@ -251,5 +511,27 @@ if __name__ == "__main__":
 
     localizer = LocalizationManager(lang=lang_code)
     
-    main_menu(localizer, config)
+    # Stockfish запускается один раз на все приложение и прогревается, пока открыто меню
+    engine_pool = EnginePool()
+    # Результаты анализа переживают перезапуск (если это не отключено в settings.json)
+    analysis_cache = AnalysisCache(
+        max_entries=config['analysis_cache_size'],
+        path=ANALYSIS_CACHE_FILE if config['analysis_cache_persist'] else None,
+    )
+    # Книга открывается один раз на все приложение (файл отображается в память)
+    opening_book = OpeningBook.open(config['opening_book'])
+    tablebase = Tablebase.open(config['syzygy_path'])
+    # Все партии (идущие, законченные, импортированные) - в одной базе
+    library = GameLibrary(LIBRARY_FILE)
+    migrate_saved_game(library, localizer)
+    context = AppContext(engine_pool, analysis_cache, opening_book, tablebase, library)
+    try:
+        main_menu(localizer, config, context)
+    finally:
+        engine_pool.close()
+        if opening_book is not None:
+            opening_book.close()
+        if tablebase is not None:
+            tablebase.close()
+        library.close()
     clear_screen()
\ No newline at end of file
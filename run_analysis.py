@@ -0,0 +1,16 @@
+import sys
+import os
+
+ROOT_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from game_analysis import main
+
+if __name__ == '__main__':
+    # Примеры:
+    #   python3 run_analysis.py games.pgn --workers 4 --depth 16
+    #   python3 run_analysis.py               (последняя партия из библиотеки в user_data)
+    #   python3 run_analysis.py --game 12     (партия из библиотеки по ID)
+    #   python3 run_analysis.py game.pgn --time 0.1 --json > report.json
+    sys.exit(main())
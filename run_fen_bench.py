@@ -0,0 +1,12 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
+
+from fen_bench import main
+
+if __name__ == '__main__':
+    # Примеры:
+    #   python3 run_fen_bench.py
+    #   python3 run_fen_bench.py --positions 20000 --repeat 5
+    sys.exit(main())
@@ -0,0 +1,15 @@
+import sys
+import os
+
+ROOT_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from game_library import main
+
+if __name__ == '__main__':
+    # Примеры:
+    #   python3 run_import.py archive.pgn                 (в user_data/games.sqlite3, процессов - по числу ядер)
+    #   python3 run_import.py a.pgn b.pgn --workers 4
+    #   python3 run_import.py big.pgn --library /tmp/test.sqlite3
+    sys.exit(main())
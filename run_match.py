@@ -0,0 +1,15 @@
+import sys
+import os
+
+ROOT_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from match import main
+
+if __name__ == '__main__':
+    # Примеры:
+    #   python3 run_match.py stockfish:8@0.1 stockfish:4@0.1 --games 100
+    #   python3 run_match.py builtin:10@0.2 builtin:10@0.05 --games 40 --workers 4
+    #   python3 run_match.py stockfish:5@0.05 builtin:20@0.2 --chess960 --seed 7
+    sys.exit(main())
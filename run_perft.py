@@ -0,0 +1,14 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
+
+from perft import main
+
+if __name__ == '__main__':
+    # Без аргументов прогоняет весь набор позиций на всех глубинах.
+    # Примеры:
+    #   python3 run_perft.py --max-nodes 100000
+    #   python3 run_perft.py --divide "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1" 2
+    # Код выхода 1 при расхождении числа узлов, для CI/CD систем
+    sys.exit(main())
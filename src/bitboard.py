@@ -0,0 +1,175 @@
+"""
+Битборды и таблицы атак.
+
+Нумерация полей совпадает с координатами Board: sq = row * 8 + col,
+то есть 0 - это a8, 7 - h8, 56 - a1, 63 - h1. Каждая маска - обычный
+Python int, в котором бит `sq` означает занятое/атакованное поле.
+"""
+from typing import Iterator, List, Tuple
+
+# Типы фигур (индексы в массивах битбордов)
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+# Индексы цветов
+WHITE_IDX, BLACK_IDX = 0, 1
+
+FULL = (1 << 64) - 1
+ROW_MASKS = [0xFF << (8 * row) for row in range(8)]
+
+
+def square(row: int, col: int) -> int:
+    return row * 8 + col
+
+
+def square_to_pos(sq: int) -> Tuple[int, int]:
+    return sq >> 3, sq & 7
+
+
+def iter_squares(bb: int) -> Iterator[int]:
+    """Перебирает номера установленных битов от младшего к старшему."""
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+
+def lsb_square(bb: int) -> int:
+    """Номер младшего установленного бита (bb не должен быть нулем)."""
+    return (bb & -bb).bit_length() - 1
+
+
+def popcount(bb: int) -> int:
+    return bin(bb).count('1')
+
+
+def _leaper_attacks(offsets: List[Tuple[int, int]]) -> List[int]:
+    table = []
+    for sq in range(64):
+        row, col = square_to_pos(sq)
+        mask = 0
+        for dr, dc in offsets:
+            r, c = row + dr, col + dc
+            if 0 <= r < 8 and 0 <= c < 8:
+                mask |= 1 << square(r, c)
+        table.append(mask)
+    return table
+
+
+KNIGHT_ATTACKS = _leaper_attacks([(-2, 1), (-2, -1), (-1, 2), (-1, -2), (1, 2), (1, -2), (2, 1), (2, -1)])
+KING_ATTACKS = _leaper_attacks([(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)])
+# PAWN_ATTACKS[color][sq] - поля, которые бьет пешка цвета color, стоящая на sq.
+# Белые пешки идут к ряду 0, черные - к ряду 7.
+PAWN_ATTACKS = [
+    _leaper_attacks([(-1, -1), (-1, 1)]),
+    _leaper_attacks([(1, -1), (1, 1)]),
+]
+
+# Направления скольжения. "Положительные" увеличивают номер поля,
+# поэтому ближайший блокер на луче - младший бит, для остальных - старший.
+NORTH, SOUTH, EAST, WEST, NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST = range(8)
+_DIRECTION_DELTAS = [(-1, 0), (1, 0), (0, 1), (0, -1), (-1, 1), (-1, -1), (1, 1), (1, -1)]
+
+
+def _build_rays() -> List[List[int]]:
+    rays = []
+    for dr, dc in _DIRECTION_DELTAS:
+        table = []
+        for sq in range(64):
+            row, col = square_to_pos(sq)
+            mask = 0
+            r, c = row + dr, col + dc
+            while 0 <= r < 8 and 0 <= c < 8:
+                mask |= 1 << square(r, c)
+                r += dr
+                c += dc
+            table.append(mask)
+        rays.append(table)
+    return rays
+
+
+RAYS = _build_rays()
+
+
+def _build_between() -> List[List[int]]:
+    """BETWEEN[a][b] - поля строго между a и b, если они на одной линии, иначе 0."""
+    table = [[0] * 64 for _ in range(64)]
+    for rays in RAYS:
+        for sq in range(64):
+            for target in iter_squares(rays[sq]):
+                table[sq][target] = (rays[sq] ^ rays[target]) & ~(1 << target)
+    return table
+
+
+BETWEEN = _build_between()
+_N, _S, _E, _W = RAYS[NORTH], RAYS[SOUTH], RAYS[EAST], RAYS[WEST]
+_NE, _NW, _SE, _SW = RAYS[NORTH_EAST], RAYS[NORTH_WEST], RAYS[SOUTH_EAST], RAYS[SOUTH_WEST]
+
+
+def rook_attacks(sq: int, occupancy: int) -> int:
+    """Атаки ладьи с поля sq с учетом блокирующих фигур."""
+    attacks = 0
+    # Положительные направления: юг и восток
+    ray = _S[sq]
+    blockers = ray & occupancy
+    if blockers:
+        ray ^= _S[(blockers & -blockers).bit_length() - 1]
+    attacks |= ray
+    ray = _E[sq]
+    blockers = ray & occupancy
+    if blockers:
+        ray ^= _E[(blockers & -blockers).bit_length() - 1]
+    attacks |= ray
+    # Отрицательные направления: север и запад
+    ray = _N[sq]
+    blockers = ray & occupancy
+    if blockers:
+        ray ^= _N[blockers.bit_length() - 1]
+    attacks |= ray
+    ray = _W[sq]
+    blockers = ray & occupancy
+    if blockers:
+        ray ^= _W[blockers.bit_length() - 1]
+    return attacks | ray
+
+
+def bishop_attacks(sq: int, occupancy: int) -> int:
+    """Атаки слона с поля sq с учетом блокирующих фигур."""
+    attacks = 0
+    ray = _SE[sq]
+    blockers = ray & occupancy
+    if blockers:
+        ray ^= _SE[(blockers & -blockers).bit_length() - 1]
+    attacks |= ray
+    ray = _SW[sq]
+    blockers = ray & occupancy
+    if blockers:
+        ray ^= _SW[(blockers & -blockers).bit_length() - 1]
+    attacks |= ray
+    ray = _NE[sq]
+    blockers = ray & occupancy
+    if blockers:
+        ray ^= _NE[blockers.bit_length() - 1]
+    attacks |= ray
+    ray = _NW[sq]
+    blockers = ray & occupancy
+    if blockers:
+        ray ^= _NW[blockers.bit_length() - 1]
+    return attacks | ray
+
+
+def queen_attacks(sq: int, occupancy: int) -> int:
+    return rook_attacks(sq, occupancy) | bishop_attacks(sq, occupancy)
+
+
+def attackers_to(sq: int, color_idx: int, own: List[int], occupancy: int) -> int:
+    """
+    Маска фигур цвета color_idx, атакующих поле sq при заданной занятости.
+    `own` - шесть битбордов этого цвета, индексированных типом фигуры.
+    """
+    queens = own[QUEEN]
+    return (
+        (PAWN_ATTACKS[color_idx ^ 1][sq] & own[PAWN])
+        | (KNIGHT_ATTACKS[sq] & own[KNIGHT])
+        | (KING_ATTACKS[sq] & own[KING])
+        | (rook_attacks(sq, occupancy) & (own[ROOK] | queens))
+        | (bishop_attacks(sq, occupancy) & (own[BISHOP] | queens))
+    )
@@ -1,43 +1,67 @@
-import copy
-from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import List, NamedTuple, Tuple, Optional
 import random
 from collections import Counter
 
 from pieces import piece, pawn, knight, bishop, rook, queen, king
+from bitboard import (
+    PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, WHITE_IDX, BLACK_IDX, FULL, ROW_MASKS,
+    KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS,
+    BETWEEN, rook_attacks, bishop_attacks, attackers_to, iter_squares, lsb_square,
+)
+from zobrist import PIECE_KEYS, BLACK_TO_MOVE_KEY, CASTLING_KEYS, EN_PASSANT_KEYS
+from fen import CastlingRook, parse_fen, format_fen
+from moves import (
+    QUIET, DOUBLE_PAWN_PUSH, KING_CASTLE, QUEEN_CASTLE, CAPTURE, EN_PASSANT, PROMOTION,
+    PROMO_QUEEN, PROMOTION_PIECE_TYPES, move_to_uci,
+)
 
 # Удобные константы
 WHITE, BLACK = 'w', 'b'
+COLOR_INDEX = {WHITE: WHITE_IDX, BLACK: BLACK_IDX}
 
+# Номер поля битборда -> координаты (ряд, колонка), чтобы не создавать кортежи заново
+_SQ_TO_POS = [(sq >> 3, sq & 7) for sq in range(64)]
 
-@dataclass
-class MoveRecord:
-    """Хранит всю информацию, необходимую для отмены хода."""
-    move: Tuple[Tuple[int, int], Tuple[int, int]]
+# Флаги, уже сдвинутые в позицию битов 12-15 (см. moves.py)
+_CAPTURE = CAPTURE << 12
+_DOUBLE_PAWN_PUSH = DOUBLE_PAWN_PUSH << 12
+_EN_PASSANT = EN_PASSANT << 12
+# Превращения в порядке ферзь, ладья, слон, конь
+_PROMOTIONS = [(PROMOTION | promo) << 12 for promo in range(PROMO_QUEEN, -1, -1)]
+
+_PIECE_CLASSES = {PAWN: pawn.Pawn, KNIGHT: knight.Knight, BISHOP: bishop.Bishop,
+                  ROOK: rook.Rook, QUEEN: queen.Queen, KING: king.King}
+# Буква FEN -> (класс фигуры, цвет, индекс цвета, тип фигуры)
+_FEN_PIECES = {cls(color).symbol: (cls, color, color_idx, piece_type)
+               for piece_type, cls in _PIECE_CLASSES.items()
+               for color, color_idx in ((WHITE, WHITE_IDX), (BLACK, BLACK_IDX))}
+
+
+class MoveRecord(NamedTuple):
+    """
+    Хранит всю информацию, необходимую для отмены хода.
+    Неизменяемый кортеж: ссылается на уже существующие объекты фигур
+    (включая пешку, которая превратилась), поэтому отмена ничего не создает.
+    Тип хода (рокировка, взятие на проходе, превращение) берется из флагов `move`.
+    """
+    move: int
+    moved_piece: piece.Piece
     captured_piece: Optional[piece.Piece]
-    castling_rights: 'CastlingRights'
+    castling_rights: int
     en_passant_target: Optional[Tuple[int, int]]
     halfmove_clock: int
     piece_had_moved: bool
-    is_promotion: bool = False
-    is_en_passant_capture: bool = False
 
 
 class CastlingRights:
-    """Простой класс для хранения прав на рокировку."""
-    def __init__(self, w_king: bool, w_queen: bool, b_king: bool, b_queen: bool):
-        self.wk = w_king
-        self.wq = w_queen
-        self.bk = b_king
-        self.bq = b_queen
-
-    def __repr__(self) -> str:
-        s = ""
-        if self.wk: s += "K"
-        if self.wq: s += "Q"
-        if self.bk: s += "k"
-        if self.bq: s += "q"
-        return s or "-"
+    """
+    Права на рокировку хранятся в Board.castling_rights как 4-битная маска (int).
+    Поле FEN читается и пишется в fen.py (вместе с вертикалями ладей для 960).
+    """
+    WK, WQ, BK, BQ = 1, 2, 4, 8
+    ALL = WK | WQ | BK | BQ
+    # Флаг по (цвет, королевский фланг)
+    FLAGS = {(WHITE, True): WK, (WHITE, False): WQ, (BLACK, True): BK, (BLACK, False): BQ}
 
 
 class Board:
@@ -45,11 +69,23 @@ class Board:
     Класс, представляющий шахматную доску.
     Отвечает за состояние доски, генерацию ходов и их выполнение.
     Координаты: (ряд, колонка), где (0, 0) - это a8, (7, 7) - это h1.
+
+    Помимо массива 8x8 с объектами фигур доска хранит битборды:
+    `pieces_bb[цвет][тип]` и `occupancy[цвет]` (см. bitboard.py).
+    Оба представления обновляются вместе в `set_piece_at`, там же
+    инкрементально обновляется Zobrist-ключ расстановки фигур.
+
+    Ходы - упакованные 16-битные числа (см. moves.py). Перевод из/в UCI
+    делается только на границе: move_from_uci / moves.move_to_uci.
+
+    Список легальных ходов и статус игры кэшируются по ключу позиции:
+    сколько бы раз их ни запросили (цикл игры, рендерер, проверка ввода),
+    генерация выполняется один раз на позицию.
     """
-    def __init__(self, is_chess960: bool = False):
-        self.board: List[List[Optional[piece.Piece]]] = [[None for _ in range(8)] for _ in range(8)]
+    def __init__(self, is_chess960: bool = False, rng: Optional[random.Random] = None):
+        self.board = [[None for _ in range(8)] for _ in range(8)]
         self.color_to_move: str = WHITE
-        self.castling_rights: CastlingRights = CastlingRights(True, True, True, True)
+        self.castling_rights: int = CastlingRights.ALL
         self.en_passant_target: Optional[Tuple[int, int]] = None
         self.halfmove_clock: int = 0
         self.fullmove_number: int = 1
@@ -57,41 +93,74 @@ class Board:
         self.is_chess960 = is_chess960
         self.initial_rook_files: dict = {'w': [], 'b': []}
         self.position_history = Counter()
-        self._update_position_history()
         
         if is_chess960:
-            self._setup_board_960()
+            # Расстановку 960 можно повторить, передав свой генератор (матчи, замеры)
+            self._setup_board_960(rng or random)
         else:
             self._setup_board()
+        self._update_position_history()
     
+    @property
+    def board(self) -> List[List[Optional[piece.Piece]]]:
+        return self._squares
+
+    @board.setter
+    def board(self, squares: List[List[Optional[piece.Piece]]]):
+        """Замена массива целиком (так делают тесты) пересобирает битборды."""
+        self._squares = squares
+        self._sync_bitboards()
+        self._invalidate_caches()
+
+    def _invalidate_caches(self):
+        """Сбрасывает кэш ходов и статуса (после хода, отмены, загрузки FEN)."""
+        self._legal_moves_cache: Optional[tuple] = None
+        self._uci_moves_cache: Optional[tuple] = None
+        self._game_status_cache: Optional[tuple] = None
+
+    def _sync_bitboards(self):
+        """Пересчитывает все битборды по массиву 8x8."""
+        self.pieces_bb = [[0] * 6, [0] * 6]
+        self.occupancy = [0, 0]
+        self._pieces_key = 0
+        for r, row in enumerate(self._squares):
+            for c, p in enumerate(row):
+                if p is not None:
+                    sq = r * 8 + c
+                    color_idx = COLOR_INDEX[p.color]
+                    piece_type = p.piece_type
+                    self.pieces_bb[color_idx][piece_type] |= 1 << sq
+                    self.occupancy[color_idx] |= 1 << sq
+                    self._pieces_key ^= PIECE_KEYS[color_idx][piece_type][sq]
+
     def _setup_board(self):
         pieces_map = {0: rook.Rook, 1: knight.Knight, 2: bishop.Bishop, 3: queen.Queen, 4: king.King, 5: bishop.Bishop, 6: knight.Knight, 7: rook.Rook}
         for i in range(8):
-            self.board[0][i] = pieces_map[i](BLACK); self.board[1][i] = pawn.Pawn(BLACK)
-            self.board[6][i] = pawn.Pawn(WHITE); self.board[7][i] = pieces_map[i](WHITE)
+            self.set_piece_at((0, i), pieces_map[i](BLACK)); self.set_piece_at((1, i), pawn.Pawn(BLACK))
+            self.set_piece_at((6, i), pawn.Pawn(WHITE)); self.set_piece_at((7, i), pieces_map[i](WHITE))
 
-    def _setup_board_960(self):
-        """Расставляет фигуры для Шахмат-960 с исправленной логикой."""
+    def _setup_board_960(self, rng):
+        """Расставляет фигуры для Шахмат-960 с исправленной логикой; `rng` - random.Random или модуль random."""
         for i in range(8):
-            self.board[1][i] = pawn.Pawn(BLACK)
-            self.board[6][i] = pawn.Pawn(WHITE)
+            self.set_piece_at((1, i), pawn.Pawn(BLACK))
+            self.set_piece_at((6, i), pawn.Pawn(WHITE))
 
         dark_squares = [0, 2, 4, 6]
         light_squares = [1, 3, 5, 7]
-        random.shuffle(dark_squares)
-        random.shuffle(light_squares)
+        rng.shuffle(dark_squares)
+        rng.shuffle(light_squares)
         
         b1_pos, b2_pos = dark_squares.pop(), light_squares.pop()
         
         remaining_squares = dark_squares + light_squares
-        random.shuffle(remaining_squares)
+        rng.shuffle(remaining_squares)
         n1_pos, n2_pos = remaining_squares.pop(), remaining_squares.pop()
         
         # --- ИСПРАВЛЕНИЕ ЗДЕСЬ ---
         # Строка `remaining_squares.append(n2_pos)` была удалена.
         # Теперь в `remaining_squares` 4 элемента.
         
-        random.shuffle(remaining_squares)
+        rng.shuffle(remaining_squares)
         q_pos = remaining_squares.pop()
         
         # Теперь в `remaining_squares` 3 элемента, как и должно быть.
@@ -108,19 +177,29 @@ class Board:
         self.initial_rook_files['b'] = [r1_pos, r2_pos]
 
         for col, piece_class in placement.items():
-            self.board[7][col] = piece_class(WHITE)
-            self.board[0][col] = piece_class(BLACK)
-
-    def _get_position_hash(self) -> str:
-        """Создает хэш позиции (часть FEN) для отслеживания повторений."""
-        fen = board_to_fen(self) # Используем существующую функцию
-        position_part = " ".join(fen.split(' ')[:4])
-        return position_part
+            self.set_piece_at((7, col), piece_class(WHITE))
+            self.set_piece_at((0, col), piece_class(BLACK))
+
+    @property
+    def zobrist_key(self) -> int:
+        """
+        64-битный Zobrist-ключ позиции: фигуры, очередь хода, права на рокировку
+        и вертикаль взятия на проходе (только если взять действительно есть чем).
+        Ключ фигур ведется инкрементально, остальное - несколько XOR.
+        """
+        key = self._pieces_key ^ CASTLING_KEYS[self.castling_rights]
+        if self.color_to_move == BLACK:
+            key ^= BLACK_TO_MOVE_KEY
+        if self.en_passant_target:
+            row, col = self.en_passant_target
+            us = COLOR_INDEX[self.color_to_move]
+            if PAWN_ATTACKS[us ^ 1][row * 8 + col] & self.pieces_bb[us][PAWN]:
+                key ^= EN_PASSANT_KEYS[col]
+        return key
 
     def _update_position_history(self):
         """Обновляет счетчик истории позиций."""
-        pos_hash = self._get_position_hash()
-        self.position_history[pos_hash] += 1
+        self.position_history[self.zobrist_key] += 1
 
     def _is_insufficient_material(self) -> bool:
         """Проверяет, достаточно ли на доске материала для мата."""
@@ -174,11 +253,29 @@ class Board:
 
     def get_piece_at(self, pos: Tuple[int, int]) -> Optional[piece.Piece]:
         row, col = pos
-        return self.board[row][col]
+        return self._squares[row][col]
 
     def set_piece_at(self, pos: Tuple[int, int], p: Optional[piece.Piece]):
-        row, col = pos
-        self.board[row][col] = p
+        self._set_square(pos[0] * 8 + pos[1], p)
+
+    def _set_square(self, sq: int, p: Optional[piece.Piece]):
+        """То же, что set_piece_at, но по номеру поля битборда."""
+        row, col = sq >> 3, sq & 7
+        bit = 1 << sq
+        old = self._squares[row][col]
+        if old is not None:
+            color_idx = COLOR_INDEX[old.color]
+            piece_type = old.piece_type
+            self.pieces_bb[color_idx][piece_type] &= ~bit
+            self.occupancy[color_idx] &= ~bit
+            self._pieces_key ^= PIECE_KEYS[color_idx][piece_type][sq]
+        if p is not None:
+            color_idx = COLOR_INDEX[p.color]
+            piece_type = p.piece_type
+            self.pieces_bb[color_idx][piece_type] |= bit
+            self.occupancy[color_idx] |= bit
+            self._pieces_key ^= PIECE_KEYS[color_idx][piece_type][sq]
+        self._squares[row][col] = p
 
     @staticmethod
     def is_on_board(pos: Tuple[int, int]) -> bool:
@@ -188,51 +285,16 @@ class Board:
 
     def is_attacked_by(self, pos: Tuple[int, int], attacking_color: str) -> bool:
         """Проверяет, атакована ли клетка `pos` фигурами цвета `attacking_color`."""
-        # Атака пешкой
-        pawn_dir = 1 if attacking_color == WHITE else -1
-        for col_offset in [-1, 1]:
-            p_pos = (pos[0] + pawn_dir, pos[1] + col_offset)
-            if self.is_on_board(p_pos):
-                p = self.get_piece_at(p_pos)
-                if isinstance(p, pawn.Pawn) and p.color == attacking_color:
-                    return True
-
-        # Атака конем
-        knight_moves = [(-2, 1),(-2,-1),(-1, 2),(-1,-2),(1, 2),(1,-2),(2, 1),(2,-1)]
-        for dr, dc in knight_moves:
-            k_pos = (pos[0] + dr, pos[1] + dc)
-            if self.is_on_board(k_pos):
-                p = self.get_piece_at(k_pos)
-                if isinstance(p, knight.Knight) and p.color == attacking_color:
-                    return True
-
-        # Атака скользящими фигурами (ладья, слон, ферзь) и королем
-        directions = [(0,1),(0,-1),(1,0),(-1,0),(1,1),(1,-1),(-1,1),(-1,-1)]
-        for dr, dc in directions:
-            for i in range(1, 8):
-                check_pos = (pos[0] + i * dr, pos[1] + i * dc)
-                if not self.is_on_board(check_pos): break
-                p = self.get_piece_at(check_pos)
-                if p:
-                    if p.color == attacking_color:
-                        is_rook_dir = (dr == 0 or dc == 0)
-                        is_bishop_dir = (dr != 0 and dc != 0)
-                        if (isinstance(p, king.King) and i==1) or \
-                           (isinstance(p, rook.Rook) and is_rook_dir) or \
-                           (isinstance(p, bishop.Bishop) and is_bishop_dir) or \
-                           isinstance(p, queen.Queen):
-                            return True
-                    break # Фигура блокирует дальнейшую атаку в этом направлении
-        return False
+        color_idx = COLOR_INDEX[attacking_color]
+        occupancy = self.occupancy[WHITE_IDX] | self.occupancy[BLACK_IDX]
+        return attackers_to(pos[0] * 8 + pos[1], color_idx, self.pieces_bb[color_idx], occupancy) != 0
 
     def find_king(self, color: str) -> Optional[Tuple[int, int]]:
         """Находит позицию короля заданного цвета."""
-        for r in range(8):
-            for c in range(8):
-                p = self.get_piece_at((r, c))
-                if isinstance(p, king.King) and p.color == color:
-                    return (r, c)
-        return None
+        king_bb = self.pieces_bb[COLOR_INDEX[color]][KING]
+        if not king_bb:
+            return None
+        return _SQ_TO_POS[lsb_square(king_bb)]
 
     def is_in_check(self, color: str) -> bool:
         """Проверяет, находится ли король цвета `color` под шахом."""
@@ -240,8 +302,224 @@ class Board:
         if king_pos is None: return False
         return self.is_attacked_by(king_pos, BLACK if color == WHITE else WHITE)
 
-    def get_legal_moves(self) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
-        """Генерирует все легальные ходы для текущего игрока."""
+    def get_legal_moves(self) -> List[int]:
+        """
+        Возвращает легальные ходы текущего игрока (упакованные числа, см. moves.py).
+        Повторные вызовы в той же позиции отдают закэшированный список - его нельзя изменять.
+        """
+        key = self.zobrist_key
+        cached = self._legal_moves_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        moves = self._generate_legal_moves()
+        self._legal_moves_cache = (key, moves)
+        return moves
+
+    def move_from_uci(self, uci: str) -> Optional[int]:
+        """
+        Находит легальный ход по строке UCI ('e2e4', 'e7e8n'); None, если такого нет.
+        Без буквы превращения пешка превращается в ферзя. Поиск - по словарю,
+        который строится один раз на позицию.
+        """
+        key = self.zobrist_key
+        cached = self._uci_moves_cache
+        if cached is None or cached[0] != key:
+            legal_moves = self.get_legal_moves()
+            by_uci = {move_to_uci(move, self.is_chess960): move for move in legal_moves}
+            if self.is_chess960:
+                # Движки без UCI_Chess960 пишут рокировку ходом короля на g/c - принимаем и так,
+                # если это не совпадает с обычным ходом короля
+                for move in legal_moves:
+                    if (move >> 12) in (KING_CASTLE, QUEEN_CASTLE):
+                        by_uci.setdefault(move_to_uci(move), move)
+            self._uci_moves_cache = cached = (key, by_uci)
+        uci = uci.strip().lower()
+        move = cached[1].get(uci)
+        if move is None and len(uci) == 4:
+            move = cached[1].get(uci + 'q')
+        return move
+
+    def _generate_legal_moves(self) -> List[int]:
+        """
+        Генерирует все легальные ходы для текущего игрока за один проход.
+        Шахующие и связанные фигуры вычисляются один раз на позицию, поэтому
+        ходы не нужно проверять пробным выполнением.
+        Превращение дает четыре хода (ферзь, ладья, слон, конь), рокировка
+        кодируется ходом короля на поле своей ладьи (и в классике, и в 960).
+        """
+        us = COLOR_INDEX[self.color_to_move]
+        them = us ^ 1
+        own_pieces = self.pieces_bb[us]
+        enemy_pieces = self.pieces_bb[them]
+        own = self.occupancy[us]
+        enemy = self.occupancy[them]
+        occupancy = own | enemy
+        empty = ~occupancy & FULL
+        king_bb = own_pieces[KING]
+        moves = []
+        append = moves.append
+        checkers = 0
+        check_mask = FULL
+        pin_rays = {}
+
+        # Позиция без короля (например, в тестах фигур): шахов и связок не бывает
+        if king_bb:
+            king_sq = lsb_square(king_bb)
+
+            # 1. Ходы короля: поле не должно быть атаковано, даже "сквозь" самого короля
+            occupancy_without_king = occupancy ^ king_bb
+            for to in iter_squares(KING_ATTACKS[king_sq] & ~own):
+                if not attackers_to(to, them, enemy_pieces, occupancy_without_king):
+                    append(king_sq | (to << 6) | (_CAPTURE if (enemy >> to) & 1 else 0))
+
+            # 2. Шах: при двойном ходит только король, при одиночном - взятие или перекрытие
+            checkers = attackers_to(king_sq, them, enemy_pieces, occupancy)
+            if checkers & (checkers - 1):
+                return moves
+            if checkers:
+                check_mask = checkers | BETWEEN[king_sq][lsb_square(checkers)]
+
+            # 3. Связки: между королем и вражеской дальнобойной фигурой ровно одна наша
+            enemy_queens = enemy_pieces[QUEEN]
+            snipers = (rook_attacks(king_sq, enemy) & (enemy_pieces[ROOK] | enemy_queens)) | \
+                      (bishop_attacks(king_sq, enemy) & (enemy_pieces[BISHOP] | enemy_queens))
+            for sniper_sq in iter_squares(snipers):
+                between = BETWEEN[king_sq][sniper_sq]
+                blockers = between & own
+                if blockers and not blockers & (blockers - 1):
+                    pin_rays[lsb_square(blockers)] = between | (1 << sniper_sq)
+        else:
+            king_sq = -1
+
+        # Тихие ходы и взятия перебираем раздельно, чтобы не проверять флаг взятия на каждом поле
+        quiet_targets = empty & check_mask
+        capture_targets = enemy & check_mask
+        for sq in iter_squares(own_pieces[KNIGHT]):
+            if sq in pin_rays: continue # Связанный конь ходить не может
+            attacks = KNIGHT_ATTACKS[sq]
+            for to in iter_squares(attacks & quiet_targets):
+                append(sq | (to << 6))
+            for to in iter_squares(attacks & capture_targets):
+                append(sq | (to << 6) | _CAPTURE)
+        for sliders, slider_attacks in ((own_pieces[BISHOP] | own_pieces[QUEEN], bishop_attacks),
+                                        (own_pieces[ROOK] | own_pieces[QUEEN], rook_attacks)):
+            for sq in iter_squares(sliders):
+                attacks = slider_attacks(sq, occupancy)
+                if sq in pin_rays:
+                    attacks &= pin_rays[sq]
+                for to in iter_squares(attacks & quiet_targets):
+                    append(sq | (to << 6))
+                for to in iter_squares(attacks & capture_targets):
+                    append(sq | (to << 6) | _CAPTURE)
+
+        # 4. Пешки
+        push = -8 if us == WHITE_IDX else 8
+        start_row = ROW_MASKS[6] if us == WHITE_IDX else ROW_MASKS[1]
+        promotion_rows = ROW_MASKS[0] | ROW_MASKS[7]
+        pawn_attacks = PAWN_ATTACKS[us]
+        ep_sq = self.en_passant_target[0] * 8 + self.en_passant_target[1] if self.en_passant_target else -1
+        for sq in iter_squares(own_pieces[PAWN]):
+            allowed = check_mask & pin_rays[sq] if sq in pin_rays else check_mask
+            to = sq + push
+            if 0 <= to < 64 and (empty >> to) & 1:
+                if (allowed >> to) & 1:
+                    if (promotion_rows >> to) & 1:
+                        moves.extend(sq | (to << 6) | flag for flag in _PROMOTIONS)
+                    else:
+                        append(sq | (to << 6))
+                double = to + push
+                if (start_row >> sq) & 1 and (empty >> double) & 1 and (allowed >> double) & 1:
+                    append(sq | (double << 6) | _DOUBLE_PAWN_PUSH)
+            for to in iter_squares(pawn_attacks[sq] & enemy & allowed):
+                if (promotion_rows >> to) & 1:
+                    moves.extend(sq | (to << 6) | flag | _CAPTURE for flag in _PROMOTIONS)
+                else:
+                    append(sq | (to << 6) | _CAPTURE)
+            if ep_sq >= 0 and (pawn_attacks[sq] >> ep_sq) & 1 and \
+               (king_sq < 0 or self._is_legal_en_passant(sq, ep_sq, king_sq)):
+                append(sq | (ep_sq << 6) | _EN_PASSANT)
+
+        # 5. Рокировка (под шахом невозможна)
+        if king_bb and not checkers:
+            moves.extend(self._generate_castling_moves_bb())
+        return moves
+
+    def _is_legal_en_passant(self, from_sq: int, ep_sq: int, king_sq: int) -> bool:
+        """
+        Взятие на проходе убирает с линии сразу две пешки, поэтому связки и
+        вскрытые шахи проверяем честно: по занятости после хода.
+        """
+        us = COLOR_INDEX[self.color_to_move]
+        them = us ^ 1
+        captured_bit = 1 << ((from_sq & ~7) | (ep_sq & 7))
+        occupancy = self.occupancy[WHITE_IDX] | self.occupancy[BLACK_IDX]
+        after = (occupancy & ~(1 << from_sq) & ~captured_bit) | (1 << ep_sq)
+        remaining = [bb & ~captured_bit for bb in self.pieces_bb[them]]
+        return not attackers_to(king_sq, them, remaining, after)
+
+    def _castling_rook_col(self, color: str, kingside: bool) -> int:
+        """Колонка ладьи, участвующей в рокировке (в 960 - исходная, в классике a/h)."""
+        rook_files = self.initial_rook_files[color]
+        if self.is_chess960 and rook_files:
+            return max(rook_files) if kingside else min(rook_files)
+        return 7 if kingside else 0
+
+    def _generate_castling_moves_bb(self) -> List[int]:
+        """
+        Генерирует легальные рокировки (классика и 960).
+        Поля между королем/ладьей и их целевыми полями должны быть свободны,
+        а путь короля (включая исходное поле) - не атакован.
+        """
+        color = self.color_to_move
+        us = COLOR_INDEX[color]
+        them = us ^ 1
+        king_bb = self.pieces_bb[us][KING]
+        if not king_bb:
+            return []
+        row = 7 if color == WHITE else 0
+        king_sq = lsb_square(king_bb)
+        king_col = king_sq & 7
+        if king_sq >> 3 != row:
+            return []
+
+        occupancy = self.occupancy[WHITE_IDX] | self.occupancy[BLACK_IDX]
+        enemy_pieces = self.pieces_bb[them]
+        moves = []
+        for kingside in (True, False):
+            if not self.castling_rights & CastlingRights.FLAGS[(color, kingside)]:
+                continue
+            rook_col = self._castling_rook_col(color, kingside)
+            rook_sq = row * 8 + rook_col
+            if not (self.pieces_bb[us][ROOK] >> rook_sq) & 1:
+                continue
+            if (rook_col > king_col) != kingside:
+                continue
+            king_dest = 6 if kingside else 2
+            rook_dest = 5 if kingside else 3
+
+            # Кроме самих короля и ладьи, на пути никого быть не должно
+            others = occupancy & ~(1 << king_sq) & ~(1 << rook_sq)
+            if others & (self._row_span(row, king_col, king_dest) | self._row_span(row, rook_col, rook_dest)):
+                continue
+            # Ладья может прикрывать поле назначения короля, поэтому считаем атаки без нее
+            path = self._row_span(row, king_col, king_dest)
+            if any(attackers_to(sq, them, enemy_pieces, others) for sq in iter_squares(path)):
+                continue
+
+            moves.append(king_sq | (rook_sq << 6) | ((KING_CASTLE if kingside else QUEEN_CASTLE) << 12))
+        return moves
+
+    @staticmethod
+    def _row_span(row: int, col_a: int, col_b: int) -> int:
+        """Маска полей ряда `row` от col_a до col_b включительно."""
+        low, high = min(col_a, col_b), max(col_a, col_b)
+        return (((1 << (high - low + 1)) - 1) << (row * 8 + low))
+
+    def _get_legal_moves_mailbox(self) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """
+        Прежний генератор на объектах фигур (get_moves + симуляция хода).
+        Оставлен как эталон для сверки perft с битбордовым генератором.
+        """
         legal_moves = []
         for move in self._generate_pseudo_legal_moves():
             start_pos, end_pos = move
@@ -272,39 +550,23 @@ class Board:
         return moves
 
     def _generate_castling_moves(self) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
-        """Генерирует ходы рокировки. Теперь поддерживает классику и 960."""
+        """Генерирует ходы рокировки для эталонного генератора (только классика)."""
         moves = []
         if self.is_in_check(self.color_to_move): return []
 
         king_pos = self.find_king(self.color_to_move)
         if not king_pos: return []
         
-        king_row, king_col = king_pos
-        opponent_color = BLACK if self.color_to_move == WHITE else WHITE
-
-        # --- Целевые поля для короля и ладьи ПОСЛЕ рокировки (всегда одни и те же) ---
-        q_side_king_dest_col, q_side_rook_dest_col = 2, 3  # c-file, d-file
-        k_side_king_dest_col, k_side_rook_dest_col = 6, 5  # g-file, f-file
-
-        # --- Начальные поля ладей ---
-        # В 960 они случайные, в классике - фиксированные
-        if self.is_chess960:
-            rook_files = self.initial_rook_files[self.color_to_move]
-            q_side_rook_col = min(rook_files) if rook_files else -1
-            k_side_rook_col = max(rook_files) if rook_files else -1
-        else:
-            q_side_rook_col, k_side_rook_col = 0, 7
-        
         opponent_color = BLACK if self.color_to_move == WHITE else WHITE
         if self.color_to_move == WHITE:
             row = 7
-            if self.castling_rights.wk and \
+            if self.castling_rights & CastlingRights.WK and \
                self.get_piece_at((row, 5)) is None and self.get_piece_at((row, 6)) is None and \
                not self.is_attacked_by((row, 4), opponent_color) and \
                not self.is_attacked_by((row, 5), opponent_color) and \
                not self.is_attacked_by((row, 6), opponent_color):
                 moves.append(((row, 4), (row, 6)))
-            if self.castling_rights.wq and \
+            if self.castling_rights & CastlingRights.WQ and \
                self.get_piece_at((row, 1)) is None and self.get_piece_at((row, 2)) is None and self.get_piece_at((row, 3)) is None and \
                not self.is_attacked_by((row, 4), opponent_color) and \
                not self.is_attacked_by((row, 3), opponent_color) and \
@@ -312,13 +574,13 @@ class Board:
                 moves.append(((row, 4), (row, 2)))
         else: # Черные
             row = 0
-            if self.castling_rights.bk and \
+            if self.castling_rights & CastlingRights.BK and \
                self.get_piece_at((row, 5)) is None and self.get_piece_at((row, 6)) is None and \
                not self.is_attacked_by((row, 4), opponent_color) and \
                not self.is_attacked_by((row, 5), opponent_color) and \
                not self.is_attacked_by((row, 6), opponent_color):
                 moves.append(((row, 4), (row, 6)))
-            if self.castling_rights.bq and \
+            if self.castling_rights & CastlingRights.BQ and \
                self.get_piece_at((row, 1)) is None and self.get_piece_at((row, 2)) is None and self.get_piece_at((row, 3)) is None and \
                not self.is_attacked_by((row, 4), opponent_color) and \
                not self.is_attacked_by((row, 3), opponent_color) and \
@@ -327,66 +589,96 @@ class Board:
 
         return moves
 
-
-    def make_move(self, move: Tuple[Tuple[int, int], Tuple[int, int]], promotion_piece_class=None):
-        """Выполняет ход, обновляет все состояния и сохраняет историю."""
-        start_pos, end_pos = move
-        piece_to_move = self.get_piece_at(start_pos)
+    def _encode_tuple_move(self, move: Tuple[Tuple[int, int], Tuple[int, int]], promotion_piece_class=None) -> int:
+        """
+        Переводит ход в прежнем формате ((ряд, колонка), (ряд, колонка)) в упакованный.
+        Рокировка - ход короля на две клетки или на поле своей ладьи.
+        """
+        (r1, c1), (r2, c2) = move
+        from_sq, to_sq = r1 * 8 + c1, r2 * 8 + c2
+        piece_to_move = self._squares[r1][c1]
+        target = self._squares[r2][c2]
+        if isinstance(piece_to_move, king.King) and r1 == r2:
+            kingside = c2 > c1
+            flag = KING_CASTLE if kingside else QUEEN_CASTLE
+            if isinstance(target, rook.Rook) and target.color == piece_to_move.color:
+                return from_sq | (to_sq << 6) | (flag << 12)
+            if abs(c2 - c1) == 2:
+                rook_sq = r1 * 8 + self._castling_rook_col(piece_to_move.color, kingside)
+                return from_sq | (rook_sq << 6) | (flag << 12)
+        flags = CAPTURE if target is not None else QUIET
+        if isinstance(piece_to_move, pawn.Pawn):
+            if (r2, c2) == self.en_passant_target and c1 != c2:
+                flags = EN_PASSANT
+            elif abs(r2 - r1) == 2:
+                flags = DOUBLE_PAWN_PUSH
+            elif r2 in (0, 7):
+                promotion_type = promotion_piece_class.piece_type if promotion_piece_class else QUEEN
+                flags |= PROMOTION | PROMOTION_PIECE_TYPES.index(promotion_type)
+        return from_sq | (to_sq << 6) | (flags << 12)
+
+    def make_move(self, move: int, promotion_piece_class=None):
+        """
+        Выполняет ход, обновляет все состояния и сохраняет историю.
+        Ход - упакованное число (см. moves.py). Для совместимости принимается и
+        кортеж ((ряд, колонка), (ряд, колонка)) с классом фигуры превращения.
+        """
+        if isinstance(move, tuple):
+            move = self._encode_tuple_move(move, promotion_piece_class)
+        from_sq, to_sq, flags = move & 63, (move >> 6) & 63, move >> 12
+        squares = self._squares
+        piece_to_move = squares[from_sq >> 3][from_sq & 7]
         if piece_to_move is None:
             raise ValueError("No piece at start position to move.")
 
         # --- СОХРАНЕНИЕ СОСТОЯНИЯ ДЛЯ ОТМЕНЫ ХОДА ---
-        captured_piece = self.get_piece_at(end_pos)
-        is_en_passant_capture = isinstance(piece_to_move, pawn.Pawn) and end_pos == self.en_passant_target
-        if is_en_passant_capture:
-            pawn_dir = -1 if piece_to_move.color == WHITE else 1
-            captured_piece_pos = (end_pos[0] - pawn_dir, end_pos[1])
-            captured_piece = self.get_piece_at(captured_piece_pos)
-
-        record = MoveRecord(
-            move=move, captured_piece=captured_piece, 
-            castling_rights=copy.deepcopy(self.castling_rights),
-            en_passant_target=self.en_passant_target, 
-            halfmove_clock=self.halfmove_clock,
-            piece_had_moved=piece_to_move.has_moved,
-            is_promotion=(isinstance(piece_to_move, pawn.Pawn) and (end_pos[0] in [0, 7])),
-            is_en_passant_capture=is_en_passant_capture
-        )
-        self.history.append(record)
+        is_castling = flags == KING_CASTLE or flags == QUEEN_CASTLE
+        if is_castling:
+            captured_piece = None
+        elif flags == EN_PASSANT:
+            # Съеденная пешка стоит рядом с исходным полем
+            captured_sq = (from_sq & ~7) | (to_sq & 7)
+            captured_piece = squares[captured_sq >> 3][captured_sq & 7]
+        else:
+            captured_piece = squares[to_sq >> 3][to_sq & 7]
+
+        self.history.append(MoveRecord(
+            move, piece_to_move, captured_piece, self.castling_rights,
+            self.en_passant_target, self.halfmove_clock, piece_to_move.has_moved,
+        ))
+        self._invalidate_caches()
         
         # --- ИСПОЛНЕНИЕ ХОДА ---
-        self.en_passant_target = None # Сброс флага в начале хода
-
-        # 1. Двойной ход пешки (создает возможность для en passant)
-        if isinstance(piece_to_move, pawn.Pawn) and abs(start_pos[0] - end_pos[0]) == 2:
-            self.en_passant_target = ((start_pos[0] + end_pos[0]) // 2, start_pos[1])
-        # 2. Взятие на проходе - удаляем съеденную пешку
-        if is_en_passant_capture:
-            self.set_piece_at(record.captured_piece.get_position_from_board(self.board), None) # Усложнено, найдем позицию по ссылке
-        # 3. Рокировка - перемещаем ладью
-        if isinstance(piece_to_move, king.King) and abs(start_pos[1] - end_pos[1]) == 2:
-            rook_start = (start_pos[0], 7 if end_pos[1] > start_pos[1] else 0)
-            rook_end = (start_pos[0], 5 if end_pos[1] > start_pos[1] else 3)
-            rook_piece = self.get_piece_at(rook_start)
-            self.set_piece_at(rook_end, rook_piece)
-            self.set_piece_at(rook_start, None)
-            if rook_piece: rook_piece.has_moved = True
-
-        # Основное движение фигуры
-        self.set_piece_at(end_pos, piece_to_move)
-        self.set_piece_at(start_pos, None)
+        # Двойной ход пешки создает возможность для en passant
+        self.en_passant_target = _SQ_TO_POS[(from_sq + to_sq) >> 1] if flags == DOUBLE_PAWN_PUSH else None
+
+        if is_castling:
+            # Рокировка: сначала снимаем короля и ладью (в 960 поля могут пересекаться)
+            row_start = from_sq & ~7
+            kingside = flags == KING_CASTLE
+            rook_piece = squares[to_sq >> 3][to_sq & 7]
+            self._set_square(to_sq, None)
+            self._set_square(from_sq, None)
+            self._set_square(row_start + (6 if kingside else 2), piece_to_move)
+            self._set_square(row_start + (5 if kingside else 3), rook_piece)
+            rook_piece.has_moved = True
+        else:
+            if flags == EN_PASSANT:
+                self._set_square(captured_sq, None)
+            self._set_square(from_sq, None)
+            if flags & PROMOTION:
+                promoted_class = _PIECE_CLASSES[PROMOTION_PIECE_TYPES[flags & 3]]
+                self._set_square(to_sq, promoted_class(self.color_to_move))
+            else:
+                self._set_square(to_sq, piece_to_move)
         piece_to_move.has_moved = True
 
-        # 4. Превращение пешки
-        if record.is_promotion:
-            self.set_piece_at(end_pos, (promotion_piece_class or queen.Queen)(self.color_to_move))
-
         # --- ОБНОВЛЕНИЕ СОСТОЯНИЙ ПОСЛЕ ХОДА ---
         # Обновление прав на рокировку (если двинулся король/ладья или съедена ладья)
-        self._update_castling_rights(start_pos, end_pos)
+        self._update_castling_rights(piece_to_move, from_sq, to_sq)
         
         # Обновление счетчиков
-        if isinstance(piece_to_move, pawn.Pawn) or captured_piece:
+        if piece_to_move.piece_type == PAWN or captured_piece:
             self.halfmove_clock = 0
         else:
             self.halfmove_clock += 1
@@ -402,8 +694,17 @@ class Board:
         """Отменяет последний сделанный ход."""
         if not self.history: return
         last_record = self.history.pop()
-        start_pos, end_pos = last_record.move
+        self._invalidate_caches()
+        move = last_record.move
+        from_sq, to_sq, flags = move & 63, (move >> 6) & 63, move >> 12
         
+        # Снимаем с учета позицию, которая сейчас на доске (до восстановления состояния)
+        current_hash = self.zobrist_key
+        if self.position_history[current_hash] > 1:
+            self.position_history[current_hash] -= 1
+        else:
+            del self.position_history[current_hash]
+
         # Восстановление состояния доски
         self.castling_rights = last_record.castling_rights
         self.en_passant_target = last_record.en_passant_target
@@ -412,56 +713,59 @@ class Board:
         self.color_to_move = BLACK if self.color_to_move == WHITE else WHITE
         if self.color_to_move == BLACK: self.fullmove_number -= 1
 
-        current_hash = self._get_position_hash()
-        if self.position_history[current_hash] > 0:
-            self.position_history[current_hash] -= 1
-        else: # На случай, если история пуста, но undo вызван
-            del self.position_history[current_hash]
+        moved_piece = last_record.moved_piece
+        moved_piece.has_moved = last_record.piece_had_moved
 
-        # Перемещение фигур обратно
-        moved_piece = self.get_piece_at(end_pos)
-        if last_record.is_promotion:
-            moved_piece = pawn.Pawn(self.color_to_move)
-
-        self.set_piece_at(start_pos, moved_piece)
-        if moved_piece: moved_piece.has_moved = last_record.piece_had_moved
-        
-        # Возврат съеденной фигуры
-        if last_record.is_en_passant_capture:
-            self.set_piece_at(end_pos, None)
-            pawn_dir = -1 if self.color_to_move == WHITE else 1
-            captured_pos = (end_pos[0] - pawn_dir, end_pos[1])
-            self.set_piece_at(captured_pos, last_record.captured_piece)
-        else:
-            self.set_piece_at(end_pos, last_record.captured_piece)
-            
         # Отмена рокировки
-        if isinstance(moved_piece, king.King) and abs(start_pos[1] - end_pos[1]) == 2:
-            rook_start = (start_pos[0], 7 if end_pos[1] > start_pos[1] else 0)
-            rook_end = (start_pos[0], 5 if end_pos[1] > start_pos[1] else 3)
-            rook_piece = self.get_piece_at(rook_end)
-            self.set_piece_at(rook_start, rook_piece)
-            self.set_piece_at(rook_end, None)
-            if rook_piece: rook_piece.has_moved = False
-
-    def _update_castling_rights(self, start_pos: tuple, end_pos: tuple):
-        """Обновляет права на рокировку после хода."""
-        piece = self.get_piece_at(end_pos) # Уже перемещенная
+        if flags == KING_CASTLE or flags == QUEEN_CASTLE:
+            row_start = from_sq & ~7
+            kingside = flags == KING_CASTLE
+            rook_end = row_start + (5 if kingside else 3)
+            rook_piece = self._squares[rook_end >> 3][rook_end & 7]
+            self._set_square(row_start + (6 if kingside else 2), None)
+            self._set_square(rook_end, None)
+            self._set_square(from_sq, moved_piece)
+            self._set_square(to_sq, rook_piece)
+            rook_piece.has_moved = False
+            return
+
+        # Перемещение фигур обратно (при превращении возвращается та же самая пешка)
+        # и возврат съеденной фигуры
+        if flags == EN_PASSANT:
+            self._set_square(to_sq, None)
+            self._set_square((from_sq & ~7) | (to_sq & 7), last_record.captured_piece)
+        else:
+            self._set_square(to_sq, last_record.captured_piece)
+        self._set_square(from_sq, moved_piece)
+        
+    def _update_castling_rights(self, moved_piece: piece.Piece, from_sq: int, to_sq: int):
+        """Обновляет права на рокировку после хода (поля - номера битборда)."""
+        if not self.castling_rights:
+            return
         # Движение короля
-        if isinstance(piece, king.King):
-            if piece.color == WHITE: self.castling_rights.wk = self.castling_rights.wq = False
-            else: self.castling_rights.bk = self.castling_rights.bq = False
-        # Движение ладьи
-        if isinstance(piece, rook.Rook):
-            if start_pos == (7, 0): self.castling_rights.wq = False
-            elif start_pos == (7, 7): self.castling_rights.wk = False
-            elif start_pos == (0, 0): self.castling_rights.bq = False
-            elif start_pos == (0, 7): self.castling_rights.bk = False
+        if moved_piece.piece_type == KING:
+            if moved_piece.color == WHITE: self.castling_rights &= ~(CastlingRights.WK | CastlingRights.WQ)
+            else: self.castling_rights &= ~(CastlingRights.BK | CastlingRights.BQ)
+        # Ладья ушла со своего исходного поля или была там съедена
+        for (color, kingside), flag in CastlingRights.FLAGS.items():
+            rook_sq = (56 if color == WHITE else 0) + self._castling_rook_col(color, kingside)
+            if from_sq == rook_sq or to_sq == rook_sq:
+                self.castling_rights &= ~flag
 
     def get_game_status(self) -> str:
-        """Определяет текущий статус игры."""
+        """Определяет текущий статус игры (результат кэшируется для позиции)."""
+        key = self.zobrist_key
+        cache_key = (key, self.halfmove_clock, self.position_history[key])
+        cached = self._game_status_cache
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+        status = self._compute_game_status()
+        self._game_status_cache = (cache_key, status)
+        return status
+
+    def _compute_game_status(self) -> str:
         # Проверка на троекратное повторение
-        if self.position_history[self._get_position_hash()] >= 3:
+        if self.position_history[self.zobrist_key] >= 3:
             return 'draw_repetition'
 
         # Проверка на правило 50 ходов
@@ -479,47 +783,47 @@ class Board:
         return 'in_progress'
 
     def load_from_fen(self, fen: str):
-        """Загружает позицию и состояние игры из FEN-строки."""
-        self.board = [[None for _ in range(8)] for _ in range(8)]
+        """
+        Загружает позицию и состояние игры из FEN-строки (проверенной, см.
+        fen.parse_fen; ошибка - FenError). В 960 права на рокировку читаются
+        в X-FEN или Shredder-FEN, по ним же ставятся исходные вертикали ладей.
+        """
+        position = parse_fen(fen, self.is_chess960)
+        # Массив, битборды и ключ фигур собираются за один проход (без _sync_bitboards по объектам)
+        squares = [[None] * 8 for _ in range(8)]
+        pieces_bb, occupancy, pieces_key = [[0] * 6, [0] * 6], [0, 0], 0
+        for sq, symbol in enumerate("".join(position.rows)):
+            if symbol != '.':
+                piece_class, color, color_idx, piece_type = _FEN_PIECES[symbol]
+                squares[sq >> 3][sq & 7] = piece_class(color)
+                pieces_bb[color_idx][piece_type] |= 1 << sq
+                occupancy[color_idx] |= 1 << sq
+                pieces_key ^= PIECE_KEYS[color_idx][piece_type][sq]
+        self._squares, self.pieces_bb, self.occupancy, self._pieces_key = squares, pieces_bb, occupancy, pieces_key
         self.history = []
-        
-        parts = fen.split(' ')
-        piece_placement, active_color, castling, en_passant, halfmove, fullmove = parts[:6]
-
-        # 1. Расстановка фигур
-        piece_map = {'p':pawn.Pawn,'r':rook.Rook,'n':knight.Knight,'b':bishop.Bishop,'q':queen.Queen,'k':king.King}
-        rows = piece_placement.split('/')
-        for r, row_str in enumerate(rows):
-            c = 0
-            for char in row_str:
-                if char.isdigit():
-                    c += int(char)
-                else:
-                    color = WHITE if char.isupper() else BLACK
-                    piece_class = piece_map[char.lower()]
-                    self.set_piece_at((r, c), piece_class(color))
-                    c += 1
-        
-        # 2. Чей ход
-        self.color_to_move = active_color
-        
-        # 3. Права на рокировку
-        self.castling_rights = CastlingRights(
-            'K' in castling, 'Q' in castling,
-            'k' in castling, 'q' in castling
-        )
-        
-        # 4. Взятие на проходе
-        if en_passant != '-':
-            col = 'abcdefgh'.find(en_passant[0])
-            row = 8 - int(en_passant[1])
-            self.en_passant_target = (row, col)
-        else:
-            self.en_passant_target = None
-            
-        # 5-6. Счетчики
-        self.halfmove_clock = int(halfmove)
-        self.fullmove_number = int(fullmove)
+        self.color_to_move = position.color
+        self.castling_rights = 0
+        rook_files = {WHITE: [], BLACK: []}
+        for entry in position.castling:
+            self.castling_rights |= CastlingRights.FLAGS[(entry.color, entry.kingside)]
+            rook_files[entry.color].append(entry.col)
+        # В классике ладьи рокировки всегда на a/h - вертикали нужны только 960
+        self.initial_rook_files = {color: sorted(files) for color, files in rook_files.items()} \
+            if self.is_chess960 else {WHITE: [], BLACK: []}
+        self.en_passant_target = position.en_passant
+        self.halfmove_clock = position.halfmove
+        self.fullmove_number = position.fullmove
+        self._invalidate_caches()
+        # История повторений начинается с загруженной позиции
+        self.position_history = Counter()
+        self._update_position_history()
+
+    def fen(self, shredder: bool = False) -> str:
+        """FEN позиции; права на рокировку в X-FEN (или Shredder-FEN с `shredder`)."""
+        castling = [CastlingRook(color, self._castling_rook_col(color, kingside), kingside)
+                    for (color, kingside), flag in CastlingRights.FLAGS.items() if self.castling_rights & flag]
+        return format_fen(self._squares, self.color_to_move, castling, self.en_passant_target,
+                          self.halfmove_clock, self.fullmove_number, shredder)
 
     def __str__(self) -> str:
         """Строковое представление доски для отладки."""
@@ -532,4 +836,3 @@ class Board:
             s += f" {8 - r}\n"
         s += "  a b c d e f g h\n"
         return s
-
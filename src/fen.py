@@ -0,0 +1,241 @@
+"""
+FEN и EPD: разбор с проверкой и запись позиции.
+
+Модуль не зависит от доски (board.py сам пользуется им в load_from_fen и
+fen()), поэтому работает с простыми данными: ряды доски - строки из 8
+символов ('.' - пустое поле) от 8-й горизонтали к 1-й, права на рокировку -
+вертикали ладей.
+
+Права на рокировку читаются в трех видах: обычный FEN (KQkq), X-FEN (KQkq
+означает крайнюю ладью с нужной стороны от короля, буква вертикали - ладью
+внутри) и Shredder-FEN (только буквы вертикалей: HAha). Пишутся в X-FEN,
+который понимают и обычные программы, или по запросу в Shredder-FEN.
+
+EPD - первые четыре поля FEN и операции `код операнд ...;` (bm, am, id,
+hmvc, fmvn, c0, D1...). Ходы bm/am остаются строками SAN: их разбирает
+pgn.epd_moves на доске позиции.
+"""
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+FILES = "abcdefgh"
+STANDARD_START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+_EXPAND = str.maketrans({str(n): "." * n for n in range(1, 9)})
+_PLACEMENT_CHARS = frozenset("pnbrqkPNBRQK./")
+_ADJACENT_DIGITS_RE = re.compile(r"\d\d")
+# Пустые поля при записи сворачиваются заменами от длинных серий к коротким
+_COLLAPSE = [("." * n, str(n)) for n in range(8, 1, -1)] + [(".", "1")]
+_CASTLING_LETTERS = frozenset("KQkqABCDEFGHabcdefgh")
+_EP_SQUARES = {"w": {f + "6": (2, col) for col, f in enumerate(FILES)},
+               "b": {f + "3": (5, col) for col, f in enumerate(FILES)}}
+_EPD_TOKEN_RE = re.compile(r'"((?:[^"\\]|\\.)*)"|(;)|([^\s;"]+)')
+_EPD_CLOCKS = ("hmvc", "fmvn")
+_EPD_FEN_CLOCKS_RE = re.compile(r"(\d+)\s+(\d+)(?=\s|;|$)\s*")
+# Операнды этих операций - всегда строки в кавычках
+_EPD_STRING_OPCODES = frozenset(["id"] + [f"c{n}" for n in range(10)])
+
+
+class FenError(ValueError):
+    pass
+
+
+class CastlingRook(NamedTuple):
+    color: str      # 'w' / 'b'
+    col: int        # вертикаль ладьи
+    kingside: bool
+
+
+class FenPosition(NamedTuple):
+    rows: List[str]  # 8 строк по 8 символов, от 8-й горизонтали; '.' - пустое поле
+    color: str
+    castling: List[CastlingRook]
+    en_passant: Optional[Tuple[int, int]]  # (ряд, колонка)
+    halfmove: int
+    fullmove: int
+
+
+class EpdRecord(NamedTuple):
+    fen: str  # позиция с ходами из hmvc/fmvn (по умолчанию 0 1)
+    operations: Dict[str, List[str]]  # код -> операнды (строки в кавычках уже без кавычек)
+
+    @property
+    def id(self) -> Optional[str]:
+        operands = self.operations.get("id")
+        return operands[0] if operands else None
+
+
+def parse_fen(fen: str, chess960: bool = False) -> FenPosition:
+    """
+    Разбирает и проверяет FEN: 8 горизонталей по 8 полей, по одному королю,
+    нет пешек на крайних горизонталях, права на рокировку соответствуют
+    королю и ладьям, поле взятия на проходе - за только что прошедшей пешкой.
+    Счетчики ходов можно опустить (как в EPD). Ошибка - FenError.
+    """
+    fields = fen.split()
+    if len(fields) not in (4, 6):
+        raise FenError(f"expected 4 or 6 fields, got {len(fields)}: {fen!r}")
+    placement, color, castling, en_passant = fields[:4]
+
+    expanded = placement.translate(_EXPAND)
+    rows = expanded.split("/")
+    if (len(rows) != 8 or any(len(row) != 8 for row in rows) or not _PLACEMENT_CHARS.issuperset(expanded)
+            or _ADJACENT_DIGITS_RE.search(placement)):
+        raise FenError(f"bad piece placement: {placement!r}")
+    squares = "".join(rows)
+    if squares.count("K") != 1 or squares.count("k") != 1:
+        raise FenError(f"each side needs exactly one king: {placement!r}")
+    if "p" in rows[0] + rows[7] or "P" in rows[0] + rows[7]:
+        raise FenError(f"pawns on the first or last rank: {placement!r}")
+
+    if color not in ("w", "b"):
+        raise FenError(f"bad side to move: {color!r}")
+
+    ep = None
+    if en_passant != "-":
+        ep = _EP_SQUARES[color].get(en_passant)
+        if ep is None:
+            raise FenError(f"bad en passant square: {en_passant!r}")
+        row, col = ep
+        pawn_row, start_row = (row + 1, row - 1) if color == "w" else (row - 1, row + 1)
+        pawn = "p" if color == "w" else "P"
+        if rows[pawn_row][col] != pawn or rows[row][col] != "." or rows[start_row][col] != ".":
+            raise FenError(f"no pawn could have just passed {en_passant}")
+
+    halfmove, fullmove = 0, 1
+    if len(fields) == 6:
+        try:
+            halfmove, fullmove = int(fields[4]), int(fields[5])
+        except ValueError:
+            raise FenError(f"bad move counters: {fields[4]!r} {fields[5]!r}") from None
+        if halfmove < 0 or fullmove < 0:
+            raise FenError(f"negative move counters: {fields[4]} {fields[5]}")
+        fullmove = max(fullmove, 1)  # некоторые программы пишут 0
+
+    return FenPosition(rows, color, _parse_castling(castling, rows, chess960), ep, halfmove, fullmove)
+
+
+def _parse_castling(castling: str, rows: List[str], chess960: bool) -> List[CastlingRook]:
+    if castling == "-":
+        return []
+    if not _CASTLING_LETTERS.issuperset(castling) or len(set(castling)) != len(castling):
+        raise FenError(f"bad castling field: {castling!r}")
+    rooks = []
+    for letter in castling:
+        color = "w" if letter.isupper() else "b"
+        back_rank = rows[7] if color == "w" else rows[0]
+        king, rook = ("K", "R") if color == "w" else ("k", "r")
+        king_col = back_rank.find(king)
+        if king_col < 0:
+            raise FenError(f"castling right {letter!r} without the king on its back rank")
+        upper = letter.upper()
+        if upper == "K":
+            col = back_rank.rfind(rook)
+            col = col if col > king_col else -1
+        elif upper == "Q":
+            col = back_rank.find(rook)
+            col = col if 0 <= col < king_col else -1
+        else:
+            col = FILES.index(letter.lower())
+            col = col if back_rank[col] == rook else -1
+        if col < 0:
+            raise FenError(f"castling right {letter!r} without a rook")
+        if not chess960 and (king_col != 4 or col not in (0, 7)):
+            raise FenError(f"castling right {letter!r} needs the king and rook on their initial squares")
+        entry = CastlingRook(color, col, col > king_col)
+        if any(other.color == color and other.kingside == entry.kingside for other in rooks):
+            raise FenError(f"two castling rights for one side: {castling!r}")
+        rooks.append(entry)
+    return rooks
+
+
+def format_fen(squares, color: str, castling: Iterable[CastlingRook], en_passant: Optional[Tuple[int, int]],
+               halfmove: int, fullmove: int, shredder: bool = False) -> str:
+    """
+    FEN по рядам доски: `squares` - 8 рядов по 8 фигур (объекты с .symbol
+    или None), как Board.board. Права на рокировку пишутся в X-FEN или,
+    с `shredder`, в Shredder-FEN.
+    """
+    placement = "/".join(["".join([p.symbol if p else "." for p in row]) for row in squares])
+    ep = f"{FILES[en_passant[1]]}{8 - en_passant[0]}" if en_passant else "-"
+    return (f"{_collapse(placement)} {color} {_format_castling(placement, castling, shredder)} {ep} "
+            f"{halfmove} {fullmove}")
+
+
+def _collapse(placement: str) -> str:
+    for dots, digit in _COLLAPSE:
+        placement = placement.replace(dots, digit)
+    return placement
+
+
+def _format_castling(placement: str, castling: Iterable[CastlingRook], shredder: bool) -> str:
+    letters = []
+    for entry in sorted(castling, key=lambda e: (e.color != "w", not e.kingside)):
+        letter = FILES[entry.col]
+        if not shredder:
+            # Буква K/Q, если ладья - крайняя с этой стороны от короля, иначе вертикаль (X-FEN)
+            back_rank = placement[63:71] if entry.color == "w" else placement[:8]
+            rook = "R" if entry.color == "w" else "r"
+            outer = back_rank.rfind(rook) if entry.kingside else back_rank.find(rook)
+            if outer == entry.col:
+                letter = "k" if entry.kingside else "q"
+        letters.append(letter.upper() if entry.color == "w" else letter)
+    return "".join(letters) or "-"
+
+
+# --- EPD ---
+
+def parse_epd(line: str) -> EpdRecord:
+    """
+    Разбирает строку EPD: четыре поля позиции и операции. Счетчики ходов -
+    из hmvc/fmvn или из полей 5-6, если строка начинается с полного FEN.
+    Позиция проверяется при загрузке на доску.
+    """
+    fields = line.split(None, 4)
+    if len(fields) < 4:
+        raise FenError(f"EPD needs 4 position fields: {line.strip()!r}")
+    rest = fields[4] if len(fields) > 4 else ""
+    clocks = _EPD_FEN_CLOCKS_RE.match(rest)
+    if clocks:
+        # Наборы вроде perftsuite пишут полный FEN со счетчиками перед операциями
+        rest = rest[clocks.end():]
+    operations: Dict[str, List[str]] = {}
+    opcode, operands = None, []
+    for match in _EPD_TOKEN_RE.finditer(rest):
+        quoted, semicolon, word = match.groups()
+        if semicolon:
+            if opcode is not None:  # пустые операции (';D1 20 ;D2 400') пропускаются
+                operations[opcode] = operands
+            opcode, operands = None, []
+        elif opcode is None:
+            if word is None or not word[0].isalpha():
+                raise FenError(f"bad EPD opcode: {match.group()!r}")
+            opcode = word
+        else:
+            operands.append(word if quoted is None else re.sub(r"\\(.)", r"\1", quoted))
+    if opcode is not None:
+        operations[opcode] = operands  # последняя операция без ';'
+    counters = list(clocks.groups()) if clocks else ["0", "1"]
+    for i, name in enumerate(_EPD_CLOCKS):
+        if operations.get(name):
+            counters[i] = operations[name][0]
+    return EpdRecord(" ".join(fields[:4] + counters), operations)
+
+
+def format_epd(fen: str, operations: Dict[str, List[str]]) -> str:
+    """Строка EPD: позиция из FEN (без счетчиков) и операции; id, c0-c9 и операнды с пробелами - в кавычках."""
+    parts = [" ".join(fen.split()[:4])]
+    for opcode, operands in operations.items():
+        quoted = ['"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+                  if opcode in _EPD_STRING_OPCODES or not value or re.search(r'[\s;"]', value) else value
+                  for value in operands]
+        parts.append(" ".join([opcode] + quoted) + ";")
+    return " ".join(parts)
+
+
+def read_epd(stream: TextIO) -> Iterator[EpdRecord]:
+    """Записи EPD файла по одной; пустые строки и строки-комментарии (#) пропускаются."""
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield parse_epd(line)
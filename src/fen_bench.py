@@ -0,0 +1,80 @@
+"""
+Замер скорости FEN/EPD: разбор с проверкой (fen.parse_fen), загрузка на
+доску (Board.load_from_fen) и запись (Board.fen), для сравнения - то же
+в python-chess. Позиции - из случайных партий (обычных и 960) с
+фиксированным зерном, так что прогоны сравнимы между собой.
+Запуск из корня проекта: `python3 run_fen_bench.py` (см. --help).
+"""
+import argparse
+import random
+import time
+from typing import Callable, List, Optional, Tuple
+
+import chess
+
+from Board import Board
+from fen import parse_fen, parse_epd, format_epd
+
+
+def sample_positions(count: int, seed: int = 1) -> List[Tuple[str, bool]]:
+    """(FEN, 960 ли) позиций случайных партий: по позиции на каждый полуход."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = Board(is_chess960=len(positions) % 2 == 1, rng=rng)
+        for _ in range(rng.randint(10, 120)):
+            moves = board.get_legal_moves()
+            if not moves or len(positions) >= count:
+                break
+            board.make_move(rng.choice(moves))
+            positions.append((board.fen(), board.is_chess960))
+    return positions
+
+
+def _rate(function: Callable, items: list, repeat: int) -> float:
+    """Операций в секунду (лучший из `repeat` прогонов)."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            function(item)
+        best = min(best, time.perf_counter() - started)
+    return len(items) / best if best > 0 else 0.0
+
+
+def run_benchmark(count: int, repeat: int = 3, out: Callable[[str], None] = print) -> dict:
+    positions = sample_positions(count)
+    standard = Board()
+    chess960 = Board(is_chess960=True)
+    boards = []
+    for fen, is_chess960 in positions:
+        board = Board(is_chess960=is_chess960)
+        board.load_from_fen(fen)
+        boards.append(board)
+    lib_boards = [chess.Board(fen, chess960=is_chess960) for fen, is_chess960 in positions]
+    epd_lines = [format_epd(fen, {"bm": ["e4"], "id": [f"pos.{i}"]}) for i, (fen, _) in enumerate(positions)]
+
+    def load(item):
+        (chess960 if item[1] else standard).load_from_fen(item[0])
+
+    rates = {
+        "parse_fen": _rate(lambda item: parse_fen(*item), positions, repeat),
+        "Board.load_from_fen": _rate(load, positions, repeat),
+        "Board.fen": _rate(Board.fen, boards, repeat),
+        "parse_epd": _rate(parse_epd, epd_lines, repeat),
+        "python-chess Board(fen)": _rate(lambda item: chess.Board(item[0], chess960=item[1]), positions, repeat),
+        "python-chess fen()": _rate(chess.Board.fen, lib_boards, repeat),
+    }
+    out(f"{len(positions)} positions (half of them Chess960), best of {repeat}")
+    for name, rate in rates.items():
+        out(f"{name:<26}{rate:>12.0f} /s")
+    return rates
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Замер скорости разбора и записи FEN/EPD.")
+    parser.add_argument("--positions", type=int, default=5000, help="число позиций")
+    parser.add_argument("--repeat", type=int, default=3, help="число прогонов (берется лучший)")
+    args = parser.parse_args(argv)
+    run_benchmark(max(1, args.positions), max(1, args.repeat))
+    return 0
@@ -8,9 +8,11 @@ class Game960(GameWithHints):
     Класс для игры в Шахматы-960.
     Наследует все возможности игры с подсказками, но использует другую доску.
     """
-    def __init__(self, player_color: str, skill_level: int, lang: str = "ru"):
+    def __init__(self, player_color: str, skill_level: int, lang: str = "ru", engine_pool=None,
+                 analysis_cache=None, opening_book=None, tablebase=None, position_index=None):
         # Вызываем конструктор родителя, НО не даем ему создать доску
-        super().__init__(player_color, skill_level, lang)
+        super().__init__(player_color, skill_level, lang, engine_pool, analysis_cache, opening_book, tablebase,
+                         position_index)
         
         # Создаем НАШУ специальную доску для 960
         self.board = Board(is_chess960=True)
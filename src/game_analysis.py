@@ -0,0 +1,366 @@
+"""
+Разбор партии: оценка каждого полухода, лучший ход, потеря в сантипешках
+(centipawn loss) и классификация ошибок.
+
+Позиции партии независимы, поэтому их считают параллельно несколько
+процессов Stockfish (EnginePool): каждый поток берет свой движок и забирает
+позиции из общей очереди. Без Stockfish разбор идет встроенным движком в
+одном потоке. Партии PGN-файла читаются по одной и разбираются по мере
+чтения: несколько партий идут параллельно (по партии на движок), но в работе
+их не больше 2 * движков, так что память не зависит от размера архива.
+Запуск из корня проекта: `python3 run_analysis.py` (см. --help).
+С --explorer к каждому ходу добавляется, сколько партий библиотеки прошли
+через позицию до хода и сколько из них продолжились тем же ходом.
+"""
+import argparse
+import collections
+import json
+import os
+import queue
+import sys
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+import chess
+import chess.engine
+import chess.pgn
+
+from engine.analysis import AnalysisLine
+from game_record import GameRecord
+from game_library import GameLibrary
+from pgn import board_from_fen
+from position_index import PositionIndex
+from lib_board_bridge import LibBoardBridge
+from engine.builtin_engine import BuiltinEngine
+from engine.engine_pool import EnginePool
+from engine.engine_options import EngineOptions
+
+# Оценки матом при подсчете потерь приравниваются к большому перевесу
+MATE_CP = 1000
+# Пороги потери (в сантипешках) для классификации хода
+INACCURACY_CP = 50
+MISTAKE_CP = 100
+BLUNDER_CP = 300
+
+DEFAULT_DEPTH = 14
+BUILTIN_TIME = 0.3  # встроенному движку глубина 14 не по силам - даем время на позицию
+SAVED_GAME_FILE = os.path.join("user_data", "saved_game.json")  # старое сохранение (до библиотеки)
+LIBRARY_FILE = os.path.join("user_data", "games.sqlite3")
+
+
+class AnalysisLimits(NamedTuple):
+    depth: Optional[int] = DEFAULT_DEPTH
+    nodes: Optional[int] = None
+    time: Optional[float] = None
+
+
+class MoveAnalysis(NamedTuple):
+    ply: int  # номер полухода в партии, с 1
+    move_number: int
+    color: bool  # chess.WHITE / chess.BLACK
+    san: str
+    uci: str
+    best_san: str  # лучший ход по мнению движка в позиции до хода
+    eval_before: int  # оценка до хода, сантипешки за белых
+    eval_after: int  # оценка после хода, сантипешки за белых
+    cp_loss: int
+    classification: str  # "", "inaccuracy", "mistake" или "blunder"
+    explorer_games: int = 0  # партий библиотеки с позицией до хода (с --explorer)
+    explorer_move_games: int = 0  # из них с тем же ходом
+
+
+class GameAnalysis(NamedTuple):
+    headers: Dict[str, str]
+    moves: List[MoveAnalysis]
+
+    def average_cp_loss(self, color: bool) -> float:
+        losses = [move.cp_loss for move in self.moves if move.color == color]
+        return sum(losses) / len(losses) if losses else 0.0
+
+    def count(self, color: bool, classification: str) -> int:
+        return sum(1 for move in self.moves if move.color == color and move.classification == classification)
+
+
+def classify(cp_loss: int) -> str:
+    if cp_loss >= BLUNDER_CP:
+        return "blunder"
+    if cp_loss >= MISTAKE_CP:
+        return "mistake"
+    if cp_loss >= INACCURACY_CP:
+        return "inaccuracy"
+    return ""
+
+
+def _clamped_cp(score: chess.engine.Score) -> int:
+    return max(-MATE_CP, min(MATE_CP, score.score(mate_score=100 * MATE_CP)))
+
+
+def _terminal_line(board: chess.Board) -> Optional[AnalysisLine]:
+    """Оценка конца партии без движка (мат - проигрыш стороны, которая ходит)."""
+    if board.is_checkmate():
+        return AnalysisLine(0, chess.engine.Cp(-MATE_CP), [])
+    if board.is_stalemate() or board.is_insufficient_material():
+        return AnalysisLine(0, chess.engine.Cp(0), [])
+    return None
+
+
+def evaluate_positions(boards: List[chess.Board], engines: list, limits: AnalysisLimits) -> List[AnalysisLine]:
+    """Оценивает позиции параллельно: по одному потоку на движок, общая очередь позиций."""
+    results: List[Optional[AnalysisLine]] = [None] * len(boards)
+    jobs: "queue.Queue[int]" = queue.Queue()
+    for i, board in enumerate(boards):
+        results[i] = _terminal_line(board)
+        if results[i] is None:
+            jobs.put(i)
+
+    def work(engine):
+        while True:
+            try:
+                i = jobs.get_nowait()
+            except queue.Empty:
+                return
+            results[i] = engine.analyse(boards[i], depth=limits.depth, nodes=limits.nodes, time=limits.time)
+
+    with ThreadPoolExecutor(max_workers=len(engines)) as executor:
+        for future in [executor.submit(work, engine) for engine in engines]:
+            future.result()  # пробрасывает ошибки движка
+    return results
+
+
+def explorer_counts(game: chess.pgn.Game, positions: PositionIndex) -> List[Tuple[int, int]]:
+    """
+    Для каждого хода основной линии: (партий библиотеки с позицией до хода,
+    из них продолжившихся тем же ходом). Ключи индекса - ключи нашей доски,
+    поэтому партия переигрывается на ней.
+    """
+    start = game.board()
+    board = board_from_fen(start.fen(), start.chess960)
+    counts = []
+    for move in game.mainline_moves():
+        packed = board.move_from_uci(move.uci())
+        if packed is None:
+            break  # позиции дальше в индексе не найти
+        position_stats = positions.stats(board)
+        same = next((entry.stats.games for entry in position_stats.moves if entry.move == packed), 0)
+        counts.append((position_stats.total.games, same))
+        board.make_move(packed)
+    return counts
+
+
+def analyse_game(game: chess.pgn.Game, engines: list, limits: AnalysisLimits = AnalysisLimits(),
+                 positions: Optional[PositionIndex] = None) -> GameAnalysis:
+    """Разбирает основную линию партии; с индексом позиций добавляет статистику по библиотеке."""
+    explorer = explorer_counts(game, positions) if positions is not None else []
+    return _analyse_mainline(game, engines, limits, explorer)
+
+
+def _analyse_mainline(game: chess.pgn.Game, engines: list, limits: AnalysisLimits,
+                      explorer: List[Tuple[int, int]]) -> GameAnalysis:
+    board = game.board()
+    boards = [board.copy()]
+    for move in game.mainline_moves():
+        board.push(move)
+        boards.append(board.copy())
+    lines = evaluate_positions(boards, engines, limits)
+
+    moves = []
+    for ply in range(1, len(boards)):
+        before, after = boards[ply - 1], boards[ply]
+        move = after.peek()
+        best, reply = lines[ply - 1], lines[ply]
+        # Обе оценки - с точки зрения стороны, сделавшей ход
+        best_cp = _clamped_cp(best.score)
+        played_cp = -_clamped_cp(reply.score)
+        best_move = best.pv[0] if best.pv else move
+        cp_loss = 0 if move == best_move else max(0, best_cp - played_cp)
+        sign = 1 if before.turn == chess.WHITE else -1
+        moves.append(MoveAnalysis(
+            ply, before.fullmove_number, before.turn, before.san(move), move.uci(), before.san(best_move),
+            sign * best_cp, sign * played_cp, cp_loss, classify(cp_loss),
+            *(explorer[ply - 1] if ply <= len(explorer) else ()),
+        ))
+    return GameAnalysis(dict(game.headers), moves)
+
+
+def load_saved_game(path: str = SAVED_GAME_FILE) -> chess.pgn.Game:
+    """Сохраненная партия (user_data/saved_game.json и журнал ходов) как объект PGN."""
+    _, _, board = GameRecord.load(path)
+    return chess.pgn.Game.from_board(LibBoardBridge(board).sync())
+
+
+def load_library_game(game_id: Optional[int] = None, path: str = LIBRARY_FILE) -> chess.pgn.Game:
+    """Партия из библиотеки по ID (без ID - последняя сыгранная)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    library = GameLibrary(path)
+    try:
+        if game_id is None:
+            latest = library.list_games(limit=1)
+            if not latest:
+                raise KeyError("library is empty")
+            game_id = latest[0].id
+        return library.load_pgn_game(game_id)
+    finally:
+        library.close()
+
+
+def analyse_games(games: Iterable[chess.pgn.Game], engines: list, limits: AnalysisLimits = AnalysisLimits(),
+                  positions: Optional[PositionIndex] = None) -> Iterator[GameAnalysis]:
+    """
+    Разбирает партии по мере поступления, с сохранением порядка. Одна партия
+    (или один движок) - позиции делятся между всеми движками; иначе каждая
+    партия считается своим движком, и в работе не больше 2 * движков партий.
+    Статистика библиотеки собирается в вызывающем потоке (соединение SQLite
+    нельзя передавать между потоками).
+    """
+    games = iter(games)
+    first = next(games, None)
+    second = next(games, None)
+    if first is None:
+        return
+    if len(engines) <= 1 or second is None:
+        yield analyse_game(first, engines, limits, positions)
+        if second is not None:
+            yield analyse_game(second, engines, limits, positions)
+            for game in games:
+                yield analyse_game(game, engines, limits, positions)
+        return
+
+    free: "queue.Queue" = queue.Queue()
+    for engine in engines:
+        free.put(engine)
+
+    def work(game: chess.pgn.Game, explorer: List[Tuple[int, int]]) -> GameAnalysis:
+        engine = free.get()
+        try:
+            return _analyse_mainline(game, [engine], limits, explorer)
+        finally:
+            free.put(engine)
+
+    def submit(executor, game):
+        return executor.submit(work, game, explorer_counts(game, positions) if positions is not None else [])
+
+    with ThreadPoolExecutor(max_workers=len(engines)) as executor:
+        pending = collections.deque([submit(executor, first), submit(executor, second)])
+        for game in games:
+            if len(pending) >= 2 * len(engines):
+                yield pending.popleft().result()
+            pending.append(submit(executor, game))
+        while pending:
+            yield pending.popleft().result()
+
+
+def read_pgn_games(stream: TextIO) -> Iterator[chess.pgn.Game]:
+    """Партии PGN по одной (генератор): архив не загружается в память целиком."""
+    while True:
+        game = chess.pgn.read_game(stream)
+        if game is None:
+            return
+        yield game
+
+
+def open_engines(workers: int):
+    """
+    Запускает `workers` процессов Stockfish. Возвращает (движки, пул);
+    если Stockfish недоступен - один встроенный движок и None.
+    """
+    pool = EnginePool(size=workers)
+    engines = []
+    try:
+        for _ in range(workers):
+            # Параллельность - по позициям, поэтому каждому процессу один поток
+            engines.append(pool.acquire(skill_level=20, search_time=0, options=EngineOptions(threads=1), timeout=0))
+    except queue.Empty:
+        pass  # Часть процессов не запустилась - работаем теми, что есть
+    except (FileNotFoundError, RuntimeError) as e:
+        print(f"Stockfish unavailable ({e}), using the built-in engine", file=sys.stderr)
+    if not engines:
+        pool.close()
+        return [BuiltinEngine(skill_level=20)], None
+    return engines, pool
+
+
+def format_analysis(analysis: GameAnalysis) -> str:
+    rows = []
+    white, black = analysis.headers.get("White", "?"), analysis.headers.get("Black", "?")
+    rows.append(f"{white} - {black}  {analysis.headers.get('Result', '*')}")
+    rows.append(f"{'Move':<12}{'Eval':>7}{'Best':>10}{'Loss':>7}")
+    for move in analysis.moves:
+        number = f"{move.move_number}." if move.color == chess.WHITE else f"{move.move_number}..."
+        row = f"{number + ' ' + move.san:<12}{move.eval_after / 100:>+7.2f}{move.best_san:>10}{move.cp_loss:>7}  {move.classification}"
+        if move.explorer_games:
+            row = f"{row:<55}[{move.explorer_move_games}/{move.explorer_games}]"
+        rows.append(row.rstrip())
+    for color, name in ((chess.WHITE, "White"), (chess.BLACK, "Black")):
+        rows.append(
+            f"{name}: ACPL {analysis.average_cp_loss(color):.0f}, "
+            f"inaccuracies {analysis.count(color, 'inaccuracy')}, "
+            f"mistakes {analysis.count(color, 'mistake')}, "
+            f"blunders {analysis.count(color, 'blunder')}"
+        )
+    return "\n".join(rows)
+
+
+def analysis_to_json(analysis: GameAnalysis) -> dict:
+    moves = [dict(move._asdict(), color="white" if move.color == chess.WHITE else "black") for move in analysis.moves]
+    return {"headers": analysis.headers, "moves": moves}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Разбор партий: оценка каждого хода, потери и ошибки.")
+    parser.add_argument("pgn", nargs="?", help="PGN-файл (без него - партия из библиотеки в user_data)")
+    parser.add_argument("--game", type=int, help="ID партии в библиотеке (по умолчанию - последняя)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="число процессов Stockfish")
+    parser.add_argument("--depth", type=int, help=f"глубина анализа каждой позиции (по умолчанию {DEFAULT_DEPTH})")
+    parser.add_argument("--nodes", type=int, help="лимит узлов на позицию")
+    parser.add_argument("--time", type=float, help="время на позицию, секунды")
+    parser.add_argument("--json", action="store_true", help="вывод в JSON")
+    parser.add_argument("--explorer", action="store_true",
+                        help="статистика позиций по партиям библиотеки: [с тем же ходом/всего]")
+    args = parser.parse_args(argv)
+
+    stream = None
+    try:
+        if args.pgn:
+            stream = open(args.pgn, 'r', encoding='utf-8')
+            games = read_pgn_games(stream)
+        elif args.game is None and not os.path.exists(LIBRARY_FILE) and os.path.exists(SAVED_GAME_FILE):
+            games = [load_saved_game()]
+        else:
+            games = [load_library_game(args.game)]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Cannot read game: {e}", file=sys.stderr)
+        return 1
+    engines, pool = open_engines(max(1, args.workers))
+    if args.depth or args.nodes or args.time:
+        limits = AnalysisLimits(args.depth, args.nodes, args.time)
+    else:
+        limits = AnalysisLimits() if pool is not None else AnalysisLimits(depth=None, time=BUILTIN_TIME)
+    library = GameLibrary(LIBRARY_FILE) if args.explorer and os.path.exists(LIBRARY_FILE) else None
+    try:
+        positions = library.positions if library is not None else None
+        # Разбор каждой партии выводится сразу, как только готов (JSON - тем же списком, что и целиком)
+        separator = ",\n" if args.json else "\n\n"
+        if args.json:
+            print("[")
+        count = 0
+        for analysis in analyse_games(games, engines, limits, positions):
+            if args.json:
+                text = textwrap.indent(json.dumps(analysis_to_json(analysis), ensure_ascii=False, indent=2), "  ")
+            else:
+                text = format_analysis(analysis)
+            print((separator if count else "") + text, end="", flush=True)
+            count += 1
+        if args.json:
+            print("\n]" if count else "]")
+        else:
+            print()
+    finally:
+        if pool is not None:
+            pool.close()
+        if library is not None:
+            library.close()
+        if stream is not None:
+            stream.close()
+    return 0
@@ -0,0 +1,434 @@
+"""
+Библиотека партий: все сохраненные и законченные партии в одной базе SQLite.
+
+Сводка партии (дата, режим, итог, уровень соперника, начало дебюта) лежит в
+индексированных колонках - списки и фильтры читают только их, не загружая
+ходы. Ходы хранятся так же, как в журнале старого сохранения (game_record.py): по
+2 байта на полуход, упакованный ход из moves.py. Идущая партия сохраняется
+после каждого хода (и отмены хода) одним UPDATE: к ходам в базе дописываются
+только новые, после отмены запись сначала обрезается. Импорт и экспорт - в PGN.
+"""
+import argparse
+import collections
+import datetime
+import io
+import json
+import os
+import sqlite3
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+import chess.pgn
+
+from Board import Board
+from lib_board_bridge import board_to_fen
+from pgn import read_games, split_games, write_game, game_result, san_with_check, board_from_fen
+from position_index import PositionIndex, SCHEMA as POSITIONS_SCHEMA, RESULT_SCORES, game_positions
+
+MOVE_FORMAT = struct.Struct("<H")
+OPENING_PLIES = 8  # сколько первых полуходов хранится как "дебют" для фильтра
+IMPORTED_MODE = "pgn"
+UNFINISHED = "*"
+IMPORT_BATCH_GAMES = 200  # партий в одном задании процесса импорта (и в одной транзакции)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    played TEXT NOT NULL,            -- дата начала партии (ISO)
+    updated TEXT NOT NULL,
+    mode TEXT NOT NULL,              -- класс игры (GameVsStockfish...) или 'pgn' для импорта
+    player_color TEXT,               -- цвет игрока; NULL - импортированная партия
+    skill_level INTEGER,             -- уровень соперника-движка
+    lang TEXT,
+    white TEXT NOT NULL DEFAULT '?',
+    black TEXT NOT NULL DEFAULT '?',
+    result TEXT NOT NULL DEFAULT '*',
+    termination TEXT,
+    opening TEXT NOT NULL DEFAULT '', -- первые полуходы в SAN через пробел
+    plies INTEGER NOT NULL DEFAULT 0,
+    start_fen TEXT NOT NULL,
+    chess960 INTEGER NOT NULL DEFAULT 0,
+    rook_files TEXT,                 -- JSON: начальные вертикали ладей (для 960)
+    headers TEXT,                    -- JSON: прочие теги PGN
+    moves BLOB NOT NULL DEFAULT x''
+);
+CREATE INDEX IF NOT EXISTS games_played ON games(played);
+CREATE INDEX IF NOT EXISTS games_mode ON games(mode, played);
+CREATE INDEX IF NOT EXISTS games_result ON games(result, played);
+CREATE INDEX IF NOT EXISTS games_skill ON games(skill_level, played);
+CREATE INDEX IF NOT EXISTS games_opening ON games(opening);
+"""
+SUMMARY_COLUMNS = "id, played, mode, player_color, skill_level, white, black, result, termination, opening, plies"
+
+
+class GameSummary(NamedTuple):
+    id: int
+    played: str
+    mode: str
+    player_color: Optional[str]
+    skill_level: Optional[int]
+    white: str
+    black: str
+    result: str
+    termination: Optional[str]
+    opening: str
+    plies: int
+
+
+class GameFilter(NamedTuple):
+    """Фильтр списка партий; None - любое значение."""
+    mode: Optional[str] = None
+    result: Optional[str] = None
+    skill_level: Optional[int] = None
+    opening: Optional[str] = None  # начало дебюта в SAN, например "e4 c5"
+    since: Optional[str] = None  # дата ISO, включительно
+    until: Optional[str] = None
+
+    def where(self) -> Tuple[str, list]:
+        clauses, params = [], []
+        for column, value in (("mode", self.mode), ("result", self.result), ("skill_level", self.skill_level)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if self.opening:
+            # GLOB с префиксом идет по индексу; в SAN нет символов шаблона GLOB
+            clauses.append("opening GLOB ?")
+            params.append(" ".join(self.opening.split()) + "*")
+        if self.since:
+            clauses.append("played >= ?")
+            params.append(self.since)
+        if self.until:
+            clauses.append("played < ?")
+            params.append(self.until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat(sep=" ", timespec="seconds")
+
+
+def _pack(moves: Iterable[int]) -> bytes:
+    return b"".join(MOVE_FORMAT.pack(move) for move in moves)
+
+
+def _opening(board: Board) -> str:
+    """Первые OPENING_PLIES полуходов партии в SAN (доска откатывается и возвращается в ту же позицию)."""
+    moves = [record.move for record in board.history]
+    for _ in moves:
+        board.undo_move()
+    sans = [san_with_check(board, move) for move in moves[:OPENING_PLIES]]
+    for move in moves[OPENING_PLIES:]:
+        board.make_move(move)
+    return " ".join(sans)
+
+
+class ImportedGame(NamedTuple):
+    """Партия из PGN, готовая к записи: все, что требует разбора ходов, уже посчитано."""
+    headers: dict
+    start_fen: str
+    chess960: bool
+    rook_files: dict
+    moves: List[int]
+    opening: str
+    positions: list  # для индекса позиций, см. position_index.game_positions
+
+
+def prepare_games(text: str) -> List[ImportedGame]:
+    """Разбирает кусок PGN (выполняется в процессах импорта); партии с нелегальными ходами пропускаются."""
+    prepared = []
+    for game in read_games(io.StringIO(text)):
+        if game.error is not None:
+            continue
+        board = game.board()
+        positions = game_positions(board) if game.headers.get("Result") in RESULT_SCORES else []
+        opening = _opening(board)
+        for _ in game.moves:
+            board.undo_move()
+        prepared.append(ImportedGame(game.headers, board_to_fen(board), board.is_chess960,
+                                     board.initial_rook_files, game.moves, opening, positions))
+    return prepared
+
+
+def _batches(texts: Iterator[str], size: int) -> Iterator[str]:
+    batch = []
+    for text in texts:
+        batch.append(text)
+        if len(batch) == size:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def _map_bounded(function: Callable, items: Iterator, workers: int) -> Iterator:
+    """
+    map по процессам с сохранением порядка; в работе не больше 2 * workers
+    заданий, так что память не зависит от размера входа.
+    """
+    first = next(items, None)
+    second = next(items, None)
+    if first is None:
+        return
+    if workers <= 1 or second is None:
+        yield function(first)
+        if second is not None:
+            yield function(second)
+            yield from map(function, items)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque([executor.submit(function, first), executor.submit(function, second)])
+        for item in items:
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+            pending.append(executor.submit(function, item))
+        while pending:
+            yield pending.popleft().result()
+
+
+class LibraryRecord:
+    """Запись идущей партии в библиотеке: автосохранение ходов и итог партии."""
+    def __init__(self, library: "GameLibrary", game_id: int, moves: List[int]):
+        self.library = library
+        self.game_id = game_id
+        self._moves = moves  # уже записанные ходы
+
+    def sync(self, board: Board):
+        """Дописывает новые ходы доски (после отмены - сначала обрезает запись)."""
+        history = [record.move for record in board.history]
+        common = 0
+        for written, move in zip(self._moves, history):
+            if written != move:
+                break
+            common += 1
+        if common == len(self._moves) == len(history):
+            return
+        # Начало дебюта в сводке пересчитывается, только пока меняются его полуходы
+        opening = _opening(board) if common < OPENING_PLIES else None
+        self.library._append_moves(self.game_id, common, history[common:], opening)
+        self._moves = history
+
+    def finish(self, board: Board):
+        """Партия закончена: дописывает ходы и результат, позиции партии идут в индекс."""
+        self.sync(board)
+        self.library._finish(self.game_id, board)
+
+
+class GameLibrary:
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        # WAL: запись хода - одна страница в журнал; FULL - каждый ход на диске (fsync)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        new_index = self._db.execute("SELECT 1 FROM sqlite_master WHERE name = 'positions'").fetchone() is None
+        self._db.executescript(SCHEMA + POSITIONS_SCHEMA)
+        self.positions = PositionIndex(self._db)
+        if new_index:
+            self._index_finished_games()
+
+    def close(self):
+        self._db.close()
+
+    # --- Партии приложения ---
+
+    def start_game(self, board: Board, info: dict) -> LibraryRecord:
+        """
+        Добавляет партию приложения (`info` - тип игры, цвет игрока, уровень,
+        имена сторон) с начальной позицией `board`; уже сделанные ходы
+        тоже пишутся.
+        """
+        moves = [record.move for record in board.history]
+        for _ in moves:
+            board.undo_move()
+        start_fen, rook_files = board_to_fen(board), board.initial_rook_files
+        for move in moves:
+            board.make_move(move)
+        result = game_result(board)
+        now = _now()
+        with self._db:
+            cursor = self._db.execute(
+                "INSERT INTO games (played, updated, mode, player_color, skill_level, lang, white, black, result,"
+                " termination, opening, plies, start_fen, chess960, rook_files, moves)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (info.get("played", now), now, info["game_type"], info.get("player_color"), info.get("skill_level"),
+                 info.get("lang"), info.get("white", "?"), info.get("black", "?"), result,
+                 None if result == UNFINISHED else board.get_game_status(), _opening(board),
+                 len(moves), start_fen, int(board.is_chess960), json.dumps(rook_files), _pack(moves)),
+            )
+        return LibraryRecord(self, cursor.lastrowid, moves)
+
+    def resume(self, game_id: int) -> Tuple[LibraryRecord, GameSummary, Board]:
+        """Партия для продолжения: запись, сводка и доска с историей ходов."""
+        summary = self.summary(game_id)
+        board = self.load_board(game_id)
+        return LibraryRecord(self, game_id, [record.move for record in board.history]), summary, board
+
+    def _append_moves(self, game_id: int, keep: int, moves: List[int], opening: Optional[str]):
+        """Оставляет первые `keep` полуходов записи и дописывает к ним `moves`."""
+        with self._db:
+            # || склеивает как текст - CAST возвращает тип BLOB (байты, в том числе нулевые, сохраняются);
+            # substr пустого BLOB - NULL
+            self._db.execute(
+                "UPDATE games SET moves = CAST(ifnull(substr(moves, 1, ?), x'') || ? AS BLOB), plies = ?, updated = ?,"
+                " opening = coalesce(?, opening) WHERE id = ?",
+                (keep * MOVE_FORMAT.size, _pack(moves), keep + len(moves), _now(), opening, game_id),
+            )
+
+    def _finish(self, game_id: int, board: Board):
+        result = game_result(board)
+        with self._db:
+            self._db.execute("UPDATE games SET result = ?, termination = ?, updated = ? WHERE id = ?",
+                             (result, board.get_game_status(), _now(), game_id))
+            self.positions.add_game(game_id, game_positions(board), result)
+
+    def _index_finished_games(self):
+        """Заполняет индекс позиций по уже лежащим в базе партиям (база из версии без индекса)."""
+        rows = self._db.execute("SELECT id, result FROM games WHERE result != ?", (UNFINISHED,)).fetchall()
+        with self._db:
+            for game_id, result in rows:
+                self.positions.add_game(game_id, game_positions(self.load_board(game_id)), result)
+
+    # --- Списки ---
+
+    def list_games(self, game_filter: GameFilter = GameFilter(), limit: int = 20, offset: int = 0) -> List[GameSummary]:
+        """Сводки партий по фильтру, новые первыми (ходы не читаются)."""
+        where, params = game_filter.where()
+        rows = self._db.execute(
+            f"SELECT {SUMMARY_COLUMNS} FROM games{where} ORDER BY played DESC, id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        )
+        return [GameSummary(*row) for row in rows]
+
+    def count(self, game_filter: GameFilter = GameFilter()) -> int:
+        where, params = game_filter.where()
+        return self._db.execute(f"SELECT count(*) FROM games{where}", params).fetchone()[0]
+
+    def latest_unfinished(self) -> Optional[GameSummary]:
+        """Последняя недоигранная партия приложения (для "Продолжить игру")."""
+        row = self._db.execute(
+            f"SELECT {SUMMARY_COLUMNS} FROM games WHERE result = ? AND mode != ? ORDER BY played DESC, id DESC LIMIT 1",
+            (UNFINISHED, IMPORTED_MODE),
+        ).fetchone()
+        return GameSummary(*row) if row else None
+
+    def summary(self, game_id: int) -> GameSummary:
+        row = self._db.execute(f"SELECT {SUMMARY_COLUMNS} FROM games WHERE id = ?", (game_id,)).fetchone()
+        if row is None:
+            raise KeyError(game_id)
+        return GameSummary(*row)
+
+    def delete(self, game_id: int):
+        with self._db:
+            self._db.execute("DELETE FROM games WHERE id = ?", (game_id,))
+            self.positions.remove_game(game_id)
+
+    # --- Загрузка партии ---
+
+    def load_board(self, game_id: int) -> Board:
+        """Наша доска: начальная позиция и все ходы партии (история для отмены и повторений)."""
+        row = self._db.execute("SELECT start_fen, chess960, rook_files, moves FROM games WHERE id = ?",
+                               (game_id,)).fetchone()
+        if row is None:
+            raise KeyError(game_id)
+        start_fen, chess960, rook_files, data = row
+        board = board_from_fen(start_fen, bool(chess960))
+        if rook_files:
+            board.initial_rook_files = {color: list(files) for color, files in json.loads(rook_files).items()}
+        for (move,) in MOVE_FORMAT.iter_unpack(data):
+            board.make_move(move)
+        return board
+
+    def _pgn_headers(self, game_id: int) -> dict:
+        """Теги PGN партии: сохраненные при импорте плюс игроки, результат и дата из сводки."""
+        summary = self.summary(game_id)
+        stored = self._db.execute("SELECT headers FROM games WHERE id = ?", (game_id,)).fetchone()[0]
+        headers = json.loads(stored) if stored else {}
+        headers.setdefault("Date", summary.played[:10].replace("-", "."))
+        headers.update(White=summary.white, Black=summary.black, Result=summary.result)
+        return headers
+
+    def load_pgn_game(self, game_id: int) -> chess.pgn.Game:
+        """Партия как объект PGN python-chess (для разбора партии движком)."""
+        out = io.StringIO()
+        write_game(out, self.load_board(game_id), self._pgn_headers(game_id))
+        out.seek(0)
+        return chess.pgn.read_game(out)
+
+    # --- PGN ---
+
+    def import_pgn(self, stream: TextIO, workers: int = 1) -> int:
+        """
+        Импортирует все партии из PGN и добавляет их позиции в индекс.
+        Файл читается потоково (см. pgn.py); разбор ходов при `workers` > 1
+        идет в нескольких процессах, запись - здесь, пачками по
+        IMPORT_BATCH_GAMES партий. Партии с нелегальными ходами пропускаются.
+        Возвращает число импортированных.
+        """
+        count = 0
+        batches = _batches(split_games(stream), IMPORT_BATCH_GAMES)
+        for prepared in _map_bounded(prepare_games, batches, workers):
+            with self._db:
+                for game in prepared:
+                    game_id = self._insert_imported(game)
+                    self.positions.add_game(game_id, game.positions, game.headers.get("Result", UNFINISHED))
+            count += len(prepared)
+        return count
+
+    def _insert_imported(self, game: ImportedGame) -> int:
+        headers = dict(game.headers)
+        # Партия без даты сортируется по дню импорта, а тег Date остается как был
+        date = headers.get("Date", "????.??.??").replace(".", "-")
+        if "?" in date:
+            played = _now()[:10]
+        else:
+            played = date
+            del headers["Date"]
+        now = _now()
+        cursor = self._db.execute(
+            "INSERT INTO games (played, updated, mode, white, black, result, termination, opening, plies,"
+            " start_fen, chess960, rook_files, headers, moves) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (played, now, IMPORTED_MODE, headers.pop("White", "?"), headers.pop("Black", "?"),
+             headers.pop("Result", UNFINISHED), headers.get("Termination"), game.opening, len(game.moves),
+             game.start_fen, int(game.chess960), json.dumps(game.rook_files),
+             json.dumps({key: value for key, value in headers.items() if key not in ("FEN", "SetUp", "Variant")}),
+             _pack(game.moves)),
+        )
+        return cursor.lastrowid
+
+    def export_pgn(self, out: TextIO, game_filter: GameFilter = GameFilter()) -> int:
+        """Пишет партии по фильтру в PGN (по одной за раз); возвращает их число."""
+        where, params = game_filter.where()
+        ids = [row[0] for row in self._db.execute(f"SELECT id FROM games{where} ORDER BY played, id", params)]
+        for game_id in ids:
+            write_game(out, self.load_board(game_id), self._pgn_headers(game_id))
+        return len(ids)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Импорт PGN-архивов в библиотеку партий и индекс позиций.")
+    parser.add_argument("pgn", nargs="+", help="PGN-файлы")
+    parser.add_argument("--library", default=os.path.join("user_data", "games.sqlite3"), help="файл библиотеки")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="число процессов разбора")
+    args = parser.parse_args(argv)
+
+    library = GameLibrary(args.library)
+    try:
+        for path in args.pgn:
+            started = time.monotonic()
+            try:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    count = library.import_pgn(f, workers=max(1, args.workers))
+            except OSError as e:
+                print(f"Cannot read {path}: {e}", file=sys.stderr)
+                return 1
+            elapsed = time.monotonic() - started
+            print(f"{path}: {count} games in {elapsed:.1f} s ({count / max(elapsed, 1e-9):.0f} games/s)")
+    finally:
+        library.close()
+    return 0
@@ -0,0 +1,79 @@
+"""
+Чтение сохранения партии из версий до библиотеки партий (game_library.py):
+при первом запуске оно переносится в библиотеку и удаляется.
+
+Формат: метаданные и начальная позиция - в JSON, ходы - в журнале рядом
+(`.moves`), по 2 байта на полуход (упакованный ход из moves.py). Еще более
+старые сохранения хранят FEN и ходы в UCI прямо в JSON. При загрузке ходы
+проигрываются через Board.make_move: история (отмена хода) и повторения
+позиций восстанавливаются вместе с позицией.
+"""
+import json
+import os
+import struct
+from typing import Tuple
+
+from Board import Board
+
+MOVE_FORMAT = struct.Struct("<H")
+
+
+class GameRecord:
+    """Сохранение партии: `path` - JSON с метаданными, ходы - в файле с расширением .moves."""
+    def __init__(self, path: str):
+        self.path = path
+        self.moves_path = os.path.splitext(path)[0] + ".moves"
+
+    def delete(self):
+        """Партия перенесена - сохранение больше не нужно."""
+        for path in (self.path, self.moves_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def set_aside(self, suffix: str = ".bad") -> str:
+        """Нечитаемое сохранение: файлы получают окончание `suffix`, а не удаляются. Возвращает новый путь JSON."""
+        for path in (self.path, self.moves_path):
+            if os.path.exists(path):
+                os.replace(path, path + suffix)
+        return self.path + suffix
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["GameRecord", dict, Board]:
+        """
+        Читает сохранение: (запись, метаданные, доска с историей).
+        Недописанный или нелегальный хвост журнала (сбой во время записи)
+        отбрасывается. Нечитаемое сохранение - ValueError (в том числе
+        ошибка JSON или FEN) или KeyError.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        board = Board(is_chess960=metadata.get("chess960", metadata.get("game_type") == "Game960"))
+        fen = metadata.get("start_fen", metadata.get("fen"))
+        if fen is None:
+            raise KeyError("start_fen")
+        board.load_from_fen(fen)
+        if metadata.get("rook_files"):
+            board.initial_rook_files = {color: list(files) for color, files in metadata["rook_files"].items()}
+
+        record = cls(path)
+        if "rook_files" not in metadata:
+            # Старый формат: ходы в UCI прямо в JSON (или только итоговый FEN)
+            for uci in metadata.get("moves", []) if "start_fen" in metadata else []:
+                move = board.move_from_uci(uci)
+                if move is None:
+                    break
+                board.make_move(move)
+        else:
+            try:
+                with open(record.moves_path, 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                data = b""
+            whole = len(data) - len(data) % MOVE_FORMAT.size
+            for (move,) in MOVE_FORMAT.iter_unpack(data[:whole]):
+                if move not in board.get_legal_moves():
+                    break
+                board.make_move(move)
+        info = {key: value for key, value in metadata.items()
+                if key not in ("start_fen", "chess960", "rook_files", "fen", "moves")}
+        return record, info, board
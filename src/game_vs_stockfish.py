@@ -1,48 +1,81 @@
 import chess
+from typing import Optional, TYPE_CHECKING
 from Board import Board, WHITE, BLACK
+from lib_board_bridge import LibBoardBridge
 from engine.stockfish_engine import StockfishEngine
+from engine.builtin_engine import BuiltinEngine
+from engine.analysis_cache import AnalysisCache, AnalysisEntry
+from engine.engine_options import EngineOptions
+from engine.opening_book import OpeningBook
+from engine.tablebase import Tablebase
 from renderer import TerminalRenderer
 from localization import LocalizationManager
-from pieces import queen
 
-def board_to_fen(b: Board) -> str:
-    # Эта вспомогательная функция остается здесь
-    fen_pieces = ""
-    for r in range(8):
-        empty_count = 0
-        for c in range(8):
-            piece = b.get_piece_at((r, c))
-            if piece:
-                if empty_count > 0: fen_pieces += str(empty_count)
-                empty_count = 0
-                fen_pieces += piece.symbol
-            else: empty_count += 1
-        if empty_count > 0: fen_pieces += str(empty_count)
-        if r < 7: fen_pieces += '/'
-    active_color = b.color_to_move
-    castling_fen = str(b.castling_rights)
-    en_passant_fen = "-"
-    if b.en_passant_target:
-        row, col = b.en_passant_target
-        en_passant_fen = f"{'abcdefgh'[col]}{8 - row}"
-    return f"{fen_pieces} {active_color} {castling_fen} {en_passant_fen} {b.halfmove_clock} {b.fullmove_number}"
+if TYPE_CHECKING:
+    from engine.engine_pool import EnginePool
 
 class GameVsStockfish:
-    def __init__(self, player_color: str, skill_level: int, lang: str = "ru"):
+    def __init__(self, player_color: str, skill_level: int, lang: str = "ru",
+                 engine_pool: Optional["EnginePool"] = None, analysis_cache: Optional[AnalysisCache] = None,
+                 opening_book: Optional[OpeningBook] = None, tablebase: Optional[Tablebase] = None):
         self.localizer = LocalizationManager(lang=lang)
         if player_color not in [WHITE, BLACK]:
             raise ValueError(self.localizer.get("player_color_error"))
         self.board = Board()
         self.player_color = player_color
+        # Движок из пула приложения уже запущен; без пула - свой процесс на партию
+        self.engine_pool = None
         try:
-            self.engine = StockfishEngine(skill_level=skill_level)
+            if engine_pool is not None:
+                self.engine = engine_pool.acquire(skill_level=skill_level, search_time=1.0)
+                self.engine_pool = engine_pool
+            else:
+                self.engine = StockfishEngine(skill_level=skill_level)
         except (FileNotFoundError, RuntimeError) as e:
             if isinstance(e, FileNotFoundError): print(self.localizer.get("stockfish_not_found"))
             else: print(self.localizer.get("stockfish_exec_error", error=e))
-            exit(1)
+            # Вместо выхода играем встроенным движком
+            print(self.localizer.get("builtin_engine_fallback"))
+            self.engine = BuiltinEngine(skill_level=skill_level)
         self.render_config = {'flip_board': True, 'piece_set': 'unicode'}
         self.renderer = TerminalRenderer(self.render_config, self.localizer)
         self.last_move = None
+        self._bridge: Optional[LibBoardBridge] = None
+        # Кэш приложения живет между партиями (и на диске); без него - свой на партию
+        self.analysis_cache = analysis_cache if analysis_cache is not None else AnalysisCache()
+        # Ходы ИИ кэшируются только в памяти и только в этой партии: между партиями
+        # ИИ не должен повторять один и тот же ход, а ответ зависит от истории партии
+        self.move_cache = AnalysisCache()
+        # Дебютная книга: пока позиция в книге, ход берется из нее без движка
+        self.opening_book = opening_book
+        # Таблицы Syzygy: в эндшпиле из таблиц ход точный и мгновенный
+        self.tablebase = tablebase
+
+    def _engine_board(self) -> chess.Board:
+        """chess.Board с историей партии для движка (досинхронизируется по ходам)."""
+        # Доска могла быть заменена (Шахматы-960) - тогда мост строится заново
+        if self._bridge is None or self._bridge.board is not self.board:
+            self._bridge = LibBoardBridge(self.board)
+        return self._bridge.sync()
+
+    def configure_engine(self, options: EngineOptions):
+        """Ресурсы и пределы поиска движка из настроек (потоки, хэш, узлы/глубина)."""
+        self.engine.configure(self.engine.skill_level, self.engine.search_time, options)
+
+    def close_engine(self):
+        """Возвращает движок в пул или завершает его процесс, если он был создан для этой партии."""
+        if self.engine_pool is not None:
+            self.engine_pool.release(self.engine)
+        else:
+            self.engine.close()
+
+    def _message(self, text: str):
+        """
+        Сообщение об ошибке ввода под доской. Ввод повторяется, и строки могут
+        прокрутить экран, поэтому следующий кадр рисуется целиком.
+        """
+        print(text)
+        self.renderer.invalidate()
 
     def _player_turn(self) -> bool:
         """Обрабатывает ход игрока в СТАНДАРТНОЙ игре."""
@@ -57,32 +90,51 @@ class GameVsStockfish:
                     return False if choice == self.localizer.get("confirm_yes") else True
                 
                 move = self._parse_user_input(user_input)
-                if move in self.board.get_legal_moves():
+                if move is not None:
                     self.board.make_move(move)
                     self.last_move = move
                     return True
                 else:
-                    print(self.localizer.get("illegal_move"))
+                    self._message(self.localizer.get("illegal_move"))
             except ValueError as e:
-                print(self.localizer.get("input_error", error=e))
+                self._message(self.localizer.get("input_error", error=e))
 
     def _ai_turn(self):
+        # Одна строка под доской экран не прокрутит: следующий кадр сотрет ее сам
         print(self.localizer.get("ai_thinking"))
-        current_fen = board_to_fen(self.board)
-        best_move_lib = self.engine.find_best_move_from_fen(current_fen)
+        lib_board = self._engine_board()
+        # Число повторений позиции - в ключе: ход при повторении ищется заново (троекратное повторение)
+        key = AnalysisCache.key(lib_board, "move", type(self.engine).__name__, self.engine.skill_level,
+                                self.engine.search_time, self.engine.options.nodes, self.engine.options.depth,
+                                self.board.position_history[self.board.zobrist_key])
+        book_move = self.opening_book.choose(lib_board) if self.opening_book else None
+        if book_move is None and self.tablebase is not None:
+            book_move = self.tablebase.best_move(lib_board)
+        cached = self.move_cache.get(key) if book_move is None else None
+        if book_move is not None:
+            best_move_lib = book_move # Ход из книги или таблиц - движок не нужен
+            self.engine.stop_pondering()
+        elif cached is not None and cached.best_move in lib_board.legal_moves:
+            best_move_lib = cached.best_move
+            self.engine.stop_pondering() # Обдумывание этой позиции уже не понадобится
+        else:
+            best_move_lib = self.engine.find_best_move(lib_board)
+            self.move_cache.put(key, AnalysisEntry(best_move_lib, []))
         our_move = self._convert_lib_move_to_our(best_move_lib)
-        promo_class = None
-        if best_move_lib.promotion and best_move_lib.promotion == chess.QUEEN:
-            promo_class = queen.Queen
-        self.board.make_move(our_move, promotion_piece_class=promo_class)
+        self.board.make_move(our_move)
         self.last_move = our_move
     
-    def _parse_user_input(self, uci_move: str) -> tuple:
+    def _parse_user_input(self, uci_move: str) -> Optional[int]:
+        """Строка UCI -> упакованный легальный ход (None, если ход нелегален)."""
         if len(uci_move) < 4: raise ValueError(self.localizer.get("invalid_move_length"))
-        start_col = 'abcdefgh'.find(uci_move[0]); start_row = 8 - int(uci_move[1])
-        end_col = 'abcdefgh'.find(uci_move[2]); end_row = 8 - int(uci_move[3])
-        if -1 in [start_col, start_row, end_col, end_row]: raise ValueError(self.localizer.get("invalid_coordinates"))
-        return ((start_row, start_col), (end_row, end_col))
+        if uci_move[0] not in 'abcdefgh' or uci_move[2] not in 'abcdefgh' or \
+           uci_move[1] not in '12345678' or uci_move[3] not in '12345678':
+            raise ValueError(self.localizer.get("invalid_coordinates"))
+        return self.board.move_from_uci(uci_move)
 
-    def _convert_lib_move_to_our(self, lib_move: chess.Move) -> tuple:
-        return self._parse_user_input(lib_move.uci())
+    def _convert_lib_move_to_our(self, lib_move: chess.Move) -> int:
+        # Превращение (в том числе недопревращение) сохраняется в самом ходе
+        move = self.board.move_from_uci(lib_move.uci())
+        if move is None:
+            raise ValueError(self.localizer.get("illegal_move"))
+        return move
@@ -1,12 +1,29 @@
 # src/game_with_hints.py
+import sys
+import threading
 import chess
+from typing import Optional
 from game_vs_stockfish import GameVsStockfish  # Наследуемся от базовой игры
+from engine.analysis_cache import AnalysisCache, AnalysisEntry
+from pgn import move_to_san
+
+HINT_PV_LENGTH = 6 # Сколько полуходов варианта показывать в подсказке
+HINT_EXPLORER_MOVES = 5 # Сколько ходов из наших партий показывать в подсказке
+TABLEBASE_RESULT_KEYS = {2: "tablebase_win", 1: "tablebase_cursed_win", 0: "tablebase_draw",
+                         -1: "tablebase_blessed_loss", -2: "tablebase_loss"}
 
 class GameWithHints(GameVsStockfish):
     """Расширенная версия игры с командами 'undo' и 'hint'."""
-    def __init__(self, player_color: str, skill_level: int, lang: str = "ru"):
-        super().__init__(player_color, skill_level, lang)
+    def __init__(self, player_color: str, skill_level: int, lang: str = "ru", engine_pool=None,
+                 analysis_cache=None, opening_book=None, tablebase=None, position_index=None):
+        super().__init__(player_color, skill_level, lang, engine_pool, analysis_cache, opening_book, tablebase)
+        # Индекс позиций библиотеки: подсказка показывает, что играли в этой позиции в наших партиях
+        self.position_index = position_index
         self.engine.search_time = 0.5 
+        # Подсказки: число линий и пределы анализа (меню настроек / settings.json)
+        self.hint_lines = 3
+        self.hint_depth: Optional[int] = 20
+        self.hint_nodes: Optional[int] = None
 
     def _player_turn(self) -> bool:
         """Переопределенный метод для обработки undo/hint и выхода."""
@@ -28,50 +45,139 @@ class GameWithHints(GameVsStockfish):
                         self.board.undo_move() # Отменяем свой ход
                         self.last_move = None
                     else:
-                        print(f"\n{self.localizer.get('illegal_move')}") # Можно использовать эту же ошибку
+                        self._message(f"\n{self.localizer.get('illegal_move')}") # Можно использовать эту же ошибку
                     return True # Возвращаемся в игровой цикл для перерисовки
                 
                 # Команда подсказки
                 elif user_input == self.localizer.get("command_hint"):
                     self._show_hints()
+                    self.renderer.invalidate() # Подсказки могли прокрутить экран
                     continue # Снова ждем ввода от игрока
                 
                 # Обычный ход
                 else:
                     move = self._parse_user_input(user_input)
-                    if move in self.board.get_legal_moves():
+                    if move is not None:
                         self.board.make_move(move)
                         self.last_move = move
                         return True
                     else:
-                        print(self.localizer.get("illegal_move"))
+                        self._message(self.localizer.get("illegal_move"))
             except ValueError as e:
-                print(self.localizer.get("input_error", error=e))
+                self._message(self.localizer.get("input_error", error=e))
 
     def _show_hints(self):
-        """Запрашивает у движка и выводит 3 лучших хода."""
-        print(self.localizer.get("ai_thinking"))
-        from game_vs_stockfish import board_to_fen
-        current_fen = board_to_fen(self.board)
-        lib_board = chess.Board(current_fen)
+        """
+        Потоковый анализ: лучшие линии обновляются на месте по мере роста
+        глубины, Enter останавливает анализ в любой момент. Позиция, уже
+        проанализированная с теми же настройками, показывается из кэша сразу;
+        прерванный анализ из кэша продолжается с того, что уже было найдено.
+        """
+        lib_board = self._engine_board()
+        key = AnalysisCache.key(lib_board, "hints", type(self.engine).__name__,
+                                self.hint_lines, self.hint_depth, self.hint_nodes)
+        cached = self.analysis_cache.get(key)
         print("\n" + self.localizer.get("hint_header"))
+        book_moves = self.opening_book.moves(lib_board) if self.opening_book else []
+        if book_moves:
+            print(self._format_book_moves(lib_board, book_moves))
+        tablebase_result = self.tablebase.probe(lib_board) if self.tablebase else None
+        if tablebase_result is not None:
+            print(self._format_tablebase(lib_board, tablebase_result))
+        position_stats = self.position_index.stats(self.board) if self.position_index else None
+        if position_stats is not None and position_stats.total.games:
+            print(self._format_explorer(position_stats))
+        if cached is not None and cached.complete:
+            self._draw_hint_lines(lib_board, cached.lines, 0)
+            print("-" * 40)
+            input(self.localizer.get("press_enter_to_continue"))
+            return
+
+        print(self.localizer.get("hint_stop_prompt"))
+        shown = self._draw_hint_lines(lib_board, cached.lines, 0) if cached else 0
         try:
-            info = self.engine.engine.analyse(
-                lib_board, 
-                chess.engine.Limit(time=self.engine.search_time), 
-                multipv=3
-            )
-            if not info:
-                print("  " + self.localizer.get("illegal_move")) # Используем общую ошибку
-            for i, move_info in enumerate(info):
-                if move_info.get("pv"):
-                    move = move_info["pv"][0]
-                    score = move_info["score"].relative
-                    score_points = score.score() / 100.0 if score.score() is not None else "Мат"
-                    print(f"  {i+1}. Ход: {move.uci()}, Оценка: {score_points:+.2f}")
-                else: break
+            analysis = self.engine.start_analysis(lib_board, self.hint_lines, depth=self.hint_depth, nodes=self.hint_nodes)
         except Exception as e:
-            print(f"Не удалось получить подсказки: {e}")
+            print(self.localizer.get("hint_error", error=e))
+            input(self.localizer.get("press_enter_to_continue"))
+            return
+
+        stopped = threading.Event()
+        def wait_for_enter():
+            try:
+                input()
+            except EOFError:
+                pass
+            stopped.set()
+            analysis.stop()
+        waiter = threading.Thread(target=wait_for_enter, daemon=True)
+        waiter.start()
+
+        best_lines = cached.lines if cached else []
+        try:
+            for lines in analysis:
+                if lines and (not best_lines or lines[0].depth >= best_lines[0].depth):
+                    best_lines = lines
+                if stopped.is_set():
+                    continue # Enter уже сдвинул курсор - оставляем то, что видел игрок
+                shown = self._draw_hint_lines(lib_board, best_lines, shown)
+        except Exception as e:
+            print(self.localizer.get("hint_error", error=e))
+        if best_lines:
+            self.analysis_cache.put(key, AnalysisEntry(best_lines[0].pv[0], best_lines, complete=not stopped.is_set()))
+        if not shown:
+            print("  " + self.localizer.get("illegal_move")) # Используем общую ошибку
         print("-" * 40)
-        input(self.localizer.get("press_enter_to_continue"))
+        if not stopped.is_set():
+            # Анализ дошел до лимита - ждем того же Enter, чтобы продолжить
+            print(self.localizer.get("press_enter_to_continue"), end="", flush=True)
+        waiter.join()
+
+    def _draw_hint_lines(self, lib_board: chess.Board, lines, shown: int) -> int:
+        """Перерисовывает линии поверх `shown` ранее выведенных; возвращает число выведенных."""
+        out = [f"\033[{shown}F\033[J"] if shown else []
+        for i, line in enumerate(lines):
+            out.append(self._format_hint_line(lib_board, i + 1, line) + "\n")
+        sys.stdout.write("".join(out))
+        sys.stdout.flush()
+        return len(lines)
+
+    def _format_book_moves(self, lib_board: chess.Board, book_moves) -> str:
+        """Ходы книги с долей веса: `e4 (52%), d4 (31%)`."""
+        total = sum(entry.weight for entry in book_moves)
+        moves = ", ".join(f"{lib_board.san(entry.move)} ({100 * entry.weight // total}%)" for entry in book_moves)
+        return self.localizer.get("hint_book", moves=moves)
+
+    def _format_tablebase(self, lib_board: chess.Board, result) -> str:
+        """Точный результат из таблиц Syzygy (за сторону, которая ходит) и лучший ход."""
+        move = self.tablebase.best_move(lib_board)
+        return self.localizer.get(
+            "hint_tablebase", move=lib_board.san(move) if move else "-",
+            result=self.localizer.get(TABLEBASE_RESULT_KEYS[result.wdl]), dtz=abs(result.dtz),
+        )
+
+    def _format_explorer(self, position_stats) -> str:
+        """Статистика позиции по нашим партиям и самые частые ходы с долей очков за сторону, которая ходит."""
+        total = position_stats.total
+        lines = [self.localizer.get(
+            "hint_explorer", games=total.games, white=total.white, draws=total.draws, black=total.black,
+        )]
+        color = self.board.color_to_move
+        moves = ", ".join(
+            f"{move_to_san(self.board, entry.move)} {entry.stats.games} ({100 * entry.stats.score(color):.0f}%)"
+            for entry in position_stats.moves[:HINT_EXPLORER_MOVES]
+        )
+        if moves:
+            lines.append(self.localizer.get("hint_explorer_moves", moves=moves))
+        return "\n".join(lines)
 
+    def _format_hint_line(self, lib_board: chess.Board, index: int, line) -> str:
+        score = line.score
+        if score.is_mate():
+            score_text = f"#{score.mate()}"
+        else:
+            score_text = f"{score.score() / 100.0:+.2f}"
+        return self.localizer.get(
+            "hint_line", index=index, move=line.pv[0].uci(), score=score_text,
+            depth=line.depth, pv=lib_board.variation_san(line.pv[:HINT_PV_LENGTH]),
+        )
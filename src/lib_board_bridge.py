@@ -0,0 +1,53 @@
+import chess
+from typing import List
+from Board import Board, MoveRecord
+from moves import move_to_uci
+
+def board_to_fen(b: Board) -> str:
+    """FEN доски; в 960 права на рокировку в X-FEN, который читает и python-chess."""
+    return b.fen()
+
+
+class LibBoardBridge:
+    """
+    chess.Board, который идет в ногу с нашей доской: начальная позиция
+    плюс стек ходов партии. Движок получает `position startpos moves ...`
+    с полной историей (и видит повторения), а FEN строится только один раз -
+    для начальной позиции.
+
+    sync() сверяет стек с board.history и докладывает/снимает только
+    изменившиеся ходы (новые ходы, отмена через undo_move).
+    """
+    def __init__(self, board: Board):
+        self.board = board
+        self._build_root()
+
+    def _build_root(self):
+        """Строит корневую позицию: откатывает историю, снимает FEN и возвращает ходы."""
+        board = self.board
+        moves = [record.move for record in board.history]
+        for _ in moves:
+            board.undo_move()
+        self.lib_board = chess.Board(board_to_fen(board), chess960=board.is_chess960)
+        for move in moves:
+            board.make_move(move)
+        # load_from_fen заменяет список истории - так замечаем загрузку новой позиции
+        self._history = board.history
+        self._records: List[MoveRecord] = []
+
+    def sync(self) -> chess.Board:
+        """Приводит chess.Board к текущей позиции нашей доски и возвращает его."""
+        history = self.board.history
+        if history is not self._history:
+            self._build_root()
+            history = self._history
+        records, lib_board = self._records, self.lib_board
+        # Снимаем ходы, которых больше нет в истории (отменены)
+        while records and (len(records) > len(history) or records[-1] is not history[len(records) - 1]):
+            records.pop()
+            lib_board.pop()
+        chess960 = self.board.is_chess960
+        for record in history[len(records):]:
+            lib_board.push(chess.Move.from_uci(move_to_uci(record.move, chess960)))
+            records.append(record)
+        return lib_board
@@ -0,0 +1,279 @@
+"""
+Матч движков без участия человека: две конфигурации (уровень, время на ход,
+Stockfish или встроенный движок) играют N партий, результат - разница в
+Эло с 95% доверительным интервалом и скорость в партиях в минуту.
+
+Партии идут парами: одна и та же случайная стартовая позиция (несколько
+случайных полуходов или расстановка 960 из Board._setup_board_960) играется
+дважды со сменой цвета. Пары независимы и раскладываются по процессам -
+по одной на ядро. Запуск из корня проекта: `python3 run_match.py` (см. --help).
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from Board import Board, WHITE
+from lib_board_bridge import LibBoardBridge
+from engine.builtin_engine import BuiltinEngine
+from engine.engine_options import EngineOptions
+from engine.stockfish_engine import StockfishEngine
+from engine.tablebase import Tablebase, WIN, LOSS
+
+ENGINE_KINDS = ("stockfish", "builtin")
+DEFAULT_RANDOM_PLIES = 6
+MAX_PLIES = 400  # дольше - ничья по решению арбитра
+# Каждой партии Stockfish - один поток и небольшой хэш: параллельность - по партиям
+MATCH_ENGINE_OPTIONS = EngineOptions(threads=1, hash_mb=16)
+
+
+class EngineSpec(NamedTuple):
+    """Участник матча, в командной строке - `вид:уровень@секунды`, например `stockfish:8@0.1`."""
+    kind: str
+    skill_level: int
+    search_time: float
+
+    @classmethod
+    def parse(cls, text: str) -> "EngineSpec":
+        kind, _, rest = text.partition(":")
+        skill, _, seconds = rest.partition("@")
+        if kind not in ENGINE_KINDS:
+            raise ValueError(f"unknown engine '{kind}', expected one of: {', '.join(ENGINE_KINDS)}")
+        try:
+            return cls(kind, int(skill) if skill else 10, float(seconds) if seconds else 0.1)
+        except ValueError:
+            raise ValueError(f"bad engine spec '{text}', expected kind:skill@seconds") from None
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{self.skill_level}@{self.search_time:g}"
+
+    def create(self, engine_path: Optional[str] = None):
+        if self.kind == "builtin":
+            return BuiltinEngine(self.skill_level, self.search_time)
+        return StockfishEngine(self.skill_level, self.search_time, ponder=False,
+                               engine_path=engine_path, options=MATCH_ENGINE_OPTIONS)
+
+
+class MatchSettings(NamedTuple):
+    engine_a: EngineSpec
+    engine_b: EngineSpec
+    games: int = 20
+    chess960: bool = False
+    random_plies: int = DEFAULT_RANDOM_PLIES
+    max_plies: int = MAX_PLIES
+    seed: int = 0
+    engine_path: Optional[str] = None  # путь к Stockfish (по умолчанию - из папки engine)
+    syzygy_path: Optional[str] = None  # таблицы Syzygy: партия завершается, как только позиция в таблицах
+
+
+class GameResult(NamedTuple):
+    opening: int  # номер стартовой позиции (пары)
+    a_is_white: bool
+    result: str  # "1-0", "0-1" или "1/2-1/2"
+    termination: str  # статус Board или 'max_plies' / 'illegal_move' / 'tablebase'
+    plies: int
+
+    @property
+    def score_a(self) -> float:
+        if self.result == "1/2-1/2":
+            return 0.5
+        return 1.0 if (self.result == "1-0") == self.a_is_white else 0.0
+
+
+class MatchReport(NamedTuple):
+    settings: MatchSettings
+    results: List[GameResult]
+    elapsed: float  # секунды
+
+    @property
+    def wins(self) -> int:
+        return sum(1 for r in self.results if r.score_a == 1.0)
+
+    @property
+    def losses(self) -> int:
+        return sum(1 for r in self.results if r.score_a == 0.0)
+
+    @property
+    def draws(self) -> int:
+        return sum(1 for r in self.results if r.score_a == 0.5)
+
+    @property
+    def games_per_minute(self) -> float:
+        return 60.0 * len(self.results) / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _elo(score: float) -> float:
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+def elo_difference(wins: int, losses: int, draws: int) -> Tuple[float, float]:
+    """
+    Разница в Эло (первый участник минус второй) и полуширина 95%
+    интервала по стандартной ошибке среднего очка за партию. При 100% или
+    0% очков оценка бесконечна.
+    """
+    games = wins + losses + draws
+    if games == 0:
+        return 0.0, math.inf
+    score = (wins + 0.5 * draws) / games
+    if score in (0.0, 1.0):
+        return math.copysign(math.inf, score - 0.5), math.inf
+    variance = (wins * (1 - score) ** 2 + losses * score ** 2 + draws * (0.5 - score) ** 2) / games
+    margin = 1.96 * math.sqrt(variance / games)
+    low, high = max(score - margin, 1e-9), min(score + margin, 1 - 1e-9)
+    return _elo(score), (_elo(high) - _elo(low)) / 2
+
+
+def opening_board(index: int, settings: MatchSettings) -> Board:
+    """Стартовая позиция пары `index`: одна и та же при том же seed."""
+    rng = random.Random(settings.seed * 1000003 + index)
+    board = Board(is_chess960=settings.chess960, rng=rng)
+    for _ in range(settings.random_plies):
+        moves = board.get_legal_moves()
+        if not moves:
+            break
+        board.make_move(rng.choice(sorted(moves)))
+    if board.get_game_status() != 'in_progress':
+        board.undo_move()  # случайные ходы не должны закончить партию
+    return board
+
+
+def play_game(board: Board, white, black, max_plies: int = MAX_PLIES,
+              tablebase: Optional[Tablebase] = None) -> Tuple[str, str, int]:
+    """
+    Доигрывает партию с позиции `board`. Возвращает (результат, причина,
+    число полуходов). С таблицами Syzygy партия присуждается по ним.
+    """
+    bridge = LibBoardBridge(board)
+    plies = 0
+    while True:
+        status = board.get_game_status()
+        if status != 'in_progress':
+            break
+        if plies >= max_plies:
+            return "1/2-1/2", "max_plies", plies
+        lib_board = bridge.sync()
+        known = tablebase.probe(lib_board) if tablebase is not None else None
+        if known is not None:
+            if known.wdl in (WIN, LOSS):
+                side_to_move_wins = known.wdl == WIN
+                return ("1-0" if side_to_move_wins == (board.color_to_move == WHITE) else "0-1"), "tablebase", plies
+            return "1/2-1/2", "tablebase", plies
+        engine = white if board.color_to_move == WHITE else black
+        lib_move = engine.find_best_move(lib_board)
+        move = board.move_from_uci(lib_board.uci(lib_move)) if lib_move else None
+        if move is None:
+            status = 'illegal_move'  # движок не дал хода - поражение стороны, которая ходит
+            break
+        board.make_move(move)
+        plies += 1
+    if status in ('checkmate', 'illegal_move'):
+        return ("0-1" if board.color_to_move == WHITE else "1-0"), status, plies
+    return "1/2-1/2", status, plies
+
+
+def play_pair(index: int, settings: MatchSettings) -> List[GameResult]:
+    """Две партии с одной стартовой позиции, участники меняются цветом."""
+    engine_a = settings.engine_a.create(settings.engine_path)
+    try:
+        engine_b = settings.engine_b.create(settings.engine_path)
+    except Exception:
+        engine_a.close()
+        raise
+    tablebase = Tablebase.open(settings.syzygy_path)
+    results = []
+    try:
+        for a_is_white in (True, False):
+            for engine in (engine_a, engine_b):
+                engine.new_game()
+            white, black = (engine_a, engine_b) if a_is_white else (engine_b, engine_a)
+            result, termination, plies = play_game(opening_board(index, settings), white, black,
+                                                   settings.max_plies, tablebase)
+            results.append(GameResult(index, a_is_white, result, termination, plies))
+    finally:
+        engine_a.close()
+        engine_b.close()
+        if tablebase is not None:
+            tablebase.close()
+    return results
+
+
+def run_match(settings: MatchSettings, workers: int = 1) -> Iterator[GameResult]:
+    """
+    Играет матч (число партий округляется вверх до четного) и выдает
+    результаты по мере завершения пар. `workers` > 1 - пары идут в
+    отдельных процессах.
+    """
+    pairs = range((settings.games + 1) // 2)
+    if workers <= 1:
+        for index in pairs:
+            yield from play_pair(index, settings)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_pair, index, settings) for index in pairs]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def format_report(report: MatchReport) -> str:
+    settings = report.settings
+    elo, margin = elo_difference(report.wins, report.losses, report.draws)
+    games = len(report.results)
+    score = report.wins + 0.5 * report.draws
+    rows = [
+        f"{settings.engine_a} vs {settings.engine_b}" + (" (Chess960)" if settings.chess960 else ""),
+        f"Games: {games}  +{report.wins} -{report.losses} ={report.draws}  Score: {score:g}/{games}",
+    ]
+    if math.isinf(elo):
+        rows.append(f"Elo difference: {'+' if elo > 0 else '-'}inf")
+    else:
+        rows.append(f"Elo difference: {elo:+.1f} +/- {margin:.1f} (95%)")
+    rows.append(f"Time: {report.elapsed:.1f} s, {report.games_per_minute:.1f} games/min")
+    return "\n".join(rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Матч двух конфигураций движков: разница в Эло и скорость.")
+    parser.add_argument("engine_a", help="первый участник, вид:уровень@секунды, например stockfish:8@0.1")
+    parser.add_argument("engine_b", help="второй участник, например builtin:10@0.2")
+    parser.add_argument("--games", type=int, default=20, help="число партий (округляется до четного)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="число параллельных процессов")
+    parser.add_argument("--chess960", action="store_true", help="стартовые позиции Шахмат-960")
+    parser.add_argument("--random-plies", type=int, default=None,
+                        help=f"случайных полуходов в начале (по умолчанию {DEFAULT_RANDOM_PLIES}, в 960 - 0)")
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES, help="ничья после стольких полуходов")
+    parser.add_argument("--seed", type=int, default=0, help="зерно для выбора стартовых позиций")
+    parser.add_argument("--stockfish", help="путь к исполняемому файлу Stockfish")
+    parser.add_argument("--syzygy", help="папка таблиц Syzygy: присуждать партии по таблицам")
+    args = parser.parse_args(argv)
+
+    try:
+        engine_a, engine_b = EngineSpec.parse(args.engine_a), EngineSpec.parse(args.engine_b)
+    except ValueError as e:
+        parser.error(str(e))
+    random_plies = args.random_plies if args.random_plies is not None else (0 if args.chess960 else DEFAULT_RANDOM_PLIES)
+    settings = MatchSettings(engine_a, engine_b, max(1, args.games), args.chess960, random_plies,
+                             args.max_plies, args.seed, args.stockfish, args.syzygy)
+
+    results = []
+    start = time.perf_counter()
+    try:
+        for result in run_match(settings, max(1, args.workers)):
+            results.append(result)
+            white, black = (engine_a, engine_b) if result.a_is_white else (engine_b, engine_a)
+            print(f"Game {len(results)}: {white} - {black}  {result.result} ({result.termination}, {result.plies} plies)",
+                  flush=True)
+    except (FileNotFoundError, RuntimeError) as e:
+        print(f"Cannot start engine: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+    if not results:
+        return 1
+    print()
+    print(format_report(MatchReport(settings, results, time.perf_counter() - start)))
+    return 0
@@ -0,0 +1,84 @@
+"""
+Упакованное представление хода: одно 16-битное число.
+
+    биты 0-5   - поле "откуда" (нумерация как в bitboard.py: row * 8 + col)
+    биты 6-11  - поле "куда"
+    биты 12-15 - флаги (схема CPW): тихий ход, двойной ход пешки, рокировки,
+                 взятие, взятие на проходе, превращение (+ фигура в младших битах)
+
+Рокировка всегда кодируется ходом короля на поле своей ладьи, так одинаково
+работают классика и 960. В UCI она переводится в привычное e1g1, если доска
+не 960. Превращение хранится в самом ходе, поэтому и недопревращения
+переживают перевод в UCI и обратно.
+"""
+from typing import Tuple
+
+from bitboard import KNIGHT, BISHOP, ROOK, QUEEN
+
+# Флаги хода (биты 12-15)
+QUIET = 0
+DOUBLE_PAWN_PUSH = 1
+KING_CASTLE = 2
+QUEEN_CASTLE = 3
+CAPTURE = 4
+EN_PASSANT = 5
+PROMOTION = 8  # | PROMO_* | CAPTURE при взятии с превращением
+PROMO_KNIGHT, PROMO_BISHOP, PROMO_ROOK, PROMO_QUEEN = range(4)
+
+PROMOTION_PIECE_TYPES = [KNIGHT, BISHOP, ROOK, QUEEN]
+PROMOTION_LETTERS = 'nbrq'
+FILES = 'abcdefgh'
+
+
+def encode_move(from_sq: int, to_sq: int, flags: int = QUIET) -> int:
+    return from_sq | (to_sq << 6) | (flags << 12)
+
+
+def move_from_square(move: int) -> int:
+    return move & 63
+
+
+def move_to_square(move: int) -> int:
+    return (move >> 6) & 63
+
+
+def move_flags(move: int) -> int:
+    return move >> 12
+
+
+def is_capture(move: int) -> bool:
+    return bool((move >> 12) & CAPTURE)
+
+
+def is_promotion(move: int) -> bool:
+    return bool((move >> 12) & PROMOTION)
+
+
+def is_castling(move: int) -> bool:
+    return (move >> 12) in (KING_CASTLE, QUEEN_CASTLE)
+
+
+def promotion_piece_type(move: int) -> int:
+    """Тип фигуры превращения (индекс из bitboard.py); только для ходов-превращений."""
+    return PROMOTION_PIECE_TYPES[(move >> 12) & 3]
+
+
+def square_name(sq: int) -> str:
+    return f"{FILES[sq & 7]}{8 - (sq >> 3)}"
+
+
+def move_to_positions(move: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Ход -> ((ряд, колонка), (ряд, колонка)), как раньше хранились ходы."""
+    from_sq, to_sq = move & 63, (move >> 6) & 63
+    return (from_sq >> 3, from_sq & 7), (to_sq >> 3, to_sq & 7)
+
+
+def move_to_uci(move: int, chess960: bool = False) -> str:
+    """Ход в нотации UCI. В классике рокировка пишется ходом короля на g/c."""
+    from_sq, to_sq, flags = move & 63, (move >> 6) & 63, move >> 12
+    if not chess960 and flags in (KING_CASTLE, QUEEN_CASTLE):
+        to_sq = (from_sq & ~7) | (6 if flags == KING_CASTLE else 2)
+    uci = square_name(from_sq) + square_name(to_sq)
+    if flags & PROMOTION:
+        uci += PROMOTION_LETTERS[flags & 3]
+    return uci
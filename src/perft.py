@@ -0,0 +1,157 @@
+"""
+Perft - подсчет узлов дерева ходов заданной глубины.
+
+Используется как регрессионная проверка генератора ходов Board
+(make_move / undo_move / get_legal_moves) и как замер его скорости.
+Запуск из корня проекта: `python3 run_perft.py` (см. --help).
+"""
+import argparse
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, TextIO
+
+from Board import Board
+from fen import parse_fen, read_epd
+from moves import move_to_uci
+
+
+class PerftPosition(NamedTuple):
+    name: str
+    fen: str
+    expected: List[int]  # expected[i] - количество узлов на глубине i + 1
+    chess960: bool = False
+
+
+# Стандартные позиции (CPW + ловушки на взятие на проходе и превращения).
+# Значения для 960 и "ловушек" сверены с python-chess.
+PERFT_SUITE: List[PerftPosition] = [
+    PerftPosition("start", "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", [20, 400, 8902, 197281]),
+    PerftPosition("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039, 97862]),
+    PerftPosition("cpw-3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624]),
+    PerftPosition("cpw-4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264, 9467, 422333]),
+    PerftPosition("cpw-5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379]),
+    PerftPosition("cpw-6", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", [46, 2079, 89890]),
+    PerftPosition("ep-illegal-1", "3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1", [18, 92, 1670, 10138]),
+    PerftPosition("ep-illegal-2", "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1", [13, 102, 1266, 10276]),
+    PerftPosition("ep-gives-check", "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1", [15, 126, 1928, 13931]),
+    PerftPosition("promote-out-of-check", "2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1", [11, 133, 1442, 19174]),
+    PerftPosition("promote-to-check", "4k3/1P6/8/8/8/8/K7/8 w - - 0 1", [9, 40, 472, 2661, 38983]),
+    PerftPosition("underpromote-to-check", "8/P1k5/K7/8/8/8/8/8 w - - 0 1", [6, 27, 273, 1329, 18135]),
+    PerftPosition("castling-rights", "r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1", [26, 1141, 27826]),
+    PerftPosition("castling-prevented", "r3k2r/8/3Q4/8/8/5q2/8/R3K2R b KQkq - 0 1", [44, 1494, 50509]),
+    PerftPosition("960-bqnbrnkr", "bqnbrnkr/pppppppp/8/8/8/8/PPPPPPPP/BQNBRNKR w KQkq - 0 1", [20, 400, 9048, 202945], chess960=True),
+    PerftPosition("960-rkrnqbbn", "rkrnqbbn/pppppppp/8/8/8/8/PPPPPPPP/RKRNQBBN w KQkq - 0 1", [19, 361, 7822, 168109], chess960=True),
+    PerftPosition("960-nrkbqrbn", "nrkbqrbn/pppppppp/8/8/8/8/PPPPPPPP/NRKBQRBN w KQkq - 0 1", [18, 324, 6658, 136313], chess960=True),
+    PerftPosition("960-castling", "1r2k1r1/pppppppp/8/8/8/8/PPPPPPPP/1R2K1R1 w KQkq - 0 1", [25, 625, 15131, 366277], chess960=True),
+]
+
+
+def board_from_position(position: PerftPosition) -> Board:
+    """Создает доску для позиции набора. В 960 исходные вертикали ладей берутся из прав на рокировку FEN."""
+    board = Board(is_chess960=position.chess960)
+    board.load_from_fen(position.fen)
+    return board
+
+
+def read_epd_suite(stream: TextIO, chess960: bool = False) -> List[PerftPosition]:
+    """
+    Набор позиций из EPD в формате perftsuite.epd: узлы по глубинам в
+    операциях D1, D2, ... (`... w KQkq - ;D1 20 ;D2 400`), имя - из id.
+    Ошибка в позиции или операциях - FenError / ValueError.
+    """
+    positions = []
+    for number, record in enumerate(read_epd(stream), start=1):
+        parse_fen(record.fen, chess960)  # ошибка в позиции - сразу при чтении, а не посреди прогона
+        expected = []
+        while f"D{len(expected) + 1}" in record.operations:
+            expected.append(int(record.operations[f"D{len(expected) + 1}"][0]))
+        positions.append(PerftPosition(record.id or f"epd-{number}", record.fen, expected, chess960))
+    return positions
+
+
+def perft(board: Board, depth: int) -> int:
+    """
+    Количество узлов на глубине `depth`. На последнем полуходе узлы
+    считаются по длине списка ходов (bulk counting) без make/undo.
+    """
+    if depth <= 0:
+        return 1
+    moves = board.get_legal_moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        board.make_move(move)
+        nodes += perft(board, depth - 1)
+        board.undo_move()
+    return nodes
+
+
+def divide(board: Board, depth: int) -> Dict[str, int]:
+    """Perft с разбивкой по первому ходу: {'e2e4': узлы, ...}."""
+    result = {}
+    for move in board.get_legal_moves():
+        board.make_move(move)
+        result[move_to_uci(move, board.is_chess960)] = perft(board, depth - 1) if depth > 1 else 1
+        board.undo_move()
+    return result
+
+
+def run_suite(positions: List[PerftPosition], max_depth: Optional[int] = None,
+              max_nodes: Optional[int] = None, out: Callable[[str], None] = print) -> bool:
+    """
+    Прогоняет набор позиций, печатает узлы и скорость (nodes/s).
+    Глубину можно ограничить `max_depth` или ожидаемым числом узлов `max_nodes`.
+    Возвращает False, если хоть одно значение не совпало.
+    """
+    all_ok = True
+    total_nodes, total_time = 0, 0.0
+    for position in positions:
+        board = board_from_position(position)
+        for depth, expected in enumerate(position.expected, start=1):
+            if (max_depth and depth > max_depth) or (max_nodes and expected > max_nodes):
+                break
+            started = time.perf_counter()
+            nodes = perft(board, depth)
+            elapsed = time.perf_counter() - started
+            total_nodes += nodes
+            total_time += elapsed
+            ok = nodes == expected
+            all_ok = all_ok and ok
+            nps = nodes / elapsed if elapsed > 0 else 0
+            status = "OK" if ok else f"MISMATCH (expected {expected})"
+            out(f"{position.name:<24} depth {depth}: {nodes:>9} nodes {elapsed:8.3f}s {nps:>10.0f} nps  {status}")
+    if total_time > 0:
+        out(f"Total: {total_nodes} nodes in {total_time:.2f}s, {total_nodes / total_time:.0f} nps")
+    return all_ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Perft: проверка и замер генератора ходов Board.")
+    parser.add_argument("--depth", type=int, help="максимальная глубина для набора позиций")
+    parser.add_argument("--max-nodes", type=int, help="пропускать глубины с большим числом узлов")
+    parser.add_argument("--position", help="прогнать только позицию набора с этим именем")
+    parser.add_argument("--divide", nargs=2, metavar=("FEN", "DEPTH"), help="разбивка perft по первому ходу")
+    parser.add_argument("--epd", help="набор позиций из EPD-файла (узлы по глубинам в операциях D1, D2, ...)")
+    parser.add_argument("--chess960", action="store_true", help="позиции EPD-файла - Шахматы-960")
+    args = parser.parse_args(argv)
+
+    if args.divide:
+        fen, depth = args.divide[0], int(args.divide[1])
+        board = Board()
+        board.load_from_fen(fen)
+        result = divide(board, depth)
+        for move in sorted(result):
+            print(f"{move}: {result[move]}")
+        print(f"\nMoves: {len(result)}\nNodes: {sum(result.values())}")
+        return 0
+
+    suite = PERFT_SUITE
+    if args.epd:
+        try:
+            with open(args.epd, 'r', encoding='utf-8') as f:
+                suite = read_epd_suite(f, args.chess960)
+        except (OSError, ValueError) as e:
+            print(f"Cannot read {args.epd}: {e}")
+            return 1
+    positions = [p for p in suite if not args.position or p.name == args.position]
+    return 0 if run_suite(positions, args.depth, args.max_nodes) else 1
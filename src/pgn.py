@@ -0,0 +1,333 @@
+"""
+PGN: потоковое чтение и запись партий.
+
+read_games(stream) - генератор: файл читается построчно, в памяти только
+текущая партия (заголовки и упакованные ходы), поэтому архивы любого размера
+проходятся при постоянном расходе памяти. Ходы в SAN разбираются сразу на
+нашей доске: ход ищется в списке легальных ходов позиции (по полю "куда",
+затем по фигуре, уточнению и превращению) - без генерации SAN для всех ходов.
+
+write_game / game_to_pgn пишут партию с доски (начальная позиция и история
+ходов) в PGN. epd_moves разбирает ходы операций bm/am записи EPD (fen.py).
+"""
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO
+
+from Board import Board, WHITE
+from bitboard import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+from fen import EpdRecord, STANDARD_START_FEN
+from lib_board_bridge import board_to_fen
+from moves import KING_CASTLE, QUEEN_CASTLE, PROMOTION, PROMOTION_PIECE_TYPES, PROMO_QUEEN, FILES
+
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+SEVEN_TAG_ROSTER = ("Event", "Site", "Date", "Round", "White", "Black", "Result")
+LINE_WIDTH = 80
+
+PIECE_LETTERS = {KNIGHT: "N", BISHOP: "B", ROOK: "R", QUEEN: "Q", KING: "K"}
+_LETTER_TYPES = {letter: piece_type for piece_type, letter in PIECE_LETTERS.items()}
+_CASTLING_SAN = {"O-O": KING_CASTLE, "0-0": KING_CASTLE, "O-O-O": QUEEN_CASTLE, "0-0-0": QUEEN_CASTLE}
+
+_TAG_RE = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+# Фигура, уточнение (вертикаль/горизонталь), взятие, поле, превращение
+_SAN_RE = re.compile(r"([NBRQK])?([a-h])?([1-8])?x?([a-h])([1-8])(?:=?([NBRQ]))?")
+# Комментарий, скобка варианта, NAG, номер хода, прочее (ход или результат)
+_TOKEN_RE = re.compile(r"\s*(?:(\{)|(;)|([()])|\$\d+|\d+\.+|([^\s(){};$]+))")
+
+
+class PgnError(ValueError):
+    """Ход, которого нет в позиции (нелегальный, неоднозначный или не SAN)."""
+
+
+class PgnGame(NamedTuple):
+    headers: Dict[str, str]
+    moves: List[int]  # упакованные ходы (moves.py) от начальной позиции
+    error: Optional[str] = None  # причина, по которой разбор ходов остановился
+
+    @property
+    def chess960(self) -> bool:
+        return self.headers.get("Variant", "").lower() in ("chess960", "chess 960", "fischerandom")
+
+    @property
+    def start_fen(self) -> str:
+        return self.headers.get("FEN", STANDARD_START_FEN)
+
+    def board(self) -> Board:
+        """Доска с начальной позицией партии и всеми ходами (история для отмены)."""
+        board = board_from_fen(self.start_fen, self.chess960)
+        for move in self.moves:
+            board.make_move(move)
+        return board
+
+
+def board_from_fen(fen: str, chess960: bool = False) -> Board:
+    """
+    Доска из FEN (проверка и права на рокировку 960 в X-FEN/Shredder-FEN -
+    см. fen.py). Ошибка в FEN - FenError.
+    """
+    board = Board()  # 960-расстановка не нужна: позицию задает FEN
+    board.is_chess960 = chess960
+    board.load_from_fen(fen)
+    return board
+
+
+# --- SAN ---
+
+def parse_san(board: Board, san: str) -> int:
+    """Легальный ход позиции по записи SAN ('Nbd7', 'exd6', 'e8=Q+', 'O-O')."""
+    text = san.rstrip("+#!?")
+    legal_moves = board.get_legal_moves()
+    castling = _CASTLING_SAN.get(text)
+    if castling is not None:
+        for move in legal_moves:
+            if move >> 12 == castling:
+                return move
+        raise PgnError(f"illegal move: {san}")
+    match = _SAN_RE.fullmatch(text)
+    if match is None:
+        raise PgnError(f"invalid SAN: {san}")
+    letter, from_file, from_rank, to_file, to_rank, promotion = match.groups()
+    piece_type = _LETTER_TYPES[letter] if letter else PAWN
+    to_sq = (8 - int(to_rank)) * 8 + FILES.index(to_file)
+    pieces = board.pieces_bb[0 if board.color_to_move == WHITE else 1][piece_type]
+    if piece_type == PAWN and to_sq >> 3 in (0, 7):
+        # Без буквы превращения - ферзь (как в move_from_uci)
+        promotion_index = PROMOTION_PIECE_TYPES.index(_LETTER_TYPES[promotion]) if promotion else PROMO_QUEEN
+    elif promotion:
+        raise PgnError(f"invalid SAN: {san}")
+    else:
+        promotion_index = None
+
+    found = None
+    for move in legal_moves:
+        if (move >> 6) & 63 != to_sq:
+            continue
+        flags, from_sq = move >> 12, move & 63
+        if not (pieces >> from_sq) & 1 or flags in (KING_CASTLE, QUEEN_CASTLE):
+            continue
+        if from_file and FILES[from_sq & 7] != from_file:
+            continue
+        if from_rank and 8 - (from_sq >> 3) != int(from_rank):
+            continue
+        if promotion_index is not None and (not flags & PROMOTION or flags & 3 != promotion_index):
+            continue
+        if found is not None:
+            raise PgnError(f"ambiguous move: {san}")
+        found = move
+    if found is None:
+        raise PgnError(f"illegal move: {san}")
+    return found
+
+
+def epd_moves(board: Board, record: EpdRecord, opcode: str = "bm") -> List[int]:
+    """Ходы операции EPD в SAN (bm - лучшие, am - которых следует избегать) на доске позиции записи."""
+    return [parse_san(board, san) for san in record.operations.get(opcode, [])]
+
+
+def move_to_san(board: Board, move: int) -> str:
+    """
+    Запись хода в SAN для текущей позиции (без шаха: его добавляет
+    san_with_check, которому нужна позиция после хода).
+    """
+    flags, from_sq, to_sq = move >> 12, move & 63, (move >> 6) & 63
+    if flags == KING_CASTLE:
+        return "O-O"
+    if flags == QUEEN_CASTLE:
+        return "O-O-O"
+    piece_type = board.get_piece_at((from_sq >> 3, from_sq & 7)).piece_type
+    target = FILES[to_sq & 7] + str(8 - (to_sq >> 3))
+    capture = "x" if flags & 4 else ""  # CAPTURE и EN_PASSANT
+    if piece_type == PAWN:
+        san = (FILES[from_sq & 7] + "x" if capture else "") + target
+        if flags & PROMOTION:
+            san += "=" + PIECE_LETTERS[PROMOTION_PIECE_TYPES[flags & 3]]
+        return san
+    # Уточнение: другие такие же фигуры, которые тоже могут пойти на это поле
+    pieces = board.pieces_bb[0 if board.color_to_move == WHITE else 1][piece_type]
+    rivals = [other & 63 for other in board.get_legal_moves()
+              if (other >> 6) & 63 == to_sq and other & 63 != from_sq and (pieces >> (other & 63)) & 1
+              and other >> 12 not in (KING_CASTLE, QUEEN_CASTLE)]
+    disambiguation = ""
+    if rivals:
+        if all(sq & 7 != from_sq & 7 for sq in rivals):
+            disambiguation = FILES[from_sq & 7]
+        elif all(sq >> 3 != from_sq >> 3 for sq in rivals):
+            disambiguation = str(8 - (from_sq >> 3))
+        else:
+            disambiguation = FILES[from_sq & 7] + str(8 - (from_sq >> 3))
+    return PIECE_LETTERS[piece_type] + disambiguation + capture + target
+
+
+def san_with_check(board: Board, move: int) -> str:
+    """SAN хода с '+' / '#'; ход делается на доске и остается сделанным."""
+    san = move_to_san(board, move)
+    board.make_move(move)
+    if board.is_in_check(board.color_to_move):
+        san += "#" if not board.get_legal_moves() else "+"
+    return san
+
+
+# --- Чтение ---
+
+def read_games(stream: Iterable[str]) -> Iterator[PgnGame]:
+    """
+    Партии из PGN по одной (генератор). Варианты, комментарии и NAG
+    пропускаются. Если ход не разобрался, партия отдается с ходами до него и
+    с `error`; чтение файла продолжается со следующей партии.
+    """
+    headers: Dict[str, str] = {}
+    board: Optional[Board] = None
+    moves: List[int] = []
+    error: Optional[str] = None
+    in_movetext = in_comment = False
+    depth = 0  # вложенность вариантов
+
+    for line in stream:
+        if in_comment:
+            end = line.find("}")
+            if end < 0:
+                continue
+            line, in_comment = line[end + 1:], False
+        elif line.startswith("%"):
+            continue  # строка-экранирование (PGN, 8.2.1)
+        stripped = line.strip()
+        if stripped.startswith("[") and not depth:
+            if in_movetext:
+                # Новые заголовки без результата у предыдущей партии
+                yield PgnGame(headers, moves, error)
+                headers, board, moves, error, in_movetext = {}, None, [], None, False
+            tag = _TAG_RE.match(stripped)
+            if tag:
+                headers[tag.group(1)] = tag.group(2).replace('\\"', '"').replace("\\\\", "\\")
+            continue
+
+        pos = 0
+        while pos < len(line):
+            token = _TOKEN_RE.match(line, pos)
+            if token is None or token.end() == pos:
+                break
+            pos = token.end()
+            brace, semicolon, paren, word = token.groups()
+            if brace:
+                end = line.find("}", pos)
+                if end < 0:
+                    in_comment = True
+                    break
+                pos = end + 1
+            elif semicolon:
+                break
+            elif paren == "(":
+                depth += 1
+            elif paren:
+                depth = max(depth - 1, 0)
+            elif word and not depth:
+                in_movetext = True
+                if word in RESULTS:
+                    headers.setdefault("Result", word)
+                    yield PgnGame(headers, moves, error)
+                    headers, board, moves, error, in_movetext = {}, None, [], None, False
+                    continue
+                if error is not None:
+                    continue
+                if board is None:
+                    try:
+                        board = PgnGame(headers, moves).board()
+                    except (ValueError, IndexError, KeyError) as e:
+                        error = f"invalid FEN: {e}"
+                        continue
+                try:
+                    move = parse_san(board, word)
+                except PgnError as e:
+                    error = str(e)
+                    continue
+                board.make_move(move)
+                moves.append(move)
+    if in_movetext or headers:
+        yield PgnGame(headers, moves, error)
+
+
+def split_games(stream: Iterable[str]) -> Iterator[str]:
+    """
+    Текст PGN по партиям без разбора ходов (генератор): для раздачи партий по
+    процессам, где их разбирает read_games. Граница - строка тегов после
+    текста ходов (вне комментария).
+    """
+    lines: List[str] = []
+    in_movetext = False
+    comment_depth = 0
+    for line in stream:
+        if not comment_depth and line.startswith("[") and in_movetext:
+            yield "".join(lines)
+            lines, in_movetext = [], False
+        lines.append(line)
+        if not comment_depth and (not line.strip() or line.startswith(("[", "%"))):
+            continue
+        in_movetext = True
+        comment_depth = max(comment_depth + line.count("{") - line.count("}"), 0)
+    if lines and (in_movetext or any(line.strip() for line in lines)):
+        yield "".join(lines)
+
+
+# --- Запись ---
+
+def game_result(board: Board) -> str:
+    """Результат PGN по статусу доски ('*' - партия идет)."""
+    status = board.get_game_status()
+    if status == 'in_progress':
+        return "*"
+    if status == 'checkmate':
+        return "0-1" if board.color_to_move == WHITE else "1-0"
+    return "1/2-1/2"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def game_to_pgn(board: Board, headers: Optional[Dict[str, str]] = None) -> str:
+    """
+    Партия с доски в PGN: заголовки (семь обязательных тегов, FEN/SetUp для
+    нестандартного начала, Variant для 960) и ходы от начальной позиции.
+    Результат по умолчанию - по статусу доски.
+    """
+    headers = dict(headers or {})
+    moves = [record.move for record in board.history]
+    for _ in moves:
+        board.undo_move()
+    start_fen = board_to_fen(board)
+
+    tokens = []
+    for ply, move in enumerate(moves):
+        if board.color_to_move == WHITE:
+            tokens.append(f"{board.fullmove_number}.")
+        elif ply == 0:
+            tokens.append(f"{board.fullmove_number}...")
+        tokens.append(san_with_check(board, move))
+    # После цикла доска снова в исходном состоянии (все ходы сделаны заново)
+    result = headers.get("Result") or game_result(board)
+    tokens.append(result)
+
+    tags = {tag: headers.pop(tag, "?") for tag in SEVEN_TAG_ROSTER}
+    tags["Date"] = tags["Date"] if tags["Date"] != "?" else "????.??.??"
+    tags["Result"] = result
+    if board.is_chess960:
+        headers["Variant"] = "Chess960"
+    if start_fen != STANDARD_START_FEN or board.is_chess960:
+        headers["SetUp"], headers["FEN"] = "1", start_fen
+    tags.update(headers)
+
+    lines = [f'[{tag} "{_escape(value)}"]' for tag, value in tags.items()]
+    lines.append("")
+    line = ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > LINE_WIDTH:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def write_game(out: TextIO, board: Board, headers: Optional[Dict[str, str]] = None):
+    """Дописывает партию в поток PGN (с пустой строкой-разделителем)."""
+    out.write(game_to_pgn(board, headers) + "\n")
@@ -1,10 +1,14 @@
 from typing import List, Tuple, TYPE_CHECKING
 from .piece import Piece, WHITE, BLACK
+from bitboard import BISHOP
 
 if TYPE_CHECKING:
     from Board import Board
 
 class Bishop(Piece):
+    __slots__ = ()
+    piece_type = BISHOP
+
     def __init__(self, color: str):
         super().__init__(color)
         self.symbol = 'B' if self.color == WHITE else 'b'
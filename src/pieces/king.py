@@ -1,5 +1,6 @@
 from typing import List, Tuple, TYPE_CHECKING
 from .piece import Piece, WHITE, BLACK
+from bitboard import KING
 
 if TYPE_CHECKING:
     from ..Board import Board
@@ -10,6 +11,9 @@ class King(Piece):
     Генерирует только стандартные ходы на 1 клетку.
     Сложная логика рокировки обрабатывается на уровне Board.
     """
+    __slots__ = ()
+    piece_type = KING
+
     def __init__(self, color: str):
         super().__init__(color)
         self.symbol = 'K' if self.color == WHITE else 'k'
@@ -1,10 +1,14 @@
 from typing import List, Tuple, TYPE_CHECKING
 from .piece import Piece, WHITE, BLACK
+from bitboard import KNIGHT
 
 if TYPE_CHECKING:
     from ..Board import Board
 
 class Knight(Piece):
+    __slots__ = ()
+    piece_type = KNIGHT
+
     def __init__(self, color: str):
         super().__init__(color)
         self.symbol = 'N' if self.color == WHITE else 'n'
@@ -1,5 +1,6 @@
 from typing import List, Tuple, TYPE_CHECKING
 from .piece import Piece, WHITE, BLACK
+from bitboard import PAWN
 
 if TYPE_CHECKING:
     from ..Board import Board
@@ -10,6 +11,9 @@ class Pawn(Piece):
     Учитывает: движение вперед, двойной ход, взятие по диагонали и взятие на проходе.
     Логика превращения обрабатывается на более высоком уровне (Game/Board).
     """
+    __slots__ = ()
+    piece_type = PAWN
+
     def __init__(self, color: str):
         super().__init__(color)
         self.symbol = 'P' if self.color == WHITE else 'p'
@@ -11,7 +11,12 @@ WHITE, BLACK = 'w', 'b'
 class Piece(ABC):
     """
     An abstract base class for all chess pieces.
+    Uses __slots__: pieces live for the whole game and are moved between squares,
+    so they carry no per-instance __dict__.
     """
+    __slots__ = ('color', 'symbol', 'has_moved')
+    piece_type = -1  # Index in the Board bitboard arrays, set by subclasses
+
     def __init__(self, color: str):
         if color not in (WHITE, BLACK):
             raise ValueError("Недопустимый цвет фигуры")
@@ -1,10 +1,14 @@
 from typing import List, Tuple, TYPE_CHECKING
 from .piece import Piece, WHITE, BLACK
+from bitboard import QUEEN
 
 if TYPE_CHECKING:
     from Board import Board
 
 class Queen(Piece):
+    __slots__ = ()
+    piece_type = QUEEN
+
     def __init__(self, color: str):
         super().__init__(color)
         self.symbol = 'Q' if self.color == WHITE else 'q'
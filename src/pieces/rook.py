@@ -1,10 +1,14 @@
 from typing import List, Tuple, TYPE_CHECKING
 from .piece import Piece, WHITE, BLACK
+from bitboard import ROOK
 
 if TYPE_CHECKING:
     from Board import Board
 
 class Rook(Piece):
+    __slots__ = ()
+    piece_type = ROOK
+
     def __init__(self, color: str):
         super().__init__(color)
         self.symbol = 'R' if self.color == WHITE else 'r'
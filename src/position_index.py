@@ -0,0 +1,118 @@
+"""
+Индекс позиций библиотеки партий: как часто позиция встречалась в наших
+партиях, какие ходы из нее делали и с какими результатами.
+
+Таблица `positions` лежит в той же базе, что и партии: Zobrist-ключ позиции
+(Board.zobrist_key - ключи постоянны между запусками), ID партии, ход,
+сделанный из позиции, и результат партии. Первичный ключ (key, game_id) в
+таблице без rowid - это само B-дерево, отсортированное по ключу: статистика
+позиции - один поиск O(log n) и чтение соседних записей. Позиция, повторенная
+в партии, считается один раз (с первым сделанным из нее ходом).
+
+Индексируются партии с известным результатом: законченные партии
+приложения и импортированные из PGN.
+"""
+import sqlite3
+from typing import List, NamedTuple, Optional, Tuple
+
+from Board import Board, WHITE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    key INTEGER NOT NULL,        -- Zobrist-ключ как знаковое 64-битное число
+    game_id INTEGER NOT NULL,
+    ply INTEGER NOT NULL,        -- полуход, на котором позиция впервые встретилась
+    move INTEGER,                -- упакованный ход из позиции; NULL - позиция в конце партии
+    score INTEGER NOT NULL,      -- результат партии: 1 - белые, 0 - ничья, -1 - черные
+    PRIMARY KEY (key, game_id)
+) WITHOUT ROWID;
+"""
+RESULT_SCORES = {"1-0": 1, "1/2-1/2": 0, "0-1": -1}
+
+
+class ResultStats(NamedTuple):
+    games: int
+    white: int
+    draws: int
+    black: int
+
+    def score(self, color: str) -> float:
+        """Доля очков стороны `color` (0..1)."""
+        wins = self.white if color == WHITE else self.black
+        return (wins + 0.5 * self.draws) / self.games if self.games else 0.0
+
+
+class MoveStats(NamedTuple):
+    move: int
+    stats: ResultStats
+
+
+class PositionStats(NamedTuple):
+    total: ResultStats
+    moves: List[MoveStats]  # по убыванию числа партий
+
+
+def signed_key(key: int) -> int:
+    """64-битный ключ в диапазон INTEGER SQLite."""
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+def game_positions(board: Board) -> List[Tuple[int, int, Optional[int]]]:
+    """
+    Позиции партии на доске (от начальной позиции до текущей): (ключ, полуход,
+    ход из позиции), каждая позиция - при первом появлении. Доска
+    откатывается и возвращается в ту же позицию.
+    """
+    moves = [record.move for record in board.history]
+    for _ in moves:
+        board.undo_move()
+    rows, seen = [], set()
+    for ply, move in enumerate(moves + [None]):
+        key = signed_key(board.zobrist_key)
+        if key not in seen:
+            seen.add(key)
+            rows.append((key, ply, move))
+        if move is not None:
+            board.make_move(move)
+    return rows
+
+
+class PositionIndex:
+    """Запросы и запись индекса; транзакциями управляет GameLibrary."""
+    def __init__(self, db: sqlite3.Connection):
+        self._db = db
+
+    def add_game(self, game_id: int, positions: List[Tuple[int, int, Optional[int]]], result: str):
+        """Добавляет позиции партии (см. game_positions); партии без результата не индексируются."""
+        score = RESULT_SCORES.get(result)
+        if score is None:
+            return
+        self._db.executemany(
+            "INSERT OR IGNORE INTO positions (key, game_id, ply, move, score) VALUES (?, ?, ?, ?, ?)",
+            [(key, game_id, ply, move, score) for key, ply, move in positions],
+        )
+
+    def remove_game(self, game_id: int):
+        # Индекса по game_id нет: удаление партии - редкая операция, полный проход допустим
+        self._db.execute("DELETE FROM positions WHERE game_id = ?", (game_id,))
+
+    def stats(self, board: Board) -> PositionStats:
+        """Сколько раз позиция доски встречалась, с какими результатами и какими ходами продолжалась."""
+        rows = self._db.execute(
+            "SELECT move, count(*), sum(score = 1), sum(score = 0), sum(score = -1)"
+            " FROM positions WHERE key = ? GROUP BY move",
+            (signed_key(board.zobrist_key),),
+        ).fetchall()
+        moves = sorted((MoveStats(move, ResultStats(*counts)) for move, *counts in rows if move is not None),
+                       key=lambda entry: -entry.stats.games)
+        total = ResultStats(*(sum(column) for column in zip(*(counts for _, *counts in rows)))) \
+            if rows else ResultStats(0, 0, 0, 0)
+        return PositionStats(total, moves)
+
+    def game_ids(self, board: Board, limit: int = 20) -> List[int]:
+        """ID партий, в которых встречалась позиция доски (последние добавленные первыми)."""
+        rows = self._db.execute(
+            "SELECT game_id FROM positions WHERE key = ? ORDER BY game_id DESC LIMIT ?",
+            (signed_key(board.zobrist_key), limit),
+        )
+        return [row[0] for row in rows]
@@ -1,21 +1,43 @@
 import os
-from typing import Dict, Optional
+import sys
+from typing import Dict, List, Optional, TextIO
 from Board import Board, WHITE
 from localization import LocalizationManager
+from moves import move_to_positions
+
+CLEAR_SCREEN = "\033[H\033[2J"  # курсор в левый верхний угол и очистка экрана
+CLEAR_LINE_END = "\033[K"
+CLEAR_BELOW = "\033[J"
+CELL_WIDTH = 2  # ширина клетки доски в колонках терминала: символ фигуры и пробел
+
+def _goto(row: int, col: int) -> str:
+    """ANSI: курсор в строку `row`, колонку `col` (с 1)."""
+    return f"\033[{row};{col}H"
 
 class TerminalRenderer:
     """
     Класс для "красивого" вывода доски и информации об игре в терминал.
+
+    Кадр собирается в один буфер и выводится одной записью. Первый кадр
+    рисуется на очищенном экране, следующие - только изменившимися клетками
+    и строками (ANSI-адресация курсора), без мерцания и без запуска `clear`.
+    Если экран мог прокрутиться (длинный вывод между ходами), вызовите
+    invalidate() - следующий кадр будет нарисован целиком.
     """
-    def __init__(self, config: Dict, localizer: LocalizationManager):
+    def __init__(self, config: Dict, localizer: LocalizationManager, out: Optional[TextIO] = None):
         self.config = config
         self.localizer = localizer
+        self.out = out or sys.stdout
+        # Предыдущий кадр: строки экрана, строки доски разбиты на клетки
+        self._frame: Optional[List[List[str]]] = None
+        if os.name == 'nt':
+            os.system('')  # включает обработку ANSI-последовательностей в консоли Windows
 
     def _get_piece_symbol(self, piece) -> str:
         """Возвращает символ фигуры в зависимости от настроек."""
         if not piece:
             return '.'
-        
+
         if self.config.get('piece_set') == 'unicode':
             unicode_map = {
                 'P': '♙', 'R': '♖', 'N': '♘', 'B': '♗', 'Q': '♕', 'K': '♔',
@@ -27,89 +49,123 @@ class TerminalRenderer:
 
     def clear_screen(self):
         """Очищает экран терминала."""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        self.out.write(CLEAR_SCREEN)
+        self.out.flush()
+        self._frame = None
+
+    def invalidate(self):
+        """Следующий кадр рисуется целиком (экран мог уйти вверх из-за прокрутки)."""
+        self._frame = None
 
-    def draw_board(self, board: Board, last_move: Optional[tuple] = None):
+    def draw_board(self, board: Board, last_move: Optional[int] = None):
         """
         Основной метод отрисовки доски и статуса игры.
         Учитывает стиль доски и все возможные состояния игры (мат, пат, ничьи).
         """
-        self.clear_screen()
-        print(self.localizer.get("app_title"))
-        
-        # --- Блок отрисовки доски (без изменений) ---
+        frame = self._build_frame(board, last_move)
+        if self._frame is None:
+            out = [CLEAR_SCREEN] + ["".join(line) + "\n" for line in frame]
+        else:
+            out = self._diff(self._frame, frame)
+            # Стираем то, что было ниже кадра (ввод и сообщения прошлого хода)
+            out.append(_goto(len(frame) + 1, 1) + CLEAR_BELOW)
+        self.out.write("".join(out))
+        self.out.flush()
+        self._frame = frame
+
+    @staticmethod
+    def _diff(old: List[List[str]], new: List[List[str]]) -> List[str]:
+        """Последовательности для перерисовки `old` в `new`: клетки доски по одной, прочие строки целиком."""
+        out = []
+        for i, line in enumerate(new):
+            old_line = old[i] if i < len(old) else None
+            if line == old_line:
+                continue
+            if old_line is not None and len(line) > 1 and len(line) == len(old_line):
+                for j, (old_cell, cell) in enumerate(zip(old_line, line)):
+                    if cell != old_cell:
+                        out.append(_goto(i + 1, 1 + j * CELL_WIDTH) + cell)
+            else:
+                out.append(_goto(i + 1, 1) + "".join(line) + CLEAR_LINE_END)
+        return out
+
+    def _build_frame(self, board: Board, last_move: Optional[int]) -> List[List[str]]:
+        """Кадр: список строк экрана; строка доски - номер ряда, 8 клеток и номер ряда справа."""
+        frame = [[self.localizer.get("app_title")]]
+
+        # --- Блок отрисовки доски ---
         board_style = self.config.get('board_style', 'classic')
         flip = self.config.get('flip_board', False) and board.color_to_move != WHITE
-        
+
         rows = range(8) if not flip else range(7, -1, -1)
         cols = range(8) if not flip else range(7, -1, -1)
-        
+
         col_headers = "  a b c d e f g h"
         if flip:
             col_headers = "  h g f e d c b a"
-        print(col_headers)
+        frame.append([col_headers])
+        last_move_squares = move_to_positions(last_move) if last_move is not None else ()
+        is_highlight_enabled = self.config.get('highlighting', True)
 
         if board_style == 'pretty':
-            print("-------------------------")
+            frame.append(["-------------------------"])
 
         for r in rows:
             row_header = 8 - r
-            print(f"{row_header} ", end="")
-            
+            line = [f"{row_header} "]
+
             for c in cols:
                 piece = board.get_piece_at((r, c))
                 symbol = self._get_piece_symbol(piece)
-                
-                is_highlight_enabled = self.config.get('highlighting', True)
-                is_last_move = is_highlight_enabled and last_move and ((r, c) == last_move[0] or (r, c) == last_move[1])
-                
+                is_last_move = is_highlight_enabled and (r, c) in last_move_squares
+
                 if is_last_move:
-                    print(f"\033[44m{symbol}\033[0m ", end="")
+                    line.append(f"\033[44m{symbol}\033[0m ")
                 else:
-                    print(f"{symbol} ", end="")
-            
-            print(f" {row_header}")
+                    line.append(f"{symbol} ")
+
+            line.append(f" {row_header}")
+            frame.append(line)
 
             if board_style == 'pretty':
                 # Рисуем линию после каждого ряда, включая последний
-                print("-------------------------")
-        
+                frame.append(["-------------------------"])
+
         # Если стиль классический, все равно добавим разделитель перед статусом
         if board_style == 'classic':
-            print("-" * 25)
+            frame.append(["-" * 25])
 
-        # --- НОВЫЙ БЛОК ОБРАБОТКИ СТАТУСА ИГРЫ ---
+        # --- Блок статуса игры ---
         status = board.get_game_status()
 
         if status == 'checkmate':
             # Победитель - тот, кто НЕ должен ходить сейчас
             winner_color_key = "black" if board.color_to_move == WHITE else "white"
             winner_name = self.localizer.get(f"player_{winner_color_key}")
-            print(self.localizer.get("game_over_checkmate", winner=winner_name))
-        
+            frame.append([self.localizer.get("game_over_checkmate", winner=winner_name)])
+
         elif status == 'stalemate':
-            print(self.localizer.get("game_over_stalemate"))
-        
+            frame.append([self.localizer.get("game_over_stalemate")])
+
         elif status == 'draw_repetition':
-            print(self.localizer.get("draw_repetition"))
-        
+            frame.append([self.localizer.get("draw_repetition")])
+
         elif status == 'draw_50_moves':
-            print(self.localizer.get("draw_50_moves"))
-        
+            frame.append([self.localizer.get("draw_50_moves")])
+
         elif status == 'draw_insufficient_material':
-            print(self.localizer.get("draw_insufficient_material"))
-            
+            frame.append([self.localizer.get("draw_insufficient_material")])
+
         elif status == 'in_progress':
             # Если игра продолжается, показываем, чей ход
             player_color_key = "white" if board.color_to_move == WHITE else "black"
             player_name = self.localizer.get(f"player_{player_color_key}")
-            print(self.localizer.get("turn_prompt", player=player_name))
-            
+            frame.append([self.localizer.get("turn_prompt", player=player_name)])
+
             # И предупреждение о шахе, если он есть
             if board.is_in_check(board.color_to_move):
-                print(f"\033[91m{self.localizer.get('check_warning')}\033[0m")
-        
-        # Нижний разделитель для красоты
-        print("-" * 25)
+                frame.append([f"\033[91m{self.localizer.get('check_warning')}\033[0m"])
 
-        
+        # Нижний разделитель для красоты
+        frame.append(["-" * 25])
+        return frame
@@ -0,0 +1,401 @@
+"""
+Встроенный движок: поиск лучшего хода прямо на Board, без внешних процессов.
+
+Итеративное углубление + alpha-beta (negamax) с продлением шахов и
+поиском взятий (quiescence) на листьях. Результаты узлов хранятся в таблице
+транспозиций (transposition.py). Порядок ходов: ход из таблицы или PV прошлой
+итерации, взятия по MVV-LVA, ходы-убийцы, история. Время распределяет
+TimeManager: новую итерацию начинаем, только если осталось время на нее,
+а текущую прерываем по жесткому пределу.
+"""
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+from Board import Board, COLOR_INDEX, WHITE
+from bitboard import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, WHITE_IDX, BLACK_IDX, iter_squares
+from moves import CAPTURE, EN_PASSANT, PROMOTION
+from transposition import TranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER
+
+MATE_SCORE = 100000
+INFINITY = MATE_SCORE + 1
+MAX_PLY = 64
+# Как часто (в узлах) проверять время и лимит узлов
+CHECK_EVERY_NODES = 2048
+
+PIECE_VALUES = [100, 320, 330, 500, 900, 0]
+
+# Таблицы "фигура-поле" (Simplified Evaluation Function) с точки зрения белых:
+# индекс - номер поля битборда, 0 = a8, 63 = h1. Для черных поле отражается (sq ^ 56).
+_PAWN_TABLE = [
+     0,   0,   0,   0,   0,   0,   0,   0,
+    50,  50,  50,  50,  50,  50,  50,  50,
+    10,  10,  20,  30,  30,  20,  10,  10,
+     5,   5,  10,  25,  25,  10,   5,   5,
+     0,   0,   0,  20,  20,   0,   0,   0,
+     5,  -5, -10,   0,   0, -10,  -5,   5,
+     5,  10,  10, -20, -20,  10,  10,   5,
+     0,   0,   0,   0,   0,   0,   0,   0,
+]
+_KNIGHT_TABLE = [
+   -50, -40, -30, -30, -30, -30, -40, -50,
+   -40, -20,   0,   0,   0,   0, -20, -40,
+   -30,   0,  10,  15,  15,  10,   0, -30,
+   -30,   5,  15,  20,  20,  15,   5, -30,
+   -30,   0,  15,  20,  20,  15,   0, -30,
+   -30,   5,  10,  15,  15,  10,   5, -30,
+   -40, -20,   0,   5,   5,   0, -20, -40,
+   -50, -40, -30, -30, -30, -30, -40, -50,
+]
+_BISHOP_TABLE = [
+   -20, -10, -10, -10, -10, -10, -10, -20,
+   -10,   0,   0,   0,   0,   0,   0, -10,
+   -10,   0,   5,  10,  10,   5,   0, -10,
+   -10,   5,   5,  10,  10,   5,   5, -10,
+   -10,   0,  10,  10,  10,  10,   0, -10,
+   -10,  10,  10,  10,  10,  10,  10, -10,
+   -10,   5,   0,   0,   0,   0,   5, -10,
+   -20, -10, -10, -10, -10, -10, -10, -20,
+]
+_ROOK_TABLE = [
+     0,   0,   0,   0,   0,   0,   0,   0,
+     5,  10,  10,  10,  10,  10,  10,   5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+     0,   0,   0,   5,   5,   0,   0,   0,
+]
+_QUEEN_TABLE = [
+   -20, -10, -10,  -5,  -5, -10, -10, -20,
+   -10,   0,   0,   0,   0,   0,   0, -10,
+   -10,   0,   5,   5,   5,   5,   0, -10,
+    -5,   0,   5,   5,   5,   5,   0,  -5,
+     0,   0,   5,   5,   5,   5,   0,  -5,
+   -10,   5,   5,   5,   5,   5,   0, -10,
+   -10,   0,   5,   0,   0,   0,   0, -10,
+   -20, -10, -10,  -5,  -5, -10, -10, -20,
+]
+_KING_TABLE = [
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -20, -30, -30, -40, -40, -30, -30, -20,
+   -10, -20, -20, -20, -20, -20, -20, -10,
+    20,  20,   0,   0,   0,   0,  20,  20,
+    20,  30,  10,   0,   0,  10,  30,  20,
+]
+_KING_ENDGAME_TABLE = [
+   -50, -40, -30, -20, -20, -30, -40, -50,
+   -30, -20, -10,   0,   0, -10, -20, -30,
+   -30, -10,  20,  30,  30,  20, -10, -30,
+   -30, -10,  30,  40,  40,  30, -10, -30,
+   -30, -10,  30,  40,  40,  30, -10, -30,
+   -30, -10,  20,  30,  30,  20, -10, -30,
+   -30, -30,   0,   0,   0,   0, -30, -30,
+   -50, -30, -30, -30, -30, -30, -30, -50,
+]
+# Эндшпиль - когда у каждой стороны фигур (без пешек и короля) не больше чем на ладью и слона
+ENDGAME_MATERIAL = PIECE_VALUES[ROOK] + PIECE_VALUES[BISHOP]
+
+
+def _build_tables(king_table: List[int]) -> List[List[List[int]]]:
+    """Стоимость фигуры + бонус поля: tables[цвет][тип][поле]."""
+    tables = [_PAWN_TABLE, _KNIGHT_TABLE, _BISHOP_TABLE, _ROOK_TABLE, _QUEEN_TABLE, king_table]
+    white = [[PIECE_VALUES[ptype] + tables[ptype][sq] for sq in range(64)] for ptype in range(6)]
+    black = [[PIECE_VALUES[ptype] + tables[ptype][sq ^ 56] for sq in range(64)] for ptype in range(6)]
+    return [white, black]
+
+
+_MIDDLEGAME_PST = _build_tables(_KING_TABLE)
+_ENDGAME_PST = _build_tables(_KING_ENDGAME_TABLE)
+
+
+def _non_pawn_material(pieces: List[int]) -> int:
+    return sum(PIECE_VALUES[ptype] * bin(pieces[ptype]).count('1') for ptype in (KNIGHT, BISHOP, ROOK, QUEEN))
+
+
+def evaluate(board: Board) -> int:
+    """Статическая оценка в сантипешках с точки зрения стороны, которая ходит."""
+    white, black = board.pieces_bb[WHITE_IDX], board.pieces_bb[BLACK_IDX]
+    endgame = _non_pawn_material(white) <= ENDGAME_MATERIAL and _non_pawn_material(black) <= ENDGAME_MATERIAL
+    white_pst, black_pst = _ENDGAME_PST if endgame else _MIDDLEGAME_PST
+    score = 0
+    for ptype in range(6):
+        table = white_pst[ptype]
+        for sq in iter_squares(white[ptype]):
+            score += table[sq]
+        table = black_pst[ptype]
+        for sq in iter_squares(black[ptype]):
+            score -= table[sq]
+    return score if board.color_to_move == WHITE else -score
+
+
+def _score_to_tt(score: int, ply: int) -> int:
+    """Мат в таблице хранится как расстояние от узла, а не от корня."""
+    if score >= MATE_SCORE - MAX_PLY:
+        return score + ply
+    if score <= -MATE_SCORE + MAX_PLY:
+        return score - ply
+    return score
+
+
+def _score_from_tt(score: int, ply: int) -> int:
+    if score >= MATE_SCORE - MAX_PLY:
+        return score - ply
+    if score <= -MATE_SCORE + MAX_PLY:
+        return score + ply
+    return score
+
+
+class SearchResult(NamedTuple):
+    best_move: Optional[int]
+    score: int  # сантипешки с точки зрения стороны, которая ходит
+    depth: int  # последняя полностью завершенная итерация
+    nodes: int
+    elapsed: float
+    pv: List[int]
+
+    @property
+    def nps(self) -> int:
+        return int(self.nodes / self.elapsed) if self.elapsed > 0 else 0
+
+    @property
+    def is_mate(self) -> bool:
+        return abs(self.score) >= MATE_SCORE - MAX_PLY
+
+
+class TimeManager:
+    """
+    Распределяет время на ход: фиксированное (`move_time`) или из остатка на
+    часах (`remaining` / `moves_to_go` + большая часть `increment`).
+    Мягкий предел - после него новую итерацию не начинаем (она почти наверняка
+    не успеет), жесткий - прерываем поиск. Без ограничений оба равны None.
+    """
+    def __init__(self, move_time: Optional[float] = None, remaining: Optional[float] = None,
+                 increment: float = 0.0, moves_to_go: int = 30):
+        if move_time is not None:
+            self.soft_limit, self.hard_limit = move_time * 0.5, move_time
+        elif remaining is not None:
+            budget = remaining / max(moves_to_go, 1) + increment * 0.8
+            self.hard_limit = min(budget * 3, remaining * 0.5)
+            self.soft_limit = min(budget, self.hard_limit)
+        else:
+            self.soft_limit = self.hard_limit = None
+        self.started = time.perf_counter()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def can_start_iteration(self) -> bool:
+        return self.soft_limit is None or self.elapsed() < self.soft_limit
+
+    def is_time_up(self) -> bool:
+        return self.hard_limit is not None and self.elapsed() >= self.hard_limit
+
+
+class Searcher:
+    """
+    Alpha-beta поиск на Board. Объект переиспользуется между ходами партии:
+    таблица транспозиций и история сохраняются (с затуханием), ходы-убийцы
+    сбрасываются. Доска после поиска возвращается в исходное состояние.
+    """
+    def __init__(self, tt: Optional[TranspositionTable] = None):
+        self.tt = tt if tt is not None else TranspositionTable()
+        self.history = [[0] * 4096, [0] * 4096]  # [цвет][from | to << 6]
+        self.killers = [[0, 0] for _ in range(MAX_PLY + 1)]
+        self.nodes = 0
+        self.stopped = False
+        self._pv: List[List[int]] = [[] for _ in range(MAX_PLY + 1)]
+        self._prev_pv: List[int] = []
+        self._time_manager: Optional[TimeManager] = None
+        self._max_nodes: Optional[int] = None
+
+    def search(self, board: Board, max_depth: Optional[int] = None, move_time: Optional[float] = None,
+               max_nodes: Optional[int] = None, time_manager: Optional[TimeManager] = None,
+               on_iteration: Optional[Callable[[SearchResult], None]] = None) -> SearchResult:
+        """
+        Итеративное углубление до `max_depth` или пока не выйдет время/лимит узлов.
+        `on_iteration` вызывается после каждой завершенной итерации (для вывода info).
+        """
+        self._time_manager = time_manager or TimeManager(move_time=move_time)
+        self._max_nodes = max_nodes
+        self.nodes = 0
+        self.stopped = False
+        self.tt.new_search()
+        self.killers = [[0, 0] for _ in range(MAX_PLY + 1)]
+        for table in self.history:
+            for i, value in enumerate(table):
+                if value:
+                    table[i] = value >> 2
+        self._prev_pv = []
+
+        root_moves = board.get_legal_moves()
+        result = SearchResult(root_moves[0] if root_moves else None, 0, 0, 0, 0.0, [])
+        if not root_moves:
+            return result
+
+        for depth in range(1, min(max_depth or MAX_PLY, MAX_PLY) + 1):
+            score = self._alpha_beta(board, depth, -INFINITY, INFINITY, 0)
+            pv = list(self._pv[0])
+            if self.stopped:
+                # Незавершенная итерация: ход из PV уже досчитан полностью и лучше прежнего
+                if pv:
+                    result = result._replace(best_move=pv[0], pv=pv, nodes=self.nodes,
+                                             elapsed=self._time_manager.elapsed())
+                break
+            self._prev_pv = pv
+            result = SearchResult(pv[0] if pv else result.best_move, score, depth, self.nodes,
+                                  self._time_manager.elapsed(), pv)
+            if on_iteration:
+                on_iteration(result)
+            if result.is_mate or len(root_moves) == 1 or not self._time_manager.can_start_iteration():
+                break
+        return result._replace(nodes=self.nodes, elapsed=self._time_manager.elapsed())
+
+    def stop(self):
+        """Прерывает идущий поиск (можно вызывать из другого потока)."""
+        self.stopped = True
+
+    def _check_limits(self):
+        if self._time_manager.is_time_up() or (self._max_nodes and self.nodes >= self._max_nodes):
+            self.stopped = True
+
+    def _alpha_beta(self, board: Board, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self._pv[ply] = []
+        in_check = board.is_in_check(board.color_to_move)
+        if in_check:
+            depth += 1  # Продление шахов
+        if depth <= 0 or ply >= MAX_PLY:
+            return self._quiescence(board, alpha, beta, ply)
+
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY_NODES == 0:
+            self._check_limits()
+        if self.stopped:
+            return 0
+        key = board.zobrist_key
+        if ply > 0 and (board.halfmove_clock >= 100 or board.position_history[key] > 1):
+            return 0  # Повторение или правило 50 ходов
+
+        entry = self.tt.probe(key)
+        hash_move = 0
+        if entry is not None:
+            hash_move = entry.move
+            if ply > 0 and entry.depth >= depth:
+                tt_score = _score_from_tt(entry.score, ply)
+                if entry.bound == BOUND_EXACT or \
+                   (entry.bound == BOUND_LOWER and tt_score >= beta) or \
+                   (entry.bound == BOUND_UPPER and tt_score <= alpha):
+                    return tt_score
+
+        moves = board.get_legal_moves()
+        if not moves:
+            return -MATE_SCORE + ply if in_check else 0
+
+        if not hash_move and ply < len(self._prev_pv):
+            hash_move = self._prev_pv[ply]
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = 0
+        for move in self._order_moves(board, moves, ply, hash_move):
+            board.make_move(move)
+            score = -self._alpha_beta(board, depth - 1, -beta, -alpha, ply + 1)
+            board.undo_move()
+            if self.stopped:
+                return 0
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    best_move = move
+                    self._pv[ply] = [move] + self._pv[ply + 1]
+                    if score >= beta:
+                        if not (move >> 12) & (CAPTURE | PROMOTION):
+                            self._store_quiet_cutoff(board, move, depth, ply)
+                        break
+
+        if best_score <= original_alpha:
+            bound = BOUND_UPPER
+        elif best_score >= beta:
+            bound = BOUND_LOWER
+        else:
+            bound = BOUND_EXACT
+        self.tt.store(key, depth, bound, _score_to_tt(best_score, ply), best_move)
+        return best_score
+
+    def _quiescence(self, board: Board, alpha: int, beta: int, ply: int) -> int:
+        """Досчитываем только взятия и превращения, чтобы не оценивать позицию посреди размена."""
+        self._pv[ply] = []
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY_NODES == 0:
+            self._check_limits()
+        if self.stopped:
+            return 0
+
+        stand_pat = evaluate(board)
+        if stand_pat >= beta or ply >= MAX_PLY:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        best_score = stand_pat
+        tactical = [move for move in board.get_legal_moves() if (move >> 12) & (CAPTURE | PROMOTION)]
+        for move in self._order_moves(board, tactical, ply, 0):
+            board.make_move(move)
+            score = -self._quiescence(board, -beta, -alpha, ply + 1)
+            board.undo_move()
+            if self.stopped:
+                return 0
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if score >= beta:
+                        break
+        return best_score
+
+    def _store_quiet_cutoff(self, board: Board, move: int, depth: int, ply: int):
+        """Тихий ход вызвал отсечение: запоминаем его как убийцу и в истории."""
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        history = self.history[COLOR_INDEX[board.color_to_move]]
+        history[move & 4095] += depth * depth
+        if history[move & 4095] > 1 << 18:
+            for i, value in enumerate(history):
+                history[i] = value >> 1
+
+    def _order_moves(self, board: Board, moves: List[int], ply: int, hash_move: int) -> List[int]:
+        """
+        Сортирует ходы: ход из таблицы/PV, взятия и превращения (MVV-LVA - сначала
+        самая ценная жертва, затем самый дешевый нападающий), убийцы, история.
+        """
+        squares = board.board
+        killer_1, killer_2 = self.killers[ply]
+        history = self.history[COLOR_INDEX[board.color_to_move]]
+        scored = []
+        for move in moves:
+            flags = move >> 12
+            if move == hash_move:
+                score = 1 << 30
+            elif flags & (CAPTURE | PROMOTION):
+                score = 1 << 20
+                if flags & CAPTURE:
+                    to_sq, from_sq = (move >> 6) & 63, move & 63
+                    victim = PAWN if flags == EN_PASSANT else squares[to_sq >> 3][to_sq & 7].piece_type
+                    attacker = squares[from_sq >> 3][from_sq & 7].piece_type
+                    score += victim * 8 + (KING - attacker)
+                if flags & PROMOTION:
+                    score += 64 + (flags & 3)
+            elif move == killer_1:
+                score = (1 << 19) + 1
+            elif move == killer_2:
+                score = 1 << 19
+            else:
+                score = history[move & 4095]
+            scored.append((score, move))
+        scored.sort(reverse=True)
+        return [move for _, move in scored]
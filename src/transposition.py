@@ -0,0 +1,137 @@
+"""
+Таблица транспозиций: результаты поиска по Zobrist-ключу позиции (Board.zobrist_key).
+
+Память выделяется один раз: два массива array('Q') - ключи и упакованные данные.
+Таблица разбита на корзины по два слота:
+    слот 0 - "по глубине": заменяется только более глубоким результатом
+             (или записью из прошлого поиска),
+    слот 1 - "всегда": сюда пишется все, что не прошло в слот 0.
+
+Упаковка данных в 64 бита:
+    биты 0-15  - лучший ход (см. moves.py), 0 - нет хода
+    биты 16-23 - глубина
+    биты 24-25 - тип оценки (точная, нижняя, верхняя граница)
+    биты 26-31 - поколение (номер поиска), чтобы вытеснять старые записи
+    биты 32-   - оценка + SCORE_OFFSET (так пустой слот - это данные == 0)
+"""
+from array import array
+from typing import NamedTuple, Optional
+
+BOUND_EXACT, BOUND_LOWER, BOUND_UPPER = 0, 1, 2
+
+ENTRY_BYTES = 16  # ключ + данные
+SLOTS_PER_BUCKET = 2
+SCORE_OFFSET = 1 << 20
+MAX_DEPTH = 255
+_GENERATIONS = 64
+_ZERO_CHUNK = memoryview(bytes(1 << 20))  # clear() обнуляет таблицу кусками по мегабайту
+
+
+class TTEntry(NamedTuple):
+    depth: int
+    bound: int
+    score: int
+    move: int
+
+
+class TranspositionTable:
+    """
+    Таблица фиксированного размера (в мегабайтах; число корзин округляется
+    вниз до степени двойки). Счетчики hits/misses/collisions/stores
+    показывают, насколько таблица полезна; `hashfull()` - заполненность в промилле.
+    """
+    def __init__(self, size_mb: int = 16):
+        self.resize(size_mb)
+
+    def resize(self, size_mb: int):
+        """Выделяет таблицу заново (все записи теряются)."""
+        buckets = max(1, size_mb * 1024 * 1024 // (ENTRY_BYTES * SLOTS_PER_BUCKET))
+        buckets = 1 << (buckets.bit_length() - 1)
+        self.size_mb = size_mb
+        self._mask = buckets - 1
+        self._keys = array('Q', bytes(8 * buckets * SLOTS_PER_BUCKET))
+        self._data = array('Q', bytes(8 * buckets * SLOTS_PER_BUCKET))
+        self._generation = 0
+        self.reset_stats()
+
+    def clear(self):
+        """Стирает все записи, не перевыделяя память: массивы обнуляются на месте."""
+        for table in (self._keys, self._data):
+            with memoryview(table) as words, words.cast('B') as view:
+                for start in range(0, len(view), len(_ZERO_CHUNK)):
+                    end = min(start + len(_ZERO_CHUNK), len(view))
+                    view[start:end] = _ZERO_CHUNK[:end - start]
+        self._generation = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0  # корзина занята другими позициями
+        self.stores = 0
+
+    def new_search(self):
+        """Следующее поколение: записи прошлых поисков уступают место новым."""
+        self._generation = (self._generation + 1) % _GENERATIONS
+
+    def __len__(self) -> int:
+        """Количество слотов."""
+        return len(self._keys)
+
+    def probe(self, key: int) -> Optional[TTEntry]:
+        slot = (key & self._mask) * SLOTS_PER_BUCKET
+        keys = self._keys
+        for i in (slot, slot + 1):
+            if keys[i] == key:
+                data = self._data[i]
+                if data:
+                    self.hits += 1
+                    return TTEntry((data >> 16) & 0xFF, (data >> 24) & 3, (data >> 32) - SCORE_OFFSET, data & 0xFFFF)
+        self.misses += 1
+        if self._data[slot] or self._data[slot + 1]:
+            self.collisions += 1
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score: int, move: int = 0):
+        slot = (key & self._mask) * SLOTS_PER_BUCKET
+        keys, data = self._keys, self._data
+        depth = min(max(depth, 0), MAX_DEPTH)
+        # Та же позиция без хода (отсечение без лучшего хода) - сохраняем старый ход
+        for i in (slot, slot + 1):
+            if keys[i] == key and data[i]:
+                if not move:
+                    move = data[i] & 0xFFFF
+                break
+
+        old = data[slot]
+        replace_deep = (
+            not old or keys[slot] == key or depth >= (old >> 16) & 0xFF
+            or (old >> 26) & (_GENERATIONS - 1) != self._generation
+        )
+        i = slot if replace_deep else slot + 1
+        keys[i] = key
+        data[i] = move | (depth << 16) | (bound << 24) | (self._generation << 26) | ((score + SCORE_OFFSET) << 32)
+        # Если позиция переехала в слот 0, старую копию в слоте 1 убираем
+        if i == slot and keys[slot + 1] == key:
+            keys[slot + 1] = 0
+            data[slot + 1] = 0
+        self.stores += 1
+
+    def hashfull(self) -> int:
+        """Заполненность в промилле по первым 1000 слотам (как UCI hashfull)."""
+        sample = min(1000, len(self._data))
+        used = sum(1 for i in range(sample) if self._data[i] and (self._data[i] >> 26) & (_GENERATIONS - 1) == self._generation)
+        return used * 1000 // sample
+
+    @property
+    def stats(self) -> dict:
+        probes = self.hits + self.misses
+        return {
+            'size_mb': self.size_mb,
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'hit_rate': self.hits / probes if probes else 0.0,
+            'hashfull': self.hashfull(),
+        }
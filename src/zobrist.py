@@ -0,0 +1,23 @@
+"""
+Ключи Zobrist для хэширования позиций.
+
+Хэш позиции - XOR ключей всех фигур на их полях, очереди хода, прав на
+рокировку и вертикали взятия на проходе. Ключи генерируются из
+фиксированного зерна, поэтому одинаковы между запусками (их можно
+сохранять на диск вместе с хэшами).
+"""
+import random
+
+_rng = random.Random(0x7E57C4E55)
+
+# PIECE_KEYS[цвет][тип фигуры][поле], нумерация как в bitboard.py
+PIECE_KEYS = [[[_rng.getrandbits(64) for _ in range(64)] for _ in range(6)] for _ in range(2)]
+BLACK_TO_MOVE_KEY = _rng.getrandbits(64)
+# Отдельные ключи для K, Q, k, q; CASTLING_KEYS[маска] - их XOR для любой комбинации
+_CASTLING_BASE_KEYS = [_rng.getrandbits(64) for _ in range(4)]
+CASTLING_KEYS = [0] * 16
+for _mask in range(16):
+    for _bit in range(4):
+        if _mask & (1 << _bit):
+            CASTLING_KEYS[_mask] ^= _CASTLING_BASE_KEYS[_bit]
+EN_PASSANT_KEYS = [_rng.getrandbits(64) for _ in range(8)]
@@ -0,0 +1,76 @@
+"""
+Минимальный UCI-движок для тестов обертки Stockfish: всегда играет первый
+по алфавиту легальный ход и предлагает первый ответ соперника как ponder.
+На `go infinite` / `go ponder` ждет `stop` или `ponderhit`. Для MultiPV
+выдает по глубинам первые по алфавиту ходы с убывающей оценкой.
+"""
+import sys
+
+import chess
+
+
+def best_line(board: chess.Board):
+    move = min(board.legal_moves, key=lambda m: m.uci())
+    board.push(move)
+    reply = min(board.legal_moves, key=lambda m: m.uci()) if not board.is_game_over() else None
+    board.pop()
+    return move, reply
+
+
+def main():
+    board = chess.Board()
+    multipv = 1
+    waiting = None
+    for line in sys.stdin:
+        tokens = line.split()
+        if not tokens:
+            continue
+        command = tokens[0]
+        if command == "uci":
+            print("id name FakeEngine")
+            print("option name Skill Level type spin default 20 min 0 max 20")
+            print("option name Ponder type check default false")
+            print("option name MultiPV type spin default 1 min 1 max 500")
+            print("option name Threads type spin default 1 min 1 max 1024")
+            print("option name Hash type spin default 16 min 1 max 33554432")
+            print("uciok")
+        elif command == "setoption" and tokens[2] == "MultiPV":
+            multipv = int(tokens[4])
+        elif command == "isready":
+            print("readyok")
+        elif command == "position":
+            if tokens[1] == "startpos":
+                board = chess.Board()
+                rest = tokens[2:]
+            else:
+                board = chess.Board(" ".join(tokens[2:8]))
+                rest = tokens[8:]
+            for uci in rest[1:] if rest and rest[0] == "moves" else []:
+                board.push_uci(uci)
+        elif command == "go":
+            move, reply = best_line(board)
+            depth = int(tokens[tokens.index("depth") + 1]) if "depth" in tokens else 2
+            for d in range(1, depth + 1):
+                lines = sorted(board.legal_moves, key=lambda m: m.uci())[:multipv]
+                for i, line_move in enumerate(lines):
+                    print(f"info depth {d} multipv {i + 1} score cp {-10 * i} pv {line_move.uci()}")
+            print(f"info depth {depth} score cp 0 pv {move.uci()}" + (f" {reply.uci()}" if reply else ""))
+            if "depth" in tokens:
+                print(f"bestmove {move.uci()}")
+                sys.stdout.flush()
+                continue
+            bestmove = f"bestmove {move.uci()}" + (f" ponder {reply.uci()}" if reply else "")
+            if "infinite" in tokens or "ponder" in tokens:
+                waiting = bestmove
+            else:
+                print(bestmove)
+        elif command in ("stop", "ponderhit") and waiting:
+            print(waiting)
+            waiting = None
+        elif command == "quit":
+            break
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+
+import chess
+import chess.engine
+
+# Гарантируем, что src и корень проекта (папка engine) в пути
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from engine.analysis import AnalysisLine
+from engine.analysis_cache import AnalysisCache, AnalysisEntry
+from engine.engine_options import EngineOptions
+from game_vs_stockfish import GameVsStockfish
+
+
+def entry(uci: str, score=chess.engine.Cp(25)) -> AnalysisEntry:
+    move = chess.Move.from_uci(uci)
+    return AnalysisEntry(move, [AnalysisLine(12, score, [move])])
+
+
+class CountingEngine:
+    """Движок-заглушка: считает запросы и всегда играет первый легальный ход."""
+    skill_level = 5
+    search_time = 0.1
+    options = EngineOptions()
+
+    def __init__(self):
+        self.calls = 0
+
+    def find_best_move(self, board: chess.Board) -> chess.Move:
+        self.calls += 1
+        return next(iter(board.legal_moves))
+
+    def stop_pondering(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class TestAnalysisCache(unittest.TestCase):
+
+    def test_key_depends_on_position_and_limits(self):
+        """Тест: ключ различает позиции и настройки, но не путь к позиции."""
+        board = chess.Board()
+        key = AnalysisCache.key(board, "hints", 3, 20)
+        self.assertNotEqual(key, AnalysisCache.key(board, "hints", 3, 18))
+        self.assertNotEqual(key, AnalysisCache.key(board, "move", 3, 20))
+        board.push_uci('g1f3')
+        board.push_uci('g8f6')
+        board.push_uci('f3g1')
+        board.push_uci('f6g8')
+        self.assertEqual(key, AnalysisCache.key(board, "hints", 3, 20))
+
+    def test_lru_eviction(self):
+        """Тест: при переполнении вытесняется давно не использованная запись."""
+        cache = AnalysisCache(max_entries=2)
+        cache.put("a", entry('e2e4'))
+        cache.put("b", entry('d2d4'))
+        cache.get("a")
+        cache.put("c", entry('c2c4'))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a").best_move.uci(), 'e2e4')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_save_and_load(self):
+        """Тест: кэш переживает перезапуск, включая оценки матом."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'user_data', 'analysis_cache.json')
+            cache = AnalysisCache(path=path)
+            cache.put("a", entry('e2e4'))
+            cache.put("b", entry('d1h5', chess.engine.Mate(-2))._replace(complete=False))
+            cache.save()
+            loaded = AnalysisCache(path=path)
+            self.assertEqual(loaded.get("a"), cache.get("a"))
+            self.assertEqual(loaded.get("b").score, chess.engine.Mate(-2))
+            self.assertFalse(loaded.get("b").complete)
+
+    def test_corrupted_file_gives_empty_cache(self):
+        """Тест: битый файл кэша не мешает запуску."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'analysis_cache.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('{"broken": ')
+            self.assertEqual(len(AnalysisCache(path=path)), 0)
+
+    def test_repeated_position_answered_from_cache(self):
+        """Тест: после отмены ходов ИИ отвечает из кэша, не спрашивая движок."""
+        with patch('builtins.print'):
+            game = GameVsStockfish('b', 5, lang='en', analysis_cache=AnalysisCache())
+            game.engine.close()
+            game.engine = CountingEngine()
+            game._ai_turn()
+            game.board.undo_move()
+            game._ai_turn()
+        self.assertEqual(game.engine.calls, 1)
+        self.assertEqual(len(game.board.history), 1)
+
+    def test_ai_moves_stay_in_the_game(self):
+        """Тест: ходы ИИ не попадают в общий кэш (и на диск) - новая партия спрашивает движок заново."""
+        shared = AnalysisCache()
+        with patch('builtins.print'):
+            first = GameVsStockfish('b', 5, lang='en', analysis_cache=shared)
+            first.engine.close()
+            first.engine = CountingEngine()
+            first._ai_turn()
+            second = GameVsStockfish('b', 5, lang='en', analysis_cache=shared)
+            second.engine.close()
+            second.engine = CountingEngine()
+            second._ai_turn()
+        self.assertEqual(len(shared), 0)
+        self.assertEqual((first.engine.calls, second.engine.calls), (1, 1))
+
+    def test_repeated_position_searched_again(self):
+        """Тест: позиция, пришедшая повторно ходами партии, не отвечается ходом, найденным при первом появлении."""
+        with patch('builtins.print'):
+            game = GameVsStockfish('b', 5, lang='en')
+            game.engine.close()
+            game.engine = CountingEngine()
+            for uci in ('g1f3', 'g8f6', 'f3g1', 'f6g8'):
+                game.board.make_move(game.board.move_from_uci(uci))
+            game._ai_turn()
+            game.board.undo_move()
+            for uci in ('g1f3', 'g8f6', 'f3g1', 'f6g8'):
+                game.board.make_move(game.board.move_from_uci(uci))
+            game._ai_turn()
+        self.assertEqual(game.engine.calls, 2)
+
+    def test_old_ai_moves_not_loaded(self):
+        """Тест: записи ходов ИИ из файла старых версий не читаются."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'analysis_cache.json')
+            cache = AnalysisCache(path=path)
+            cache.put(AnalysisCache.key(chess.Board(), "move", 5), entry('e2e4'))
+            cache.put(AnalysisCache.key(chess.Board(), "hints", 3), entry('d2d4'))
+            cache.save()
+            self.assertEqual(len(AnalysisCache(path=path)), 1)
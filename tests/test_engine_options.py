@@ -0,0 +1,38 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Гарантируем, что корень проекта (папка engine) в пути
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from engine.engine_options import EngineOptions, MAX_AUTO_HASH_MB
+from engine.builtin_engine import BuiltinEngine
+
+
+class TestEngineOptions(unittest.TestCase):
+
+    def test_auto_detection(self):
+        """Тест: по умолчанию все ядра, кроме одного, и хэш по числу потоков."""
+        with patch('os.cpu_count', return_value=8):
+            self.assertEqual(EngineOptions().uci_options(), {"Threads": 7, "Hash": 7 * 64})
+        with patch('os.cpu_count', return_value=1):
+            self.assertEqual(EngineOptions().resolved_threads(), 1)
+        with patch('os.cpu_count', return_value=128):
+            self.assertEqual(EngineOptions().resolved_hash_mb(), MAX_AUTO_HASH_MB)
+
+    def test_from_config(self):
+        """Тест: настройки читаются из ключей engine_* в settings.json."""
+        options = EngineOptions.from_config({'engine_threads': 4, 'engine_hash_mb': 128,
+                                             'engine_move_overhead': 30, 'engine_nodes': 500000})
+        self.assertEqual(options.uci_options(), {"Threads": 4, "Hash": 128, "Move Overhead": 30})
+        self.assertEqual((options.nodes, options.depth), (500000, None))
+
+    def test_builtin_engine_uses_hash_and_limits(self):
+        """Тест: встроенный движок меняет размер хэша и учитывает пределы поиска."""
+        engine = BuiltinEngine(skill_level=20)
+        engine.configure(20, 1.0, EngineOptions(hash_mb=2, depth=3))
+        self.assertEqual(engine.searcher.tt.size_mb, 2)
+        self.assertEqual(engine.max_depth, 3)
@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+
+# Гарантируем, что src и корень проекта (папка engine) в пути
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from engine.engine_pool import EnginePool
+
+
+class FakeEngine:
+    """Заглушка процесса движка: запоминает вызовы, может "упасть"."""
+    started = 0
+
+    def __init__(self):
+        FakeEngine.started += 1
+        self.alive = True
+        self.restarts = 0
+        self.games = 0
+        self.closed = False
+
+    def configure(self, skill_level, search_time, options=None):
+        self.skill_level, self.search_time = skill_level, search_time
+        self.options = options
+
+    def new_game(self):
+        self.games += 1
+
+    def is_alive(self):
+        return self.alive
+
+    def stop_pondering(self):
+        pass
+
+    def restart(self):
+        self.restarts += 1
+        self.alive = True
+
+    def close(self):
+        self.closed = True
+
+
+class TestEnginePool(unittest.TestCase):
+
+    def setUp(self):
+        FakeEngine.started = 0
+
+    def test_engine_reused_between_games(self):
+        """Тест: вторая партия получает тот же процесс, перенастроенный и с ucinewgame."""
+        pool = EnginePool(factory=FakeEngine)
+        first = pool.acquire(skill_level=3, search_time=1.0)
+        pool.release(first)
+        second = pool.acquire(skill_level=15, search_time=0.5)
+        self.assertIs(first, second)
+        self.assertEqual(FakeEngine.started, 1)
+        self.assertEqual((second.skill_level, second.search_time), (15, 0.5))
+        self.assertEqual(second.games, 2)
+        pool.release(second)
+        pool.close()
+        self.assertTrue(second.closed)
+
+    def test_crashed_engine_restarted(self):
+        """Тест: упавший движок перезапускается при выдаче."""
+        pool = EnginePool(factory=FakeEngine)
+        engine = pool.acquire(skill_level=5, search_time=1.0)
+        engine.alive = False
+        pool.release(engine)
+        engine = pool.acquire(skill_level=5, search_time=1.0)
+        self.assertTrue(engine.is_alive())
+        self.assertEqual(engine.restarts, 1)
+        pool.close()
+
+    def test_missing_engine_raises_on_acquire(self):
+        """Тест: если движок не запускается, acquire пробрасывает ошибку (игра выберет встроенный)."""
+        def missing():
+            raise FileNotFoundError("no stockfish")
+        pool = EnginePool(factory=missing)
+        with self.assertRaises(FileNotFoundError):
+            pool.acquire(skill_level=5, search_time=1.0)
+        pool.close()
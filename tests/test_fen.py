@@ -0,0 +1,138 @@
+import unittest
+import sys
+import os
+import io
+import random
+
+import chess
+
+# Гарантируем, что src в пути
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from Board import Board, CastlingRights
+from fen import FenError, STANDARD_START_FEN, parse_fen, parse_epd, format_epd, read_epd
+from moves import move_to_uci
+from perft import read_epd_suite, run_suite
+from pgn import board_from_fen, epd_moves
+
+EPD = """# Win at Chess
+2rr3k/pp3pp1/1nnqbN1p/3pN3/2pP4/2P3Q1/PPB4P/R4RK1 w - - bm Qg6; id "WAC.001";
+5rk1/1ppb3p/p1pb4/6q1/3P1p1r/2P1R2P/PP1BQ1P1/5RKN w - - bm Rg3; id "WAC.003"; c0 "quoted; \\"text\\"";
+
+4k3/8/8/8/8/8/8/4K2R w K - am Kf2; hmvc 12; fmvn 40;
+"""
+
+
+class TestFen(unittest.TestCase):
+    def test_matches_python_chess(self):
+        """Тест: FEN доски совпадает с python-chess (X-FEN в 960) и читается обратно в ту же позицию."""
+        rng = random.Random(3)
+        for is_chess960 in (False, True, True):
+            board = Board(is_chess960=is_chess960)
+            lib_board = chess.Board(board.fen(), chess960=is_chess960)
+            for _ in range(100):
+                moves = board.get_legal_moves()
+                if not moves:
+                    break
+                move = rng.choice(moves)
+                board.make_move(move)
+                lib_board.push(chess.Move.from_uci(move_to_uci(move, is_chess960)))
+                fen = board.fen()
+                self.assertEqual(fen, lib_board.fen(en_passant="fen"))
+                copy = board_from_fen(fen, is_chess960)
+                self.assertEqual(copy.fen(), fen)
+                self.assertEqual(copy.zobrist_key, board.zobrist_key)
+                self.assertEqual(copy.get_legal_moves(), board.get_legal_moves())
+
+    def test_chess960_castling_notations(self):
+        """Тест: KQkq, буквы вертикалей X-FEN и Shredder-FEN дают одни права; X-FEN пишет вертикаль для внутренней ладьи."""
+        for castling in ("KQkq", "HBhb", "KBkb"):
+            board = board_from_fen(f"1r2k2r/8/8/8/8/8/8/1R2K2R w {castling} - 0 1", chess960=True)
+            self.assertEqual(board.castling_rights, CastlingRights.ALL)
+            self.assertEqual(board.initial_rook_files, {'w': [1, 7], 'b': [1, 7]})
+            self.assertEqual(board.fen().split()[2], "KQkq")
+            self.assertEqual(board.fen(shredder=True).split()[2], "HBhb")
+        # Ладья f1 - не крайняя справа: X-FEN пишет ее вертикалью
+        board = board_from_fen("4k3/8/8/8/8/8/8/1R2KR1R w F - 0 1", chess960=True)
+        self.assertEqual(board.initial_rook_files, {'w': [5], 'b': []})
+        self.assertEqual(board.fen().split()[2], "F")
+        self.assertIn(board.move_from_uci("e1f1"), board.get_legal_moves())
+
+    def test_load_resets_state(self):
+        """Тест: загрузка FEN сбрасывает историю, повторения и вертикали ладей прежней позиции."""
+        board = Board(is_chess960=True)
+        for _ in range(4):
+            board.make_move(board.get_legal_moves()[0])
+        board.load_from_fen("4k3/8/8/8/8/8/8/R3K3 w Q - 0 1")
+        self.assertEqual(board.history, [])
+        self.assertEqual(sum(board.position_history.values()), 1)
+        self.assertEqual(board.initial_rook_files, {'w': [0], 'b': []})
+
+        board = Board()
+        board.load_from_fen("4k3/8/8/8/8/8/8/4K3 b - - 7 30")
+        self.assertEqual((board.color_to_move, board.halfmove_clock, board.fullmove_number), ('b', 7, 30))
+        self.assertEqual(board.fen(), "4k3/8/8/8/8/8/8/4K3 b - - 7 30")
+
+    def test_invalid_fen_raises(self):
+        """Тест: ошибки расстановки, очереди хода, рокировки, взятия на проходе и счетчиков - FenError."""
+        bad = [
+            "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1",          # 7 горизонталей
+            "rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",  # 9 полей
+            "rnbqkbnr/pppppppp/44/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", # цифры подряд
+            "rnbqkbnr/ppppxppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",  # неизвестная фигура
+            "rnbq1bnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQ - 0 1",    # нет черного короля
+            "P3k3/8/8/8/8/8/8/4K3 w - - 0 1",                            # пешка на 8-й
+            "4k3/8/8/8/8/8/8/4K3 x - - 0 1",
+            "4k3/8/8/8/8/8/8/4K3 w K - 0 1",                             # рокировка без ладьи
+            "4k3/8/8/8/8/8/8/R3K2R w KQX - 0 1",
+            "4k3/8/8/8/8/8/8/R3K2R w KK - 0 1",
+            "4k3/8/8/8/8/8/8/R2K3R w KQ - 0 1",                          # король не на e1 в классике
+            "4k3/8/8/8/4P3/8/8/4K3 b - e6 0 1",                          # поле не той стороны
+            "4k3/8/8/8/8/8/8/4K3 b - e3 0 1",                            # пешка не прошла
+            "4k3/8/8/8/8/8/8/4K3 w - - x 1",
+            "4k3/8/8/8/8/8/8/4K3 w - - -1 1",
+            "4k3/8/8/8/8/8/8/4K3 w - - 0",
+        ]
+        for fen in bad:
+            with self.assertRaises(FenError, msg=fen):
+                Board().load_from_fen(fen)
+        with self.assertRaises(FenError):
+            parse_fen("4k3/8/8/8/8/8/8/R1R1K3 w AC - 0 1", chess960=True)  # две длинные рокировки
+
+    def test_optional_counters(self):
+        """Тест: FEN без счетчиков ходов читается с 0 1."""
+        position = parse_fen(" ".join(STANDARD_START_FEN.split()[:4]))
+        self.assertEqual((position.halfmove, position.fullmove), (0, 1))
+        self.assertEqual(len(position.castling), 4)
+
+
+class TestEpd(unittest.TestCase):
+    def test_read_operations(self):
+        """Тест: операции EPD (bm, am, id, c0 в кавычках, hmvc/fmvn) и ходы в SAN на доске позиции."""
+        records = list(read_epd(io.StringIO(EPD)))
+        self.assertEqual([record.id for record in records], ["WAC.001", "WAC.003", None])
+        self.assertEqual(records[1].operations["c0"], ['quoted; "text"'])
+        self.assertEqual(records[2].fen, "4k3/8/8/8/8/8/8/4K2R w K - 12 40")
+
+        board = board_from_fen(records[0].fen)
+        self.assertEqual([move_to_uci(move) for move in epd_moves(board, records[0])], ["g3g6"])
+        board = board_from_fen(records[2].fen)
+        self.assertEqual([move_to_uci(move) for move in epd_moves(board, records[2], "am")], ["e1f2"])
+
+    def test_write_round_trip(self):
+        """Тест: записанная строка EPD читается обратно в те же позицию и операции."""
+        record = parse_epd(EPD.splitlines()[2])
+        line = format_epd(record.fen, record.operations)
+        self.assertTrue(line.startswith('5rk1/1ppb3p/p1pb4/6q1/3P1p1r/2P1R2P/PP1BQ1P1/5RKN w - - bm Rg3; id "WAC.003";'))
+        self.assertEqual(parse_epd(line), record)
+
+    def test_perft_suite(self):
+        """Тест: набор perft в EPD (операции D1, D2, ... после полного FEN или без счетчиков)."""
+        suite = read_epd_suite(io.StringIO(
+            "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - ;D1 20 ;D2 400\n"
+            "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1 ;D1 26 ;D2 568 ;id \"castles\"\n"
+        ))
+        self.assertEqual([(p.name, p.expected) for p in suite], [("epd-1", [20, 400]), ("castles", [26, 568])])
+        self.assertTrue(run_suite(suite, out=lambda _: None))
+        with self.assertRaises(FenError):
+            read_epd_suite(io.StringIO("8/8/8/8/8/8/8/8 w - - ;D1 0\n"))
@@ -0,0 +1,39 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Гарантируем, что src в пути
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.builtin_engine import BuiltinEngine
+from game960 import Game960
+from moves import is_castling
+
+# Длинная рокировка с королем на b1 ставит мат; ход короля b1c1 - нет
+CASTLING_MATE_FEN = "2rkr3/2p1p3/8/8/8/8/8/RK6 w Q - 0 1"
+
+
+class TestGame960Fallback(unittest.TestCase):
+    def setUp(self):
+        # Stockfish "не найден" - партия переходит на встроенный движок
+        with patch('builtins.print'), patch('builtins.input', return_value=''), \
+                patch('game_vs_stockfish.StockfishEngine', side_effect=FileNotFoundError):
+            self.game = Game960('b', 8, lang='en')
+        self.game.board.load_from_fen(CASTLING_MATE_FEN)
+        self.game.engine.search_time = 1.0
+
+    def test_builtin_engine_castles(self):
+        """Тест: в 960 без Stockfish ИИ делает рокировку (король на свою ладью), а не обычный ход короля."""
+        self.assertIsInstance(self.game.engine, BuiltinEngine)
+        with patch('builtins.print'):
+            self.game._ai_turn()
+        self.assertTrue(is_castling(self.game.last_move))
+        self.assertEqual(self.game.board.get_game_status(), 'checkmate')
+
+    def test_builtin_hint_line(self):
+        """Тест: линия подсказки встроенного движка в 960 записывает рокировку в SAN."""
+        lib_board = self.game._engine_board()
+        line = self.game.engine.analyse(lib_board, depth=3)
+        self.assertIn("O-O-O#", self.game._format_hint_line(lib_board, 1, line))
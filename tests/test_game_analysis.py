@@ -0,0 +1,118 @@
+import unittest
+import sys
+import os
+import io
+import json
+import tempfile
+
+import chess
+import chess.engine
+import chess.pgn
+
+# Гарантируем, что src и корень проекта (папка engine) в пути
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from engine.analysis import AnalysisLine
+from engine.stockfish_engine import StockfishEngine
+from game_analysis import (AnalysisLimits, analyse_game, analyse_games, classify, evaluate_positions,
+                           format_analysis, load_saved_game, read_pgn_games)
+
+FAKE_ENGINE = [sys.executable, os.path.join(os.path.dirname(__file__), 'fake_uci_engine.py')]
+
+
+class ScriptedEngine:
+    """Движок-заглушка: оценки позиций (за сторону, которая ходит) заданы заранее."""
+    def __init__(self, scores: dict, best: dict):
+        self.scores = scores
+        self.best = best
+
+    def analyse(self, board, depth=None, nodes=None, time=None) -> AnalysisLine:
+        key = board.board_fen()
+        move = chess.Move.from_uci(self.best[key]) if key in self.best else next(iter(board.legal_moves))
+        return AnalysisLine(depth or 1, chess.engine.Cp(self.scores.get(key, 0)), [move])
+
+
+def game_from_pgn(text: str) -> chess.pgn.Game:
+    return chess.pgn.read_game(io.StringIO(text))
+
+
+class TestGameAnalysis(unittest.TestCase):
+
+    def test_classification_thresholds(self):
+        """Тест: пороги неточности, ошибки и зевка."""
+        self.assertEqual([classify(cp) for cp in (0, 49, 50, 100, 299, 300)],
+                         ["", "", "inaccuracy", "mistake", "mistake", "blunder"])
+
+    def test_cp_loss_and_colors(self):
+        """Тест: потеря считается с точки зрения сходившего, партия может начинаться ходом черных."""
+        game = game_from_pgn('[FEN "4k3/8/8/8/8/8/4P3/4K2q b - - 0 30"]\n\n30... Qh2 31. Kd1 *')
+        start = game.board()
+        after_qh2 = start.copy()
+        after_qh2.push_san('Qh2')
+        after_kd1 = after_qh2.copy()
+        after_kd1.push_san('Kd1')
+        engine = ScriptedEngine(
+            scores={start.board_fen(): 900, after_qh2.board_fen(): -500, after_kd1.board_fen(): -900},
+            best={start.board_fen(): 'h1h4', after_qh2.board_fen(): 'e1d1'},
+        )
+        analysis = analyse_game(game, [engine])
+        qh2, kd1 = analysis.moves
+        self.assertEqual((qh2.move_number, qh2.color, qh2.best_san), (30, chess.BLACK, 'Qh4+'))
+        self.assertEqual((qh2.eval_before, qh2.eval_after, qh2.cp_loss, qh2.classification),
+                         (-900, -500, 400, 'blunder'))
+        self.assertEqual((kd1.color, kd1.cp_loss), (chess.WHITE, 0))  # сыгран лучший ход
+        self.assertIn('30... Qh2', format_analysis(analysis))
+
+    def test_checkmate_evaluated_without_engine(self):
+        """Тест: финальная позиция с матом оценивается без обращения к движку."""
+        game = game_from_pgn('1. f3 e5 2. g4 Qh4# 0-1')
+        analysis = analyse_game(game, [ScriptedEngine({}, {})])
+        self.assertEqual(analysis.moves[-1].eval_after, -1000)
+
+    def test_parallel_engines(self):
+        """Тест: позиции партии делятся между несколькими процессами движка."""
+        engines = [StockfishEngine(engine_path=FAKE_ENGINE, ponder=False) for _ in range(2)]
+        try:
+            boards = [chess.Board()]
+            for uci in ['e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1b5']:
+                boards.append(boards[-1].copy())
+                boards[-1].push_uci(uci)
+            lines = evaluate_positions(boards, engines, AnalysisLimits(depth=2))
+        finally:
+            for engine in engines:
+                engine.close()
+        self.assertEqual(len(lines), 6)
+        for board, line in zip(boards, lines):
+            self.assertIn(line.pv[0], board.legal_moves)
+
+    def test_games_read_lazily_in_order(self):
+        """Тест: партии архива разбираются по мере чтения, по порядку, и в работе не больше 2 * движков."""
+        pgn = "".join(f'[Event "{i}"]\n\n1. e4 e5 2. Nf3 {"Nc6" if i % 2 else "d6"} *\n\n' for i in range(12))
+        read = []
+
+        def games():
+            for game in read_pgn_games(io.StringIO(pgn)):
+                read.append(game.headers["Event"])
+                yield game
+
+        engines = [ScriptedEngine({}, {}), ScriptedEngine({}, {})]
+        analyses = analyse_games(games(), engines)
+        first = next(analyses)
+        self.assertEqual(first.headers["Event"], "0")
+        self.assertLessEqual(len(read), 2 * len(engines) + 1)
+        rest = list(analyses)
+        self.assertEqual([a.headers["Event"] for a in rest], [str(i) for i in range(1, 12)])
+        self.assertEqual(rest[0].moves[3].san, "Nc6")
+        self.assertEqual(rest[1].moves[3].san, "d6")
+
+    def test_load_saved_game(self):
+        """Тест: сохраненная партия восстанавливается из начальной позиции и ходов."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'saved_game.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"game_type": "GameWithHints", "fen": "ignored",
+                           "start_fen": chess.STARTING_FEN, "moves": ["e2e4", "c7c5"]}, f)
+            game = load_saved_game(path)
+        self.assertEqual([move.uci() for move in game.mainline_moves()], ["e2e4", "c7c5"])
@@ -0,0 +1,162 @@
+import unittest
+import sys
+import os
+import io
+import random
+import tempfile
+
+# Гарантируем, что src в пути
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import chess.pgn
+
+from Board import Board
+from game_library import GameLibrary, GameFilter, UNFINISHED, _pack
+from lib_board_bridge import board_to_fen
+from moves import is_castling
+
+INFO = {"game_type": "GameWithHints", "player_color": "w", "skill_level": 5, "lang": "en",
+        "white": "Player", "black": "Stockfish (level 5)"}
+
+PGN = """[Event "Test"]
+[White "Alice"]
+[Black "Bob"]
+[Date "2024.03.01"]
+[Result "1-0"]
+
+1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0
+
+[Event "Test"]
+[White "Carol"]
+[Black "Dave"]
+[Date "2024.03.02"]
+[Result "1/2-1/2"]
+
+1. d4 d5 2. c4 e6 3. Nc3 Nf6 4. cxd5 exd5 5. Bg5 Be7 1/2-1/2
+"""
+
+
+def play(board: Board, *ucis: str):
+    for uci in ucis:
+        board.make_move(board.move_from_uci(uci))
+
+
+class TestGameLibrary(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.library = GameLibrary(os.path.join(self.tmp.name, 'games.sqlite3'))
+
+    def tearDown(self):
+        self.library.close()
+        self.tmp.cleanup()
+
+    def test_autosave_and_resume(self):
+        """Тест: ходы дописываются после каждого sync, отмена обрезает запись, партия восстанавливается с историей."""
+        board = Board()
+        record = self.library.start_game(board, INFO)
+        play(board, "e2e4", "c7c5", "g1f3")
+        record.sync(board)
+        board.undo_move()
+        play(board, "b1c3", "b8c6")
+        record.sync(board)
+
+        resumed, summary, loaded = self.library.resume(record.game_id)
+        self.assertEqual(summary.plies, 4)
+        self.assertEqual(summary.opening, "e4 c5 Nc3 Nc6")
+        self.assertEqual(summary.result, UNFINISHED)
+        self.assertEqual(board_to_fen(loaded), board_to_fen(board))
+        self.assertEqual([r.move for r in loaded.history], [r.move for r in board.history])
+        play(loaded, "f1c4")
+        resumed.sync(loaded)
+        self.assertEqual(self.library.summary(record.game_id).plies, 5)
+
+    def test_sync_appends_only_new_moves(self):
+        """Тест: sync дописывает к записи только новые ходы, после отмены обрезает ее; байты ходов не искажаются."""
+        board = Board()
+        record = self.library.start_game(board, INFO)
+        rng = random.Random(5)
+        for _ in range(60):
+            if board.history and rng.random() < 0.2:
+                board.undo_move()
+            elif board.get_legal_moves():
+                board.make_move(rng.choice(sorted(board.get_legal_moves())))
+            record.sync(board)
+            moves = self.library._db.execute("SELECT moves FROM games WHERE id = ?", (record.game_id,)).fetchone()[0]
+            self.assertIsInstance(moves, bytes)
+            self.assertEqual(moves, _pack([r.move for r in board.history]))
+        self.assertEqual(self.library.summary(record.game_id).plies, len(board.history))
+
+    def test_several_unfinished_games(self):
+        """Тест: недоигранных партий может быть несколько; продолжается последняя, законченная не предлагается."""
+        first = self.library.start_game(Board(), INFO)
+        board = Board()
+        second = self.library.start_game(board, dict(INFO, game_type="GameVsStockfish"))
+        self.assertEqual(self.library.latest_unfinished().id, second.game_id)
+        play(board, "f2f3", "e7e5", "g2g4", "d8h4")
+        second.finish(board)
+        summary = self.library.summary(second.game_id)
+        self.assertEqual((summary.result, summary.termination), ("0-1", "checkmate"))
+        self.assertEqual(self.library.latest_unfinished().id, first.game_id)
+
+    def test_chess960_castling_after_resume(self):
+        """Тест: в 960 начальные вертикали ладей сохраняются - рокировки те же, что до сохранения."""
+        board = Board(is_chess960=True, rng=random.Random(11))
+        record = self.library.start_game(board, dict(INFO, game_type="Game960"))
+        rng = random.Random(3)
+        for _ in range(20):
+            board.make_move(rng.choice(sorted(board.get_legal_moves())))
+        record.sync(board)
+        loaded = self.library.load_board(record.game_id)
+        self.assertEqual(loaded.initial_rook_files, board.initial_rook_files)
+        self.assertEqual(sorted(m for m in loaded.get_legal_moves() if is_castling(m)),
+                         sorted(m for m in board.get_legal_moves() if is_castling(m)))
+
+    def test_filters_and_pages(self):
+        """Тест: фильтры по режиму, итогу, уровню и дебюту; страницы идут от новых партий к старым."""
+        self.library.import_pgn(io.StringIO(PGN))
+        for level in range(5):
+            board = Board()
+            play(board, "e2e4", "c7c5")
+            self.library.start_game(board, dict(INFO, skill_level=level))
+
+        self.assertEqual(self.library.count(), 7)
+        self.assertEqual(self.library.count(GameFilter(mode="pgn")), 2)
+        self.assertEqual(self.library.count(GameFilter(result="1-0")), 1)
+        self.assertEqual(self.library.count(GameFilter(skill_level=3)), 1)
+        self.assertEqual(self.library.count(GameFilter(opening="e4")), 6)
+        self.assertEqual(self.library.count(GameFilter(opening="e4  c5")), 5)
+        self.assertEqual(self.library.count(GameFilter(opening="d4 d5 c4")), 1)
+        self.assertEqual(self.library.count(GameFilter(since="2024-03-02", until="2024-03-03")), 1)
+
+        pages = [self.library.list_games(limit=3, offset=offset) for offset in (0, 3, 6)]
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        ids = [game.id for page in pages for game in page]
+        self.assertEqual(len(set(ids)), 7)
+        self.assertEqual(pages[2][0].white, "Alice")
+
+    def test_pgn_round_trip(self):
+        """Тест: импорт PGN и экспорт обратно сохраняют ходы, игроков и результат."""
+        self.assertEqual(self.library.import_pgn(io.StringIO(PGN)), 2)
+        out = io.StringIO()
+        self.assertEqual(self.library.export_pgn(out), 2)
+        out.seek(0)
+        originals = io.StringIO(PGN)
+        for _ in range(2):
+            original, exported = chess.pgn.read_game(originals), chess.pgn.read_game(out)
+            self.assertEqual(list(exported.mainline_moves()), list(original.mainline_moves()))
+            for tag in ("White", "Black", "Result", "Date", "Event"):
+                self.assertEqual(exported.headers[tag], original.headers[tag])
+
+    def test_imported_chess960_game(self):
+        """Тест: партия 960 из PGN (FEN с рокировкой) загружается на нашу доску с верными ходами."""
+        pgn = ('[Variant "Chess960"]\n[SetUp "1"]\n'
+               '[FEN "bqnb1rkr/pp3ppp/3ppn2/2p5/5P2/P2P4/NPP1P1PP/BQ1BNRKR w HFhf - 2 9"]\n\n'
+               '9. g3 cxd3 *\n')
+        self.assertEqual(self.library.import_pgn(io.StringIO(pgn)), 0)  # cxd3 нелегален - партия пропущена
+        pgn = pgn.replace("cxd3", "Ng4")
+        self.assertEqual(self.library.import_pgn(io.StringIO(pgn)), 1)
+        game_id = self.library.list_games()[0].id
+        board = self.library.load_board(game_id)
+        self.assertEqual(len(board.history), 2)
+        self.assertEqual(board.initial_rook_files, {'w': [5, 7], 'b': [5, 7]})
+        self.assertEqual(str(self.library.load_pgn_game(game_id).mainline_moves()), "9. g3 Ng4")
@@ -0,0 +1,135 @@
+import unittest
+import sys
+import os
+import json
+import random
+import tempfile
+from unittest.mock import patch
+
+# Гарантируем, что src и корень проекта (main.py) в пути
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Board import Board
+from game_library import GameLibrary
+from game_record import GameRecord, MOVE_FORMAT
+from localization import LocalizationManager
+from main import migrate_saved_game
+from lib_board_bridge import board_to_fen
+from moves import is_castling
+
+INFO = {"game_type": "GameWithHints", "player_color": "w", "skill_level": 5, "lang": "en"}
+
+
+def play(board: Board, *ucis: str):
+    for uci in ucis:
+        board.make_move(board.move_from_uci(uci))
+
+
+class TestGameRecord(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'saved_game.json')
+        self.moves_path = os.path.join(self.tmp.name, 'saved_game.moves')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def save(self, board: Board, info: dict = INFO, tail: bytes = b""):
+        """Сохранение, как его писали версии до библиотеки: начальная позиция в JSON и журнал ходов."""
+        moves = [record.move for record in board.history]
+        for _ in moves:
+            board.undo_move()
+        metadata = dict(info, start_fen=board_to_fen(board), chess960=board.is_chess960,
+                        rook_files=board.initial_rook_files)
+        for move in moves:
+            board.make_move(move)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f)
+        with open(self.moves_path, 'wb') as f:
+            f.write(b"".join(MOVE_FORMAT.pack(move) for move in moves) + tail)
+
+    def test_round_trip_restores_history(self):
+        """Тест: позиция, история ходов и метаданные восстанавливаются; отмена хода работает."""
+        board = Board()
+        play(board, "e2e4", "d7d5", "e4d5", "g8f6", "f1b5", "c7c6", "g1f3", "c6b5", "e1g1")
+        self.save(board)
+
+        _, info, loaded = GameRecord.load(self.path)
+        self.assertEqual(info, INFO)
+        self.assertEqual(board_to_fen(loaded), board_to_fen(board))
+        self.assertEqual([r.move for r in loaded.history], [r.move for r in board.history])
+        loaded.undo_move()
+        board.undo_move()
+        self.assertEqual(board_to_fen(loaded), board_to_fen(board))
+
+    def test_repetition_survives_resume(self):
+        """Тест: повторения позиций до сохранения учитываются после загрузки."""
+        board = Board()
+        play(board, "g1f3", "g8f6", "f3g1", "f6g8", "g1f3", "g8f6", "f3g1")
+        self.save(board)
+        _, _, loaded = GameRecord.load(self.path)
+        play(loaded, "f6g8")
+        self.assertEqual(loaded.get_game_status(), 'draw_repetition')
+
+    def test_torn_tail_is_dropped(self):
+        """Тест: недописанный последний ход (сбой во время записи) и нелегальный хвост отбрасываются."""
+        board = Board()
+        play(board, "d2d4", "d7d5")
+        self.save(board, tail=b"\x01")
+        self.assertEqual(len(GameRecord.load(self.path)[2].history), 2)
+        self.save(board, tail=MOVE_FORMAT.pack(board.history[0].move))  # d2d4 еще раз - поле d2 пусто
+        self.assertEqual(len(GameRecord.load(self.path)[2].history), 2)
+
+    def test_chess960_castling_after_resume(self):
+        """Тест: в 960 начальные вертикали ладей сохраняются - рокировки те же, что до сохранения."""
+        board = Board(is_chess960=True, rng=random.Random(11))
+        rng = random.Random(3)
+        for _ in range(20):
+            board.make_move(rng.choice(sorted(board.get_legal_moves())))
+        self.save(board, dict(INFO, game_type="Game960"))
+        _, _, loaded = GameRecord.load(self.path)
+        self.assertEqual(loaded.initial_rook_files, board.initial_rook_files)
+        self.assertEqual(sorted(m for m in loaded.get_legal_moves() if is_castling(m)),
+                         sorted(m for m in board.get_legal_moves() if is_castling(m)))
+
+    def test_legacy_json_save(self):
+        """Тест: сохранение самого старого формата (FEN и ходы в JSON) читается без журнала."""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(dict(INFO, fen="ignored", start_fen="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+                           moves=["e2e4", "c7c5"]), f)
+        _, info, board = GameRecord.load(self.path)
+        self.assertEqual(info, INFO)
+        self.assertEqual(len(board.history), 2)
+        self.assertFalse(os.path.exists(self.moves_path))
+
+    def test_delete(self):
+        """Тест: после переноса удаляются оба файла сохранения."""
+        self.save(Board())
+        GameRecord(self.path).delete()
+        self.assertFalse(os.path.exists(self.path) or os.path.exists(self.moves_path))
+
+    def test_migration_to_library(self):
+        """Тест: перенесенное в библиотеку сохранение удаляется вместе с журналом."""
+        board = Board()
+        play(board, "e2e4", "c7c5")
+        self.save(board)
+        library = GameLibrary()
+        migrate_saved_game(library, LocalizationManager(lang='en'), self.path)
+        self.assertEqual(library.latest_unfinished().plies, 2)
+        self.assertFalse(os.path.exists(self.path) or os.path.exists(self.moves_path))
+        library.close()
+
+    def test_unreadable_save_is_kept(self):
+        """Тест: нечитаемое сохранение не удаляется, а откладывается в .bad с сообщением игроку."""
+        self.save(Board())
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{"game_type": "GameWithHints", "start_fen": "not a fen"')
+        library = GameLibrary()
+        with patch('builtins.print') as printed:
+            migrate_saved_game(library, LocalizationManager(lang='en'), self.path)
+        self.assertIsNone(library.latest_unfinished())
+        self.assertTrue(os.path.exists(self.path + ".bad") and os.path.exists(self.moves_path + ".bad"))
+        self.assertFalse(os.path.exists(self.path))
+        self.assertIn(self.path + ".bad", printed.call_args[0][0])
+        library.close()
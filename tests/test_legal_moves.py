@@ -0,0 +1,143 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Гарантируем, что src в пути
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from Board import Board
+from moves import move_to_uci, is_promotion
+
+
+def sq(name: str) -> tuple:
+    """'e4' -> (4, 4) в координатах Board."""
+    return (8 - int(name[1]), 'abcdefgh'.index(name[0]))
+
+
+def mv(uci: str) -> tuple:
+    return (sq(uci[:2]), sq(uci[2:4]))
+
+
+class TestLegalMoves(unittest.TestCase):
+
+    def _moves(self, fen: str) -> list:
+        """Легальные ходы позиции в виде строк UCI."""
+        board = Board()
+        board.load_from_fen(fen)
+        return [move_to_uci(move) for move in board.get_legal_moves()]
+
+    def test_double_check_only_king_moves(self):
+        """Тест: при двойном шахе ходит только король."""
+        # Ладья e8 и слон b4 шахуют королю e1, белый ферзь d2 мог бы перекрыть слона
+        moves = self._moves("4r2k/8/8/8/1b6/8/3Q4/4K3 w - - 0 1")
+        self.assertTrue(moves)
+        self.assertTrue(all(move.startswith('e1') for move in moves))
+        self.assertNotIn('d2b4', moves)
+
+    def test_single_check_evasions(self):
+        """Тест: при шахе - только взятие шахующей фигуры, перекрытие или уход короля."""
+        moves = self._moves("4r2k/8/8/8/8/8/3N4/R3K3 w Q - 0 1")
+        self.assertNotIn('a1a8', moves)   # не закрывает от шаха
+        self.assertNotIn('d2b3', moves)   # не закрывает от шаха
+        self.assertNotIn('e1e2', moves)   # остается на линии ладьи
+        self.assertNotIn('e1c1', moves)   # рокировка под шахом
+        self.assertIn('d2e4', moves)      # перекрытие конем
+        self.assertIn('e1f2', moves)
+
+    def test_pinned_piece_moves_along_pin(self):
+        """Тест: связанная ладья ходит только по линии связки."""
+        moves = self._moves("4r2k/8/8/8/8/8/4R3/4K3 w - - 0 1")
+        rook_moves = [m for m in moves if m.startswith('e2')]
+        self.assertCountEqual(rook_moves, ['e2e3', 'e2e4', 'e2e5', 'e2e6', 'e2e7', 'e2e8'])
+
+    def test_en_passant_discovered_check(self):
+        """Тест: взятие на проходе запрещено, если вскрывает шах по горизонтали."""
+        moves = self._moves("8/8/8/K2pP2r/8/8/8/7k w - d6 0 1")
+        self.assertNotIn('e5d6', moves)
+        self.assertIn('e5e6', moves)
+
+    def test_en_passant_resolves_check(self):
+        """Тест: взятие на проходе допустимо, если съедает шахующую пешку."""
+        moves = self._moves("8/8/8/2k5/3Pp3/8/8/4K3 b - d3 0 1")
+        self.assertIn('e4d3', moves)
+
+    def test_castling_through_attacked_square(self):
+        """Тест: нельзя рокировать через атакованное поле, можно - если атакована только ладья."""
+        moves = self._moves("r3k2r/8/8/8/8/8/5r2/R3K2R w KQkq - 0 1")
+        self.assertNotIn('e1g1', moves)   # f1 под боем ладьи f2
+        self.assertIn('e1c1', moves)
+        moves = self._moves("1r2k3/8/8/8/8/8/8/R3K3 w Q - 0 1")
+        self.assertIn('e1c1', moves)      # b1 атакован, но король его не проходит
+
+    def test_promotion_generates_all_pieces(self):
+        """Тест: превращение дает четыре отдельных хода, в том числе со взятием."""
+        moves = self._moves("1r2k3/P7/8/8/8/8/8/4K3 w - - 0 1")
+        for promotion in 'qrbn':
+            self.assertIn('a7a8' + promotion, moves)
+            self.assertIn('a7b8' + promotion, moves)
+
+
+class TestMoveEncoding(unittest.TestCase):
+
+    def test_uci_round_trip(self):
+        """Тест: каждый легальный ход переводится в UCI и обратно без потерь."""
+        board = Board()
+        board.load_from_fen("r3k2r/1P6/8/3pP3/8/8/8/R3K2R w KQkq d6 0 1")
+        for move in board.get_legal_moves():
+            self.assertEqual(board.move_from_uci(move_to_uci(move)), move)
+
+    def test_underpromotion_survives_round_trip(self):
+        """Тест: недопревращение в коня не превращается в ферзя."""
+        board = Board()
+        board.load_from_fen("4k3/1P6/8/8/8/8/8/4K3 w - - 0 1")
+        move = board.move_from_uci('b7b8n')
+        self.assertTrue(is_promotion(move))
+        board.make_move(move)
+        self.assertEqual(board.get_piece_at(sq('b8')).symbol, 'N')
+        board.undo_move()
+        self.assertEqual(move_to_uci(board.move_from_uci('b7b8')), 'b7b8q')  # без буквы - ферзь
+
+    def test_castling_uci_in_classic_and_960(self):
+        """Тест: рокировка пишется e1g1 в классике и ходом на ладью в 960."""
+        board = Board()
+        board.load_from_fen("4k3/8/8/8/8/8/8/4K2R w K - 0 1")
+        move = board.move_from_uci('e1g1')
+        self.assertIsNotNone(move)
+        self.assertEqual(move_to_uci(move, chess960=True), 'e1h1')
+        board.make_move(move)
+        self.assertEqual(board.get_piece_at(sq('g1')).symbol, 'K')
+        self.assertEqual(board.get_piece_at(sq('f1')).symbol, 'R')
+
+    def test_illegal_uci_returns_none(self):
+        """Тест: несуществующий ход не находится."""
+        board = Board()
+        self.assertIsNone(board.move_from_uci('e2e5'))
+
+
+class TestMoveCache(unittest.TestCase):
+
+    def test_moves_generated_once_per_position(self):
+        """Тест: повторные запросы ходов и статуса не генерируют ходы заново."""
+        board = Board()
+        with patch.object(board, '_generate_legal_moves', wraps=board._generate_legal_moves) as generate:
+            first = board.get_legal_moves()
+            self.assertEqual(board.get_game_status(), 'in_progress')
+            self.assertIs(board.get_legal_moves(), first)
+            self.assertEqual(generate.call_count, 1)
+
+            board.make_move(mv('e2e4'))
+            self.assertEqual(len(board.get_legal_moves()), 20)
+            self.assertEqual(generate.call_count, 2)
+
+            board.undo_move()
+            self.assertEqual(len(board.get_legal_moves()), 20)
+            self.assertEqual(generate.call_count, 3)
+
+    def test_load_from_fen_invalidates_cache(self):
+        """Тест: загрузка FEN сбрасывает закэшированные ходы и статус."""
+        board = Board()
+        self.assertEqual(board.get_game_status(), 'in_progress')
+        board.load_from_fen("7k/6Q1/6K1/8/8/8/8/8 b - - 0 1")
+        self.assertEqual(board.get_legal_moves(), [])
+        self.assertEqual(board.get_game_status(), 'checkmate')
@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+import random
+
+import chess
+
+# Гарантируем, что src в пути
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from Board import Board
+from lib_board_bridge import LibBoardBridge, board_to_fen
+
+
+def play(board: Board, *ucis: str):
+    for uci in ucis:
+        board.make_move(board.move_from_uci(uci))
+
+
+class TestLibBoardBridge(unittest.TestCase):
+
+    def test_moves_are_pushed_onto_startpos(self):
+        """Тест: ходы партии (включая рокировку) идут в стек, корень - начальная позиция."""
+        board = Board()
+        bridge = LibBoardBridge(board)
+        play(board, 'e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1c4', 'g8f6', 'e1g1')
+        lib_board = bridge.sync()
+        self.assertEqual([m.uci() for m in lib_board.move_stack],
+                         ['e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1c4', 'g8f6', 'e1g1'])
+        self.assertEqual(lib_board.root().fen(), chess.STARTING_FEN)
+        self.assertEqual(lib_board.board_fen(), 'r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQ1RK1')
+
+    def test_undo_pops_moves(self):
+        """Тест: отмененные ходы снимаются со стека, новые докладываются."""
+        board = Board()
+        bridge = LibBoardBridge(board)
+        play(board, 'd2d4', 'd7d5', 'c2c4')
+        bridge.sync()
+        board.undo_move()
+        board.undo_move()
+        play(board, 'g8f6')
+        self.assertEqual([m.uci() for m in bridge.sync().move_stack], ['d2d4', 'g8f6'])
+
+    def test_bridge_created_mid_game_keeps_history(self):
+        """Тест: мост, созданный посреди партии, восстанавливает начальную позицию."""
+        board = Board()
+        play(board, 'g1f3', 'g8f6', 'f3g1', 'f6g8', 'g1f3')
+        lib_board = LibBoardBridge(board).sync()
+        self.assertEqual(lib_board.root().fen(), chess.STARTING_FEN)
+        self.assertEqual(len(lib_board.move_stack), 5)
+        self.assertEqual(len(board.history), 5)
+        lib_board.push_uci('g8f6')
+        self.assertTrue(lib_board.can_claim_threefold_repetition() or lib_board.is_repetition(2))
+
+    def test_load_from_fen_rebuilds_root(self):
+        """Тест: после загрузки FEN корнем становится загруженная позиция."""
+        board = Board()
+        bridge = LibBoardBridge(board)
+        play(board, 'e2e4')
+        bridge.sync()
+        fen = '4k3/8/8/8/8/8/4P3/4K3 w - - 0 1'
+        board.load_from_fen(fen)
+        lib_board = bridge.sync()
+        self.assertEqual(lib_board.fen(), fen)
+        self.assertEqual(lib_board.move_stack, [])
+
+    def test_random_games_stay_in_lockstep(self):
+        """Тест: в случайных партиях (обычных и 960, с отменами) позиции совпадают."""
+        rng = random.Random(7)
+        for is_chess960 in (False, True, True, True):
+            board = Board(is_chess960=is_chess960)
+            bridge = LibBoardBridge(board)
+            for _ in range(120):
+                moves = board.get_legal_moves()
+                if not moves:
+                    break
+                if board.history and rng.random() < 0.1:
+                    board.undo_move()
+                else:
+                    board.make_move(rng.choice(moves))
+                lib_board = bridge.sync()
+                self.assertEqual(lib_board.fen(en_passant='fen').split(' ')[:4], board_to_fen(board).split(' ')[:4])
+                self.assertEqual(lib_board.chess960, is_chess960)
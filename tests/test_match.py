@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+import math
+import random
+
+import chess
+
+# Гарантируем, что src и корень проекта (папка engine) в пути
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from Board import Board
+from lib_board_bridge import LibBoardBridge
+from moves import move_to_uci
+from engine.builtin_engine import BuiltinEngine
+from match import (EngineSpec, GameResult, MatchReport, MatchSettings, elo_difference, format_report,
+                   opening_board, play_game, run_match)
+
+FAKE_ENGINE = [sys.executable, os.path.join(os.path.dirname(__file__), 'fake_uci_engine.py')]
+
+
+class TestEngineSpec(unittest.TestCase):
+    def test_parse(self):
+        """Тест: разбор `вид:уровень@секунды` и значения по умолчанию."""
+        self.assertEqual(EngineSpec.parse("stockfish:8@0.25"), EngineSpec("stockfish", 8, 0.25))
+        self.assertEqual(EngineSpec.parse("builtin"), EngineSpec("builtin", 10, 0.1))
+        self.assertEqual(str(EngineSpec.parse("builtin:3@0.5")), "builtin:3@0.5")
+
+    def test_parse_errors(self):
+        """Тест: неизвестный движок и нечисловые параметры отклоняются."""
+        with self.assertRaises(ValueError):
+            EngineSpec.parse("lc0:5@1")
+        with self.assertRaises(ValueError):
+            EngineSpec.parse("stockfish:high@1")
+
+
+class TestEloDifference(unittest.TestCase):
+    def test_even_score(self):
+        """Тест: равный счет - ноль Эло, интервал сужается с ростом числа партий."""
+        elo, margin = elo_difference(10, 10, 20)
+        self.assertAlmostEqual(elo, 0.0)
+        _, wide_margin = elo_difference(1, 1, 2)
+        self.assertLess(margin, wide_margin)
+
+    def test_known_value(self):
+        """Тест: 75% очков - около +191 Эло."""
+        elo, margin = elo_difference(50, 0, 50)
+        self.assertAlmostEqual(elo, 190.85, places=1)
+        self.assertGreater(margin, 0)
+
+    def test_perfect_score(self):
+        """Тест: 100% очков - бесконечная разница."""
+        elo, margin = elo_difference(4, 0, 0)
+        self.assertEqual(elo, math.inf)
+        self.assertEqual(margin, math.inf)
+
+
+class TestMatch(unittest.TestCase):
+    def test_openings_repeat_for_seed(self):
+        """Тест: стартовая позиция пары определяется seed и номером пары."""
+        settings = MatchSettings(EngineSpec.parse("builtin"), EngineSpec.parse("builtin"), seed=3)
+        first, second = opening_board(1, settings), opening_board(1, settings)
+        self.assertEqual(len(first.history), settings.random_plies)
+        self.assertEqual(LibBoardBridge(first).sync().fen(), LibBoardBridge(second).sync().fen())
+        self.assertNotEqual(LibBoardBridge(first).sync().fen(), LibBoardBridge(opening_board(2, settings)).sync().fen())
+
+    def test_chess960_openings(self):
+        """Тест: в 960 стартовая расстановка повторяется для пары и различается между парами."""
+        settings = MatchSettings(EngineSpec.parse("builtin"), EngineSpec.parse("builtin"), chess960=True, random_plies=0)
+        fens = [LibBoardBridge(opening_board(i, settings)).sync().fen() for i in range(6)]
+        self.assertEqual(fens[0], LibBoardBridge(opening_board(0, settings)).sync().fen())
+        self.assertGreater(len(set(fens)), 1)
+
+    def test_chess960_openings_keep_global_random(self):
+        """Тест: расстановка 960 берется из генератора пары - модуль random не пересеивается."""
+        settings = MatchSettings(EngineSpec.parse("builtin"), EngineSpec.parse("builtin"), chess960=True, random_plies=0)
+        state = random.getstate()
+        opening_board(4, settings)
+        self.assertEqual(random.getstate(), state)
+
+    def test_builtin_960_castling_mate(self):
+        """Тест: встроенный движок в 960 ставит мат рокировкой с королем на g1 (ход g1h1, не 'g1g1')."""
+        board = Board(is_chess960=True)
+        board.load_from_fen("4rkr1/4p1p1/8/8/8/8/8/6KR w K - 0 1")
+        engine = BuiltinEngine(skill_level=5, search_time=0.5)
+        self.assertEqual(play_game(board, engine, engine), ("1-0", "checkmate", 1))
+
+    def test_play_game_detects_mate(self):
+        """Тест: мат в один ход доигрывается, результат - победа поставившего мат."""
+        board = Board()
+        board.load_from_fen("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1")
+        engine = BuiltinEngine(skill_level=5, search_time=0.5)
+        result, termination, plies = play_game(board, engine, engine)
+        self.assertEqual((result, termination, plies), ("1-0", "checkmate", 1))
+
+    def test_builtin_960_castling(self):
+        """Тест: встроенный движок восстанавливает ладьи 960 по корню и видит рокировку."""
+        lib_board = chess.Board.from_chess960_pos(0)  # BBQNNRKR
+        for uci in ("e2e4", "e7e5", "e1f3", "e8f6", "f1e1", "f8e8"):
+            lib_board.push_uci(uci)
+        board = BuiltinEngine._board_from_lib(lib_board)
+        castling = [move for move in board.get_legal_moves() if lib_board.is_castling(chess.Move.from_uci(move_to_uci(move, True)))]
+        self.assertEqual([move_to_uci(move, True) for move in castling], ["g1h1"])
+
+    def test_run_match_parallel(self):
+        """Тест: пары партий в отдельных процессах, цвета меняются внутри пары."""
+        settings = MatchSettings(EngineSpec("builtin", 0, 0.01), EngineSpec("stockfish", 1, 0.01),
+                                 games=4, max_plies=8, engine_path=FAKE_ENGINE)
+        results = list(run_match(settings, workers=2))
+        self.assertEqual(len(results), 4)
+        self.assertEqual(sorted((r.opening, r.a_is_white) for r in results),
+                         [(0, False), (0, True), (1, False), (1, True)])
+        report = MatchReport(settings, results, elapsed=1.0)
+        self.assertEqual(report.wins + report.losses + report.draws, 4)
+        self.assertIn("games/min", format_report(report))
+
+    def test_score_from_a_perspective(self):
+        """Тест: очко считается за первого участника независимо от цвета."""
+        self.assertEqual(GameResult(0, False, "0-1", "checkmate", 30).score_a, 1.0)
+        self.assertEqual(GameResult(0, True, "0-1", "checkmate", 30).score_a, 0.0)
+        self.assertEqual(GameResult(0, True, "1/2-1/2", "stalemate", 30).score_a, 0.5)
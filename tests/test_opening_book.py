@@ -0,0 +1,106 @@
+import unittest
+import sys
+import os
+import random
+import struct
+import tempfile
+from collections import Counter
+from unittest.mock import patch
+
+import chess
+import chess.polyglot
+
+# Гарантируем, что src и корень проекта (папка engine) в пути
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from engine.opening_book import OpeningBook
+from engine.analysis_cache import AnalysisCache
+from game_vs_stockfish import GameVsStockfish
+
+AFTER_E4 = chess.Board()
+AFTER_E4.push_uci("e2e4")
+
+
+def write_book(path: str, entries):
+    """Пишет книгу Polyglot: записи (доска, ход UCI, вес), отсортированные по ключу."""
+    records = []
+    for board, uci, weight in entries:
+        move = chess.Move.from_uci(uci)
+        raw = (chess.square_file(move.to_square) | chess.square_rank(move.to_square) << 3
+               | chess.square_file(move.from_square) << 6 | chess.square_rank(move.from_square) << 9)
+        records.append((chess.polyglot.zobrist_hash(board), raw, weight))
+    with open(path, 'wb') as f:
+        for key, raw, weight in sorted(records):
+            f.write(struct.pack(">QHHI", key, raw, weight, 0))
+
+
+class ForbiddenEngine:
+    """Движок-заглушка: ход из книги не должен доходить до движка."""
+    skill_level, search_time = 5, 1.0
+
+    class options:
+        nodes = depth = None
+
+    def __init__(self):
+        self.stopped = False
+
+    def find_best_move(self, board):
+        raise AssertionError("engine called for a book position")
+
+    def stop_pondering(self):
+        self.stopped = True
+
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'book.bin')
+        write_book(self.path, [
+            (chess.Board(), "e2e4", 3), (chess.Board(), "d2d4", 1),
+            (AFTER_E4, "c7c5", 1), (AFTER_E4, "e7e5", 0),
+        ])
+        self.book = OpeningBook(self.path, random.Random(1))
+
+    def tearDown(self):
+        self.book.close()
+        self.tmp.cleanup()
+
+    def test_moves_sorted_by_weight(self):
+        """Тест: ходы позиции из книги по убыванию веса, ходы с весом 0 не предлагаются."""
+        moves = [(entry.move.uci(), entry.weight) for entry in self.book.moves(chess.Board())]
+        self.assertEqual(moves, [("e2e4", 3), ("d2d4", 1)])
+        self.assertEqual([entry.move.uci() for entry in self.book.moves(AFTER_E4)], ["c7c5"])
+
+    def test_weighted_choice_varies(self):
+        """Тест: выбор случайный, частоты следуют весам."""
+        counts = Counter(self.book.choose(chess.Board()).uci() for _ in range(400))
+        self.assertEqual(set(counts), {"e2e4", "d2d4"})
+        self.assertGreater(counts["e2e4"], 2 * counts["d2d4"])
+
+    def test_out_of_book(self):
+        """Тест: позиции нет в книге - None и пустой список."""
+        board = chess.Board()
+        board.push_uci("g1f3")
+        self.assertIsNone(self.book.choose(board))
+        self.assertEqual(self.book.moves(board), [])
+
+    def test_open_missing_or_broken_file(self):
+        """Тест: нет файла или размер не кратен записи - игра идет без книги."""
+        self.assertIsNone(OpeningBook.open(None))
+        self.assertIsNone(OpeningBook.open(os.path.join(self.tmp.name, 'missing.bin')))
+        broken = os.path.join(self.tmp.name, 'broken.bin')
+        with open(broken, 'wb') as f:
+            f.write(b"\x00" * 15)
+        self.assertIsNone(OpeningBook.open(broken))
+
+    def test_ai_turn_uses_book(self):
+        """Тест: в позиции из книги ИИ ходит по книге, не спрашивая движок."""
+        with patch('builtins.print'):
+            game = GameVsStockfish('b', 5, lang='en', analysis_cache=AnalysisCache(), opening_book=self.book)
+            game.engine.close()
+            game.engine = ForbiddenEngine()
+            game._ai_turn()
+        self.assertIn(game._engine_board().peek().uci(), ("e2e4", "d2d4"))
+        self.assertTrue(game.engine.stopped)
@@ -61,4 +61,16 @@ class TestPawn(BasePieceTestCase):
             (2, 4), #Обычный ход вперед на e6
             (2, 3)  #Взятие на проходе на d6
         ]
-        self.assertMovesUnorderedEqual(expected_moves, white_pawn.get_moves(self.board, (3, 4)))
\ No newline at end of file
+        self.assertMovesUnorderedEqual(expected_moves, white_pawn.get_moves(self.board, (3, 4)))
+
+    def test_promotion_undo_restores_same_pawn(self):
+        p = pawn.Pawn(WHITE)
+        p.has_moved = True
+        self.board.set_piece_at((1, 0), p) # a7
+        self.board.make_move(((1, 0), (0, 0)), promotion_piece_class=rook.Rook)
+        self.assertIsInstance(self.board.get_piece_at((0, 0)), rook.Rook)
+        self.board.undo_move()
+        # Отмена не создает новую пешку, а возвращает ту же самую
+        self.assertIs(self.board.get_piece_at((1, 0)), p)
+        self.assertTrue(p.has_moved)
+        self.assertFalse(hasattr(p, '__dict__'))
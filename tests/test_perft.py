@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+
+# Гарантируем, что src в пути
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from Board import Board
+from perft import PERFT_SUITE, board_from_position, divide, perft, run_suite
+from pieces import queen, rook, bishop, knight
+
+PROMOTION_CLASSES = [queen.Queen, rook.Rook, bishop.Bishop, knight.Knight]
+
+# Ограничение, чтобы набор тестов оставался быстрым; полный прогон - run_perft.py
+MAX_TEST_NODES = 20000
+
+
+def mailbox_perft(board: Board, depth: int) -> int:
+    """Perft на прежнем генераторе ходов (объекты фигур), без bulk counting."""
+    if depth == 0:
+        return 1
+    nodes = 0
+    for move in board._get_legal_moves_mailbox():
+        is_promotion = move[1][0] in (0, 7) and board.get_piece_at(move[0]).symbol in 'Pp'
+        for promotion_class in (PROMOTION_CLASSES if is_promotion else [None]):
+            board.make_move(move, promotion_piece_class=promotion_class)
+            nodes += mailbox_perft(board, depth - 1)
+            board.undo_move()
+    return nodes
+
+
+class TestPerft(unittest.TestCase):
+
+    def test_suite_node_counts(self):
+        """Тест: все позиции набора (классика, ловушки, 960) до MAX_TEST_NODES узлов."""
+        output = []
+        self.assertTrue(run_suite(PERFT_SUITE, max_nodes=MAX_TEST_NODES, out=output.append), "\n".join(output))
+
+    def test_bitboards_match_mailbox_generator(self):
+        """Тест: битбордовый генератор совпадает с прежним генератором на объектах фигур."""
+        board = Board()
+        self.assertEqual(perft(board, 3), mailbox_perft(board, 3))
+
+    def test_divide_sums_to_perft(self):
+        """Тест: разбивка по первому ходу в сумме дает perft."""
+        kiwipete = next(p for p in PERFT_SUITE if p.name == "kiwipete")
+        board = board_from_position(kiwipete)
+        result = divide(board, 2)
+        self.assertEqual(len(result), 48)
+        self.assertEqual(sum(result.values()), 2039)
+        self.assertIn("e1g1", result)
+
+    def test_undo_restores_position(self):
+        """Тест: после perft доска возвращается в исходное состояние."""
+        board = Board()
+        before, key = str(board), board.zobrist_key
+        perft(board, 3)
+        self.assertEqual(str(board), before)
+        self.assertEqual(board.zobrist_key, key)
+        self.assertEqual(board.history, [])
@@ -0,0 +1,162 @@
+import unittest
+import sys
+import os
+import io
+import random
+
+import chess
+import chess.pgn
+
+# Гарантируем, что src в пути
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from Board import Board, CastlingRights
+from lib_board_bridge import LibBoardBridge
+from moves import move_to_uci, is_castling
+from pgn import read_games, game_to_pgn, parse_san, move_to_san, board_from_fen, PgnError
+
+ANNOTATED = """% строка-экранирование
+[Event "Annotated"]
+[White "A \\"Quoted\\" Player"]
+[Result "1-0"]
+
+1. e4 {открытие
+на несколько строк} e5 $1 2. Nf3 (2. f4 exf4 (2... d5) 3. Nf3) Nc6 ; комментарий до конца строки
+3. Bb5!? a6 4. Ba4 Nf6 5. O-O Be7 1-0
+
+[Event "Broken"]
+[Result "*"]
+
+1. e4 e5 2. Ke3 Nc6 *
+
+[Event "No result"]
+
+1. d4 d5
+[Event "Last"]
+
+1. c4 *
+"""
+
+
+def play(board: Board, *ucis: str):
+    for uci in ucis:
+        board.make_move(board.move_from_uci(uci))
+
+
+class TestSan(unittest.TestCase):
+    def test_disambiguation_and_special_moves(self):
+        """Тест: уточнение по вертикали и горизонтали, превращения, взятие на проходе и рокировки."""
+        board = board_from_fen("r3k2r/1P6/8/3pP3/8/8/8/R3K2R w KQkq d6 0 1")
+        self.assertEqual(move_to_uci(parse_san(board, "Rad1")), "a1d1")
+        self.assertEqual(move_to_uci(parse_san(board, "exd6")), "e5d6")
+        self.assertEqual(move_to_uci(parse_san(board, "bxa8=N+")), "b7a8n")
+        self.assertEqual(move_to_uci(parse_san(board, "b8Q")), "b7b8q")
+        self.assertEqual(move_to_uci(parse_san(board, "O-O")), "e1g1")
+        self.assertEqual(move_to_uci(parse_san(board, "0-0-0")), "e1c1")
+
+        board = board_from_fen("4k3/8/8/8/8/8/4K3/R6R w - - 0 1")
+        self.assertEqual(move_to_uci(parse_san(board, "Rhd1")), "h1d1")
+        self.assertEqual(move_to_san(board, parse_san(board, "Rad1")), "Rad1")
+        board = board_from_fen("4k3/8/8/R7/8/8/8/R3K3 w - - 0 1")
+        self.assertEqual(move_to_uci(parse_san(board, "R1a3")), "a1a3")
+        self.assertEqual(move_to_san(board, parse_san(board, "R5a3")), "R5a3")
+
+    def test_bad_san_raises(self):
+        """Тест: нелегальный, неоднозначный и не-SAN ход - PgnError."""
+        board = board_from_fen("4k3/8/8/8/8/8/4K3/R6R w - - 0 1")
+        for san in ("Rd1", "Ke3x", "O-O-O", "Nf3", "e4=Q"):
+            with self.assertRaises(PgnError, msg=san):
+                parse_san(board, san)
+
+    def test_san_matches_python_chess(self):
+        """Тест: SAN и разбор SAN совпадают с python-chess в случайных партиях (обычных и 960)."""
+        rng = random.Random(4)
+        for is_chess960 in (False, False, True, True):
+            board = Board(is_chess960=is_chess960)
+            bridge = LibBoardBridge(board)
+            for _ in range(150):
+                moves = board.get_legal_moves()
+                if not moves:
+                    break
+                lib_board = bridge.sync()
+                move = rng.choice(moves)
+                san = lib_board.san(chess.Move.from_uci(move_to_uci(move, is_chess960)))
+                self.assertEqual(parse_san(board, san), move, san)
+                self.assertEqual(move_to_san(board, move), san.rstrip("+#"))
+                board.make_move(move)
+
+
+class TestReadGames(unittest.TestCase):
+    def test_comments_variations_and_errors(self):
+        """Тест: комментарии, варианты и NAG пропускаются; ошибка в партии не мешает следующим."""
+        games = list(read_games(io.StringIO(ANNOTATED)))
+        self.assertEqual([game.headers["Event"] for game in games], ["Annotated", "Broken", "No result", "Last"])
+        first = games[0]
+        self.assertEqual(first.headers["White"], 'A "Quoted" Player')
+        self.assertIsNone(first.error)
+        self.assertEqual(len(first.moves), 10)
+        self.assertTrue(is_castling(first.moves[8]))
+        self.assertEqual(len(games[1].moves), 2)
+        self.assertIn("Ke3", games[1].error)
+        self.assertEqual(len(games[2].moves), 2)
+        self.assertEqual(len(games[3].moves), 1)
+
+    def test_reads_lazily(self):
+        """Тест: генератор отдает партию, не дочитывая файл дальше нее."""
+        consumed = []
+
+        def lines():
+            for line in io.StringIO(ANNOTATED * 1000):
+                consumed.append(line)
+                yield line
+
+        games = read_games(lines())
+        next(games)
+        self.assertLess(len(consumed), 20)
+
+    def test_chess960_fen_castling(self):
+        """Тест: FEN партии 960 в Shredder-FEN и X-FEN дает те же права на рокировку и вертикали ладей."""
+        for castling in ("HFhf", "KQkq"):
+            pgn = ('[Variant "Chess960"]\n[SetUp "1"]\n'
+                   f'[FEN "bqnb1rkr/pp3ppp/3ppn2/2p5/5P2/P2P4/NPP1P1PP/BQ1BNRKR w {castling} - 2 9"]\n\n'
+                   '9. g3 Ng4 *\n')
+            game = next(read_games(io.StringIO(pgn)))
+            self.assertIsNone(game.error, castling)
+            board = game.board()
+            self.assertEqual(board.initial_rook_files, {'w': [5, 7], 'b': [5, 7]})
+            self.assertEqual(board.castling_rights, CastlingRights.ALL)
+
+
+class TestWriteGame(unittest.TestCase):
+    def test_round_trip(self):
+        """Тест: записанная партия читается обратно (нашим чтением и python-chess) с теми же ходами."""
+        rng = random.Random(9)
+        for is_chess960 in (False, True):
+            board = Board(is_chess960=is_chess960)
+            for _ in range(120):
+                moves = board.get_legal_moves()
+                if not moves or board.get_game_status() != 'in_progress':
+                    break
+                board.make_move(rng.choice(moves))
+            text = game_to_pgn(board, {"Event": "Round trip", "White": "A"})
+            game = next(read_games(io.StringIO(text)))
+            self.assertIsNone(game.error)
+            self.assertEqual(game.moves, [record.move for record in board.history])
+            self.assertEqual(game.headers["White"], "A")
+            self.assertFalse(chess.pgn.read_game(io.StringIO(text)).errors)
+            self.assertTrue(all(len(line) <= 80 for line in text.splitlines()))
+
+    def test_result_and_start_position(self):
+        """Тест: результат берется из статуса доски; нестандартное начало пишется тегами SetUp/FEN."""
+        board = Board()
+        play(board, "f2f3", "e7e5", "g2g4", "d8h4")
+        text = game_to_pgn(board)
+        self.assertIn('[Result "0-1"]', text)
+        self.assertTrue(text.rstrip().endswith("2. g4 Qh4# 0-1"))
+        self.assertNotIn("FEN", text)
+
+        board = board_from_fen("4k3/8/8/8/8/8/4P3/4K3 b - - 0 40")
+        play(board, "e8d7")
+        text = game_to_pgn(board)
+        self.assertIn('[FEN "4k3/8/8/8/8/8/4P3/4K3 b - - 0 40"]', text)
+        self.assertIn("40... Kd7 *", text)
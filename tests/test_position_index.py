@@ -0,0 +1,150 @@
+import unittest
+import sys
+import os
+import io
+import tempfile
+from unittest import mock
+
+# Гарантируем, что src в пути
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from Board import Board, WHITE, BLACK
+import game_library
+from game_library import GameLibrary
+from pgn import split_games
+
+INFO = {"game_type": "GameWithHints", "player_color": "w", "skill_level": 5, "lang": "en",
+        "white": "Player", "black": "Stockfish (level 5)"}
+
+PGN = """[Event "A"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 1-0
+
+[Event "B"]
+[Result "1/2-1/2"]
+
+1. e4 c5 {Сицилианская; [Event "не тег"]} 2. Nf3 d6 1/2-1/2
+
+[Event "C"]
+[Result "0-1"]
+
+1. d4 d5 0-1
+
+[Event "D"]
+[Result "*"]
+
+1. e4 e5 *
+
+[Event "E"]
+[Result "1-0"]
+
+1. Nf3 Nf6 2. Ng1 Ng8 3. e4 1-0
+"""
+
+
+def play(board: Board, *ucis: str):
+    for uci in ucis:
+        board.make_move(board.move_from_uci(uci))
+
+
+class TestPositionIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'games.sqlite3')
+        self.library = GameLibrary(self.path)
+
+    def tearDown(self):
+        self.library.close()
+        self.tmp.cleanup()
+
+    def test_stats_after_import(self):
+        """Тест: после импорта позиция знает число партий, результаты и ходы; партия без результата не учитывается."""
+        self.assertEqual(self.library.import_pgn(io.StringIO(PGN)), 5)
+        board = Board()
+        stats = self.library.positions.stats(board)
+        self.assertEqual(stats.total.games, 4)
+        self.assertEqual((stats.total.white, stats.total.draws, stats.total.black), (2, 1, 1))
+        e4 = board.move_from_uci("e2e4")
+        self.assertEqual(stats.moves[0].move, e4)
+        self.assertEqual(stats.moves[0].stats.games, 2)
+        self.assertAlmostEqual(stats.moves[0].stats.score(WHITE), 0.75)
+
+        play(board, "e2e4")
+        stats = self.library.positions.stats(board)
+        self.assertEqual(stats.total.games, 3)  # и партия E через перестановку ходов
+        self.assertEqual({entry.move: entry.stats.games for entry in stats.moves},
+                         {board.move_from_uci("e7e5"): 1, board.move_from_uci("c7c5"): 1})
+        self.assertAlmostEqual(stats.total.score(BLACK), 1 / 6)
+
+        play(board, "e7e5", "g1f3", "b8c6")
+        stats = self.library.positions.stats(board)
+        self.assertEqual(stats.total.games, 1)
+        self.assertEqual(stats.moves, [])  # позиция в конце партии
+
+    def test_repetition_counted_once(self):
+        """Тест: позиция, повторенная в партии, считается один раз с первым сделанным из нее ходом."""
+        self.library.import_pgn(io.StringIO(PGN))
+        board = Board()
+        stats = self.library.positions.stats(board)
+        nf3 = board.move_from_uci("g1f3")
+        self.assertEqual([entry.stats.games for entry in stats.moves if entry.move == nf3], [1])
+        self.assertEqual(sum(entry.stats.games for entry in stats.moves), stats.total.games)
+
+    def test_finished_game_is_indexed(self):
+        """Тест: партия приложения попадает в индекс, когда закончена; удаление убирает ее позиции."""
+        board = Board()
+        record = self.library.start_game(board, INFO)
+        play(board, "f2f3", "e7e5", "g2g4")
+        record.sync(board)
+        self.assertEqual(self.library.positions.stats(Board()).total.games, 0)
+        play(board, "d8h4")
+        record.finish(board)
+        stats = self.library.positions.stats(board)
+        self.assertEqual((stats.total.games, stats.total.black), (1, 1))
+        self.assertEqual(self.library.positions.game_ids(Board()), [record.game_id])
+
+        self.library.delete(record.game_id)
+        self.assertEqual(self.library.positions.game_ids(Board()), [])
+
+    def test_game_ids(self):
+        """Тест: ID партий с позицией - последние добавленные первыми, с ограничением числа."""
+        self.library.import_pgn(io.StringIO(PGN))
+        board = Board()
+        play(board, "e2e4")
+        ids = self.library.positions.game_ids(board)
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertEqual(self.library.positions.game_ids(board, limit=1), ids[:1])
+
+    def test_parallel_import_matches_serial(self):
+        """Тест: импорт в нескольких процессах дает те же партии и позиции в том же порядке."""
+        self.library.import_pgn(io.StringIO(PGN * 3), workers=1)
+        other = GameLibrary(os.path.join(self.tmp.name, 'parallel.sqlite3'))
+        try:
+            # Маленькие пачки, чтобы заданий было больше, чем процессов
+            with mock.patch.object(game_library, "IMPORT_BATCH_GAMES", 2):
+                self.assertEqual(other.import_pgn(io.StringIO(PGN * 3), workers=2), 15)
+            query = "SELECT key, game_id, ply, move, score FROM positions ORDER BY key, game_id"
+            self.assertEqual(other._db.execute(query).fetchall(), self.library._db.execute(query).fetchall())
+            self.assertEqual([g.white for g in other.list_games(limit=20)],
+                             [g.white for g in self.library.list_games(limit=20)])
+        finally:
+            other.close()
+
+    def test_index_rebuilt_for_existing_library(self):
+        """Тест: в библиотеке без таблицы позиций индекс строится из законченных партий при открытии."""
+        self.library.import_pgn(io.StringIO(PGN))
+        self.library._db.execute("DROP TABLE positions")
+        self.library.close()
+        self.library = GameLibrary(self.path)
+        self.assertEqual(self.library.positions.stats(Board()).total.games, 4)
+
+
+class TestSplitGames(unittest.TestCase):
+    def test_split_keeps_comments_with_brackets(self):
+        """Тест: текст делится по партиям; '[' внутри комментария не начинает новую партию."""
+        games = list(split_games(io.StringIO(PGN)))
+        self.assertEqual(len(games), 5)
+        self.assertIn("Сицилианская", games[1])
+        self.assertTrue(all(game.startswith('[Event') for game in games))
@@ -0,0 +1,162 @@
+import unittest
+import sys
+import os
+import io
+import re
+from unittest.mock import patch
+
+# Гарантируем, что src в пути
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from Board import Board
+from game_with_hints import GameWithHints
+from localization import LocalizationManager
+from renderer import TerminalRenderer
+
+ESCAPE = re.compile(r"\033\[([0-9;]*)([A-Za-z])")
+
+
+class VirtualTerminal:
+    """Экран-заглушка: понимает адресацию курсора, очистку экрана и строк; цвета (SGR) отбрасывает."""
+    def __init__(self):
+        self.lines = {}
+        self.row, self.col = 1, 1
+
+    def feed(self, data: str):
+        pos = 0
+        while pos < len(data):
+            match = ESCAPE.match(data, pos)
+            if match:
+                self._control(match.group(1), match.group(2))
+                pos = match.end()
+                continue
+            char = data[pos]
+            if char == "\n":
+                self.row, self.col = self.row + 1, 1
+            else:
+                line = self.lines.setdefault(self.row, {})
+                line[self.col] = char
+                self.col += 1
+            pos += 1
+
+    def _control(self, params: str, command: str):
+        if command == "H":
+            row, _, col = params.partition(";")
+            self.row, self.col = int(row or 1), int(col or 1)
+        elif command == "J":
+            if params == "2":
+                self.lines.clear()
+            else:
+                self._clear_line_end()
+                for row in [r for r in self.lines if r > self.row]:
+                    del self.lines[row]
+        elif command == "K":
+            self._clear_line_end()
+
+    def _clear_line_end(self):
+        line = self.lines.get(self.row, {})
+        for col in [c for c in line if c >= self.col]:
+            del line[col]
+
+    def text(self) -> str:
+        rows = []
+        for row in range(1, max((r for r, line in self.lines.items() if line), default=0) + 1):
+            line = self.lines.get(row, {})
+            rows.append("".join(line.get(col, " ") for col in range(1, max(line, default=0) + 1)))
+        return "\n".join(rows)
+
+
+class TestRenderer(unittest.TestCase):
+    def setUp(self):
+        self.out = io.StringIO()
+        self.config = {'flip_board': False, 'piece_set': 'unicode', 'highlighting': True}
+        self.renderer = TerminalRenderer(self.config, LocalizationManager(lang='en'), out=self.out)
+        self.board = Board()
+
+    def render(self, last_move=None) -> str:
+        self.out.seek(0)
+        self.out.truncate()
+        self.renderer.draw_board(self.board, last_move)
+        return self.out.getvalue()
+
+    def full_screen(self, last_move=None) -> str:
+        """Тот же кадр, нарисованный целиком на чистом экране."""
+        out = io.StringIO()
+        TerminalRenderer(self.config, LocalizationManager(lang='en'), out=out).draw_board(self.board, last_move)
+        screen = VirtualTerminal()
+        screen.feed(out.getvalue())
+        return screen.text()
+
+    def test_first_frame_clears_screen(self):
+        """Тест: первый кадр рисуется целиком на очищенном экране, одной записью."""
+        frame = self.render()
+        self.assertTrue(frame.startswith("\033[H\033[2J"))
+        self.assertIn("♜ ♞ ♝ ♛ ♚ ♝ ♞ ♜", frame)
+
+    def test_next_frame_repaints_only_changes(self):
+        """Тест: после хода перерисовываются только изменившиеся клетки и строка статуса."""
+        screen = VirtualTerminal()
+        full = self.render()
+        screen.feed(full)
+        move = self.board.move_from_uci("e2e4")
+        self.board.make_move(move)
+        diff = self.render(move)
+        screen.feed(diff)
+        self.assertNotIn("\033[2J", diff)
+        self.assertLess(len(diff), len(full) / 3)
+        self.assertEqual(screen.text(), self.full_screen(move))
+
+    def test_diff_handles_flip_and_status_changes(self):
+        """Тест: переворот доски и шах (строка статуса добавляется и исчезает) отрисовываются верно."""
+        self.config['flip_board'] = True
+        screen = VirtualTerminal()
+        screen.feed(self.render())
+        for uci in ("e2e4", "f7f6", "d1h5", "g7g6"):
+            move = self.board.move_from_uci(uci)
+            self.board.make_move(move)
+            screen.feed(self.render(move))
+            self.assertEqual(screen.text(), self.full_screen(move), uci)
+
+    def test_unchanged_frame_writes_almost_nothing(self):
+        """Тест: повторная отрисовка той же позиции - только очистка ниже доски."""
+        self.render()
+        frame = self.render()
+        self.assertNotIn("♜", frame)
+        self.assertTrue(frame.endswith("\033[J"))
+
+    def test_invalidate_forces_full_frame(self):
+        """Тест: после invalidate() кадр снова рисуется целиком."""
+        self.render()
+        self.renderer.invalidate()
+        self.assertTrue(self.render().startswith("\033[H\033[2J"))
+
+
+class TestGameMessages(unittest.TestCase):
+    def setUp(self):
+        with patch('builtins.print'), patch('game_vs_stockfish.StockfishEngine', side_effect=FileNotFoundError):
+            self.game = GameWithHints('w', 1, lang='en')
+        self.game.renderer.out = io.StringIO()
+
+    def test_messages_force_full_frame(self):
+        """Тест: после сообщений об ошибке ввода, нелегальном ходе и отмене следующий кадр рисуется целиком."""
+        for inputs in (["e2"], ["e2e5"], [self.game.localizer.get("command_undo")]):
+            self.game.renderer.draw_board(self.game.board)
+            with patch('builtins.print'), patch('builtins.input', side_effect=inputs + ["e2e4"]):
+                self.game._player_turn()
+            self.assertIsNone(self.game.renderer._frame, inputs)
+            if self.game.board.history:
+                self.game.board.undo_move()
+
+    def test_ai_move_repaints_only_changes(self):
+        """Тест: кадр после хода ИИ (и строки "думаю") - перерисовка изменений, без очистки экрана."""
+        renderer = self.game.renderer
+        self.game.engine.search_time = 0.05
+        move = self.game.board.move_from_uci("e2e4")
+        self.game.board.make_move(move)
+        renderer.draw_board(self.game.board, move)
+        with patch('builtins.print'):
+            self.game._ai_turn()
+        renderer.out = io.StringIO()
+        renderer.draw_board(self.game.board, self.game.last_move)
+        self.assertNotIn("\033[H\033[2J", renderer.out.getvalue())
+        self.assertTrue(renderer.out.getvalue().endswith("\033[J"))
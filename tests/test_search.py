@@ -0,0 +1,154 @@
+import unittest
+import sys
+import os
+
+import chess
+import chess.engine
+
+# Гарантируем, что src и корень проекта (папка engine) в пути
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from Board import Board
+from moves import move_to_uci
+from search import Searcher, TimeManager, evaluate, MATE_SCORE
+from engine.builtin_engine import BuiltinEngine
+
+
+def board_from_fen(fen: str) -> Board:
+    board = Board()
+    board.load_from_fen(fen)
+    return board
+
+
+class TestSearch(unittest.TestCase):
+
+    def test_finds_mate_in_one(self):
+        """Тест: находит мат в один ход (мат по последней горизонтали)."""
+        board = board_from_fen("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        result = Searcher().search(board, max_depth=3)
+        self.assertEqual(move_to_uci(result.best_move), 'd1d8')
+        self.assertEqual(result.score, MATE_SCORE - 1)
+        self.assertTrue(result.is_mate)
+
+    def test_wins_hanging_queen(self):
+        """Тест: забирает незащищенного ферзя."""
+        board = board_from_fen("4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1")
+        result = Searcher().search(board, max_depth=2)
+        self.assertEqual(move_to_uci(result.best_move), 'd2d5')
+
+    def test_quiescence_sees_recapture(self):
+        """Тест: не берет защищенную пешку ферзем."""
+        board = board_from_fen("4k3/8/2p5/3p4/8/8/3Q4/4K3 w - - 0 1")
+        result = Searcher().search(board, max_depth=1)
+        self.assertNotEqual(move_to_uci(result.best_move), 'd2d5')
+
+    def test_board_restored_after_search(self):
+        """Тест: после поиска доска и история позиций не меняются."""
+        board = Board()
+        before, key, history = str(board), board.zobrist_key, dict(board.position_history)
+        Searcher().search(board, max_depth=3)
+        self.assertEqual(str(board), before)
+        self.assertEqual(board.zobrist_key, key)
+        self.assertEqual(dict(board.position_history), history)
+
+    def test_node_limit_and_stats(self):
+        """Тест: лимит узлов останавливает поиск, а ход все равно возвращается."""
+        board = Board()
+        result = Searcher().search(board, max_depth=20, max_nodes=3000)
+        self.assertIn(result.best_move, board.get_legal_moves())
+        self.assertLess(result.depth, 20)
+        self.assertGreaterEqual(result.nodes, 3000)
+        self.assertGreater(result.nps, 0)
+
+    def test_transposition_table_reused(self):
+        """Тест: повторный поиск той же позиции берет результаты из таблицы транспозиций."""
+        board = board_from_fen("r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4")
+        searcher = Searcher()
+        first = searcher.search(board, max_depth=3)
+        second = searcher.search(board, max_depth=3)
+        self.assertLess(second.nodes, first.nodes)
+        self.assertGreater(searcher.tt.hits, 0)
+
+    def test_no_moves_returns_none(self):
+        """Тест: в позиции мата ходить нечем."""
+        board = board_from_fen("7k/6Q1/6K1/8/8/8/8/8 b - - 0 1")
+        self.assertIsNone(Searcher().search(board, max_depth=3).best_move)
+
+    def test_evaluation_is_symmetric(self):
+        """Тест: в начальной позиции оценка равна нулю для обеих сторон."""
+        board = Board()
+        self.assertEqual(evaluate(board), 0)
+        board.make_move(board.move_from_uci('e2e4'))
+        self.assertLess(evaluate(board), 0)  # ход черных, у белых лучше позиция
+
+
+class TestTimeManager(unittest.TestCase):
+
+    def test_move_time_limits(self):
+        """Тест: при фиксированном времени новая итерация не начинается после половины."""
+        manager = TimeManager(move_time=2.0)
+        self.assertEqual((manager.soft_limit, manager.hard_limit), (1.0, 2.0))
+        self.assertTrue(manager.can_start_iteration())
+        self.assertFalse(manager.is_time_up())
+
+    def test_clock_budget(self):
+        """Тест: при игре на часах берется доля остатка, но не больше половины."""
+        manager = TimeManager(remaining=60.0, increment=1.0, moves_to_go=30)
+        self.assertAlmostEqual(manager.soft_limit, 2.8)
+        self.assertLessEqual(manager.hard_limit, 30.0)
+
+
+class TestBuiltinEngine(unittest.TestCase):
+
+    def test_engine_interface(self):
+        """Тест: встроенный движок отвечает так же, как StockfishEngine (chess.Move)."""
+        engine = BuiltinEngine(skill_level=2, search_time=1.0)
+        move = engine.find_best_move_from_fen("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        self.assertEqual(move.uci(), 'd1d8')
+        self.assertGreater(engine.nodes_per_second, 0)
+        engine.close()
+
+
+    def test_chess960_castling_move(self):
+        """Тест: в 960 рокировка возвращается ходом короля на свою ладью (король на g1, длинная рокировка с b1)."""
+        for fen, san in (("4rkr1/4p1p1/8/8/8/8/8/6KR w K - 0 1", "O-O#"),
+                         ("2rkr3/2p1p3/8/8/8/8/8/RK6 w Q - 0 1", "O-O-O#")):
+            lib_board = chess.Board(fen, chess960=True)
+            move = BuiltinEngine(skill_level=6, search_time=1.0).find_best_move(lib_board)
+            self.assertEqual(lib_board.san(move), san)
+            move = BuiltinEngine(skill_level=6, search_time=1.0).find_best_move_from_fen(fen, chess960=True)
+            self.assertEqual(lib_board.san(move), san)
+            line = BuiltinEngine().analyse(lib_board, depth=3)
+            self.assertEqual(lib_board.san(line.pv[0]), san)
+            updates = list(BuiltinEngine().start_analysis(lib_board, depth=3))
+            self.assertEqual(lib_board.san(updates[-1][0].pv[0]), san)
+
+    def test_repetition_seen_through_move_stack(self):
+        """Тест: ходы партии переигрываются - поиск видит повторение позиции."""
+        engine = BuiltinEngine(skill_level=4, search_time=1.0)
+        lib_board = chess.Board()
+        for uci in ['g1f3', 'g8f6', 'f3g1', 'f6g8']:
+            lib_board.push_uci(uci)
+        board = engine._board_from_lib(lib_board)
+        self.assertEqual(board.position_history[board.zobrist_key], 2)
+
+    def test_streaming_analysis(self):
+        """Тест: анализ выдает линию после каждой итерации, мат - как chess.engine.Mate."""
+        engine = BuiltinEngine()
+        lib_board = chess.Board("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        updates = list(engine.start_analysis(lib_board, multipv=3, depth=3))
+        self.assertEqual([lines[0].depth for lines in updates], [1])  # мат найден - дальше не ищет
+        line = updates[-1][0]
+        self.assertEqual(line.pv[0].uci(), 'd1d8')
+        self.assertEqual(line.score, chess.engine.Mate(1))
+
+    def test_streaming_analysis_stops_on_request(self):
+        """Тест: анализ без лимитов останавливается по запросу."""
+        engine = BuiltinEngine()
+        analysis = engine.start_analysis(chess.Board())
+        for lines in analysis:
+            if lines[0].depth >= 2:
+                analysis.stop()
+        self.assertGreaterEqual(lines[0].depth, 2)
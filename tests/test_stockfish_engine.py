@@ -0,0 +1,97 @@
+import unittest
+import sys
+import os
+import time
+
+import chess
+
+# Гарантируем, что src и корень проекта (папка engine) в пути
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from engine.stockfish_engine import StockfishEngine
+from engine.engine_options import EngineOptions
+
+# Вместо Stockfish - простой UCI-движок на python-chess (см. fake_uci_engine.py)
+FAKE_ENGINE = [sys.executable, os.path.join(os.path.dirname(__file__), 'fake_uci_engine.py')]
+
+
+class TestStockfishEnginePondering(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = StockfishEngine(search_time=0.2, engine_path=FAKE_ENGINE)
+
+    def tearDown(self):
+        self.engine.close()
+
+    def test_ponderhit_answers_from_running_search(self):
+        """Тест: если игрок сыграл ожидаемый ход, ответ берется из обдумывания."""
+        board = chess.Board()
+        move = self.engine.find_best_move_from_fen(board.fen())
+        board.push(move)
+        board.push_uci('a7a5')  # ponder-ход фейкового движка
+        time.sleep(0.3)  # игрок думает дольше, чем время на ход
+        started = time.perf_counter()
+        reply = self.engine.find_best_move_from_fen(board.fen())
+        self.assertLess(time.perf_counter() - started, 0.15)
+        self.assertEqual(self.engine.ponderhits, 1)
+        self.assertIn(reply, board.legal_moves)
+
+    def test_ponder_miss_searches_again(self):
+        """Тест: при другом ходе игрока обдумывание сбрасывается и поиск идет заново."""
+        board = chess.Board()
+        board.push(self.engine.find_best_move_from_fen(board.fen()))
+        board.push_uci('h7h6')
+        reply = self.engine.find_best_move_from_fen(board.fen())
+        self.assertEqual(self.engine.ponderhits, 0)
+        self.assertIn(reply, board.legal_moves)
+
+    def test_crashed_engine_restarts(self):
+        """Тест: после падения процесса движок перезапускается и отвечает."""
+        self.engine.stop_pondering()
+        self.engine.engine.transport.kill()
+        time.sleep(0.2)
+        self.assertFalse(self.engine.is_alive())
+        move = self.engine.find_best_move_from_fen(chess.STARTING_FEN)
+        self.assertEqual(move.uci(), 'a2a3')
+        self.assertTrue(self.engine.is_alive())
+
+    def test_streaming_multipv_analysis(self):
+        """Тест: анализ выдает полный набор линий на каждой глубине до лимита."""
+        updates = list(self.engine.start_analysis(chess.Board(), multipv=3, depth=3))
+        self.assertEqual(updates[-1][0].depth, 3)
+        self.assertEqual([line.pv[0].uci() for line in updates[-1]], ['a2a3', 'a2a4', 'b1a3'])
+        self.assertEqual(updates[-1][1].score, chess.engine.Cp(-10))
+
+    def test_infinite_analysis_stops_on_request(self):
+        """Тест: анализ без лимитов идет, пока его не остановят."""
+        analysis = self.engine.start_analysis(chess.Board(), multipv=2)
+        for lines in analysis:
+            analysis.stop()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(self.engine.is_alive())
+
+
+class TestStockfishEngineOptions(unittest.TestCase):
+
+    def test_resources_sent_to_engine(self):
+        """Тест: потоки и хэш передаются движку, неизвестные ему опции пропускаются."""
+        engine = StockfishEngine(engine_path=FAKE_ENGINE, options=EngineOptions(threads=3, move_overhead=50))
+        try:
+            config = engine.engine.protocol.config
+            self.assertEqual((config["Threads"], config["Hash"]), (3, 3 * 64))
+            self.assertNotIn("Move Overhead", config)  # у фейкового движка такой опции нет
+            engine.configure(5, 1.0, EngineOptions(threads=1, hash_mb=32))
+            self.assertEqual((config["Threads"], config["Hash"]), (1, 32))
+        finally:
+            engine.close()
+
+    def test_depth_limit_replaces_move_time(self):
+        """Тест: предел по глубине заменяет время на ход."""
+        engine = StockfishEngine(engine_path=FAKE_ENGINE, ponder=False, options=EngineOptions(depth=7))
+        try:
+            self.assertEqual(engine._limit(), chess.engine.Limit(depth=7))
+            self.assertEqual(engine.find_best_move(chess.Board()).uci(), 'a2a3')
+        finally:
+            engine.close()
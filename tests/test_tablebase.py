@@ -0,0 +1,107 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+
+import chess
+
+# Гарантируем, что src и корень проекта (папка engine) в пути
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from Board import Board
+from engine.tablebase import Tablebase, TablebaseResult
+from engine.analysis_cache import AnalysisCache
+from engine.engine_options import EngineOptions
+from game_vs_stockfish import GameVsStockfish
+from match import play_game
+
+KQK = "8/8/8/4k3/8/8/8/KQ6 w - - 0 1"
+
+
+class ScriptedTables:
+    """
+    Таблицы-заглушка: результат позиции задан по FEN (без счетчиков ходов),
+    остальные позиции - `default`. Мат - проигрыш с DTZ 0, как в Syzygy.
+    """
+    def __init__(self, results: dict, default=(-2, -20)):
+        self.results = results
+        self.default = default
+
+    def _result(self, board: chess.Board):
+        if board.is_checkmate():
+            return -2, 0
+        return self.results.get(board.epd(), self.default)
+
+    def probe_wdl(self, board):
+        return self._result(board)[0]
+
+    def probe_dtz(self, board):
+        return self._result(board)[1]
+
+    def close(self):
+        pass
+
+
+def after(fen: str, uci: str) -> str:
+    board = chess.Board(fen)
+    board.push_uci(uci)
+    return board.epd()
+
+
+class TestTablebase(unittest.TestCase):
+    def test_probe_limits(self):
+        """Тест: позиции с лишними фигурами или правом рокировки в таблицах не ищутся."""
+        tablebase = Tablebase(ScriptedTables({}, default=(2, 5)), max_pieces=3)
+        self.assertEqual(tablebase.probe(chess.Board(KQK)), TablebaseResult(2, 5))
+        self.assertIsNone(tablebase.probe(chess.Board()))
+        self.assertIsNone(tablebase.probe(chess.Board("4k3/8/8/8/8/8/8/4K2R w K - 0 1")))
+
+    def test_open_without_tables(self):
+        """Тест: нет папки или в ней нет таблиц - таблицы отключены."""
+        self.assertIsNone(Tablebase.open(None))
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertIsNone(Tablebase.open(tmp))
+            self.assertIsNone(Tablebase.open(os.path.join(tmp, 'missing')))
+
+    def test_winning_side_takes_shortest_win(self):
+        """Тест: при выигрыше выбирается ход с кратчайшим DTZ, ходы в ничью отбрасываются."""
+        tables = ScriptedTables({after(KQK, "b1b4"): (-2, -3), after(KQK, "b1b8"): (0, 0)})
+        self.assertEqual(Tablebase(tables, 5).best_move(chess.Board(KQK)), chess.Move.from_uci("b1b4"))
+
+    def test_mate_preferred(self):
+        """Тест: мат в один ход выбирается раньше любого DTZ."""
+        fen = "7k/8/6K1/8/8/8/8/Q7 w - - 0 1"
+        tables = ScriptedTables({after(fen, "a1a2"): (-2, -1)})
+        self.assertEqual(Tablebase(tables, 5).best_move(chess.Board(fen)), chess.Move.from_uci("a1a8"))
+
+    def test_losing_side_resists_longest(self):
+        """Тест: при проигрыше выбирается самое долгое сопротивление."""
+        fen = "8/8/8/4k3/8/8/8/KQ6 b - - 0 1"
+        tables = ScriptedTables({after(fen, "e5d4"): (2, 30)}, default=(2, 7))
+        self.assertEqual(Tablebase(tables, 5).best_move(chess.Board(fen)), chess.Move.from_uci("e5d4"))
+
+    def test_ai_turn_plays_tablebase_move(self):
+        """Тест: в позиции из таблиц ИИ ходит без движка."""
+        tables = ScriptedTables({after(KQK, "b1b4"): (-2, -3)})
+        with patch('builtins.print'):
+            game = GameVsStockfish('b', 5, lang='en', analysis_cache=AnalysisCache(), tablebase=Tablebase(tables, 5))
+            game.board.load_from_fen(KQK)
+            game.engine.configure(5, 30.0)  # движок думал бы долго - ход должен быть мгновенным
+            game._ai_turn()
+            game.close_engine()
+        self.assertEqual(game._engine_board().peek().uci(), "b1b4")
+
+    def test_match_adjudication(self):
+        """Тест: матч присуждает победу по таблицам, не доигрывая эндшпиль."""
+        board = Board()
+        board.load_from_fen("8/8/8/4k3/8/8/8/KQ6 b - - 0 1")
+        tablebase = Tablebase(ScriptedTables({}, default=(-2, -9)), 5)
+        self.assertEqual(play_game(board, None, None, tablebase=tablebase), ("1-0", "tablebase", 0))
+
+    def test_syzygy_path_in_uci_options(self):
+        """Тест: папка таблиц передается Stockfish опцией SyzygyPath."""
+        self.assertEqual(EngineOptions(threads=1, hash_mb=16, syzygy_path="/tb").uci_options()["SyzygyPath"], "/tb")
+        self.assertNotIn("SyzygyPath", EngineOptions(threads=1, hash_mb=16).uci_options())
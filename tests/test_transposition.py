@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+
+# Гарантируем, что src в пути
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from transposition import TranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER
+
+
+class TestTranspositionTable(unittest.TestCase):
+
+    def test_store_and_probe(self):
+        """Тест: сохраненная запись читается без потерь, в том числе отрицательная оценка."""
+        tt = TranspositionTable(1)
+        tt.store(0x1234ABCD, depth=7, bound=BOUND_UPPER, score=-99990, move=0xBEEF)
+        entry = tt.probe(0x1234ABCD)
+        self.assertEqual((entry.depth, entry.bound, entry.score, entry.move), (7, BOUND_UPPER, -99990, 0xBEEF))
+        self.assertIsNone(tt.probe(0x99))
+        self.assertEqual((tt.hits, tt.misses, tt.stores), (1, 1, 1))
+
+    def test_size_in_megabytes(self):
+        """Тест: размер таблицы задается в мегабайтах (16 байт на запись)."""
+        tt = TranspositionTable(1)
+        self.assertEqual(len(tt), 1024 * 1024 // 16)
+        tt.resize(2)
+        self.assertEqual(len(tt), 2 * 1024 * 1024 // 16)
+
+    def test_depth_preferred_and_always_replace(self):
+        """Тест: глубокая запись не вытесняется мелкой, мелкая уходит во второй слот."""
+        tt = TranspositionTable(0)  # одна корзина - все ключи в ней сталкиваются
+        tt.store(1, depth=10, bound=BOUND_EXACT, score=50)
+        tt.store(2, depth=3, bound=BOUND_LOWER, score=20)
+        tt.store(3, depth=2, bound=BOUND_LOWER, score=30)  # вытесняет только слот "всегда"
+        self.assertEqual(tt.probe(1).depth, 10)
+        self.assertIsNone(tt.probe(2))
+        self.assertEqual(tt.probe(3).score, 30)
+        self.assertEqual(tt.collisions, 1)
+
+        tt.new_search()  # записи прошлого поиска можно вытеснять даже более мелкими
+        tt.store(4, depth=1, bound=BOUND_EXACT, score=0)
+        self.assertIsNone(tt.probe(1))
+        self.assertEqual(tt.probe(4).depth, 1)
+
+    def test_store_without_move_keeps_old_move(self):
+        """Тест: запись без лучшего хода не затирает ранее найденный ход."""
+        tt = TranspositionTable(1)
+        tt.store(42, depth=2, bound=BOUND_EXACT, score=10, move=777)
+        tt.store(42, depth=3, bound=BOUND_UPPER, score=-5)
+        self.assertEqual(tt.probe(42).move, 777)
+
+    def test_clear(self):
+        """Тест: очистка убирает записи, счетчики и поколение, а массивы таблицы остаются те же."""
+        for size_mb in (0, 4):
+            tt = TranspositionTable(size_mb)
+            keys, data = tt._keys, tt._data
+            tt.new_search()
+            for key in (5, len(tt) - 1, 3 * len(tt) // 4):
+                tt.store(key, depth=1, bound=BOUND_EXACT, score=1)
+            tt.clear()
+            self.assertIsNone(tt.probe(5))
+            self.assertEqual(tt.stats['hits'], 0)
+            self.assertEqual(tt._generation, 0)
+            self.assertIs(tt._keys, keys)
+            self.assertIs(tt._data, data)
+            self.assertFalse(any(keys) or any(data))
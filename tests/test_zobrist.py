@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+
+# Гарантируем, что src в пути
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from Board import Board
+
+
+class TestZobrist(unittest.TestCase):
+
+    def test_undo_restores_key(self):
+        """Тест: ход и его отмена возвращают исходный ключ."""
+        board = Board()
+        start_key = board.zobrist_key
+        board.make_move(((6, 4), (4, 4))) # e2e4
+        self.assertNotEqual(board.zobrist_key, start_key)
+        board.undo_move()
+        self.assertEqual(board.zobrist_key, start_key)
+
+    def test_transposition_gives_same_key(self):
+        """Тест: разные порядки ходов в одну позицию дают одинаковый ключ."""
+        first, second = Board(), Board()
+        for move in [((7, 6), (5, 5)), ((0, 6), (2, 5)), ((7, 1), (5, 2))]: # Nf3 Nf6 Nc3
+            first.make_move(move)
+        for move in [((7, 1), (5, 2)), ((0, 6), (2, 5)), ((7, 6), (5, 5))]: # Nc3 Nf6 Nf3
+            second.make_move(move)
+        self.assertEqual(first.zobrist_key, second.zobrist_key)
+
+    def test_incremental_key_matches_fresh_board(self):
+        """Тест: инкрементальный ключ совпадает с ключом доски, собранной заново."""
+        board = Board()
+        for move in [((6, 4), (4, 4)), ((1, 3), (3, 3)), ((4, 4), (3, 3)), ((0, 3), (3, 3))]:
+            board.make_move(move)
+        fresh = Board()
+        fresh.board = [row[:] for row in board.board]
+        fresh.color_to_move = board.color_to_move
+        fresh.castling_rights = board.castling_rights
+        fresh.en_passant_target = board.en_passant_target
+        self.assertEqual(board.zobrist_key, fresh.zobrist_key)
+
+    def test_en_passant_only_counts_when_capturable(self):
+        """Тест: поле взятия на проходе влияет на ключ, только если взять есть чем."""
+        board = Board()
+        board.load_from_fen("4k3/8/8/8/4P3/8/8/4K3 b - e3 0 1")
+        with_target = board.zobrist_key
+        board.en_passant_target = None
+        self.assertEqual(board.zobrist_key, with_target)
+
+        board.load_from_fen("4k3/8/8/8/3pP3/8/8/4K3 b - e3 0 1")
+        with_target = board.zobrist_key
+        board.en_passant_target = None
+        self.assertNotEqual(board.zobrist_key, with_target)